@@ -0,0 +1,77 @@
+"""
+Compares HTML parser backends of 'email_reader.material_sources_extractor' on synthetic newsletters.
+
+For every backend ('html.parser', 'lxml') with and without partial parsing, measures the time of
+each 'parse_html_with_*' function and checks that its output is identical to the reference
+('html.parser' with full parsing, the original behaviour). Then compares serial and process pool
+parsing of an emails backlog.
+
+Usage:
+    python -m benchmarks.bench_html_parsers [--repeat N] [--backlog N]
+"""
+import argparse
+import time
+from contextlib import contextmanager
+from email_reader import material_sources_extractor as extractor
+from benchmarks.fixtures import (make_python_weekly_html, make_real_python_articles_html,
+                                 make_real_python_pytrick_html, make_emails_backlog)
+
+
+@contextmanager
+def parser_settings(**settings):
+    previous = {name: getattr(extractor, name) for name in settings}
+    for name, value in settings.items():
+        setattr(extractor, name, value)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(extractor, name, value)
+
+
+def time_call(func, arg, repeat: int) -> tuple[float, object]:
+    result = None
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func(arg)
+    return (time.perf_counter() - started) / repeat, result
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    args_parser.add_argument('--repeat', type=int, default=20, help='calls per measurement')
+    args_parser.add_argument('--backlog', type=int, default=40, help='q-ty of emails in the backlog')
+    args = args_parser.parse_args()
+
+    cases = (
+        ('python weekly', extractor.parse_html_with_python_weekly_articles, make_python_weekly_html()),
+        ('real python articles', extractor.parse_html_with_real_python_articles, make_real_python_articles_html()),
+        ('real python pytrick', extractor.parse_html_with_real_python_pytrick, make_real_python_pytrick_html()),
+    )
+    variants = [(backend, partial) for backend in ('html.parser', 'lxml') for partial in (False, True)
+                if extractor.select_html_parser(backend) == backend]
+
+    print(f'{"case":<22}{"backend":<13}{"partial":<9}{"ms/call":>10}{"speedup":>9}  identical')
+    for case_name, func, html in cases:
+        with parser_settings(HTML_PARSER='html.parser', HTML_PARTIAL_PARSING=False):
+            reference_secs, reference = time_call(func, html, args.repeat)
+        for backend, partial in variants:
+            with parser_settings(HTML_PARSER=backend, HTML_PARTIAL_PARSING=partial):
+                secs, result = time_call(func, html, args.repeat)
+            print(f'{case_name:<22}{backend:<13}{str(partial):<9}{secs * 1000:>10.2f}'
+                  f'{reference_secs / secs:>8.1f}x  {result == reference}')
+
+    emails = make_emails_backlog(args.backlog)
+    print(f'\nemail_parser on {len(emails)} emails ({extractor.HTML_PARSER}, '
+          f'partial={extractor.HTML_PARTIAL_PARSING})')
+    with parser_settings(HTML_PARSE_WORKERS=1):
+        serial_secs, serial_result = time_call(extractor.email_parser, emails, 1)
+    with parser_settings(HTML_PARSE_WORKERS=0, HTML_PARSE_POOL_MIN_EMAILS=1):
+        pool_secs, pool_result = time_call(extractor.email_parser, emails, 1)
+    print(f'{"serial":<22}{serial_secs:>10.2f} s')
+    print(f'{"process pool":<22}{pool_secs:>10.2f} s  {serial_secs / pool_secs:.1f}x  '
+          f'identical={pool_result == serial_result}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+Microbenchmarks of CPU-bound paths on synthetic offline fixtures: emails parsing, schedule calculation,
+post text compilation, tags formatting and structured logging.
+
+Every case reports throughput (ops/sec, an op is one email, schedule slot, post, tags string or log record)
+from the best of several rounds, and peak memory of a single call traced by tracemalloc. Results are
+compared with a baseline JSON file, if it exists; throughput drops beyond the threshold are reported as
+regressions and make the exit code 1. Baselines are machine-specific, so save one on the machine
+the comparison runs on.
+
+Usage:
+    python -m benchmarks.bench_suite [--rounds N] [--baseline PATH] [--save-baseline] [--threshold FRACTION]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from email_reader import material_sources_extractor as extractor
+from scheduler.publication_scheduler import calculate_publication_schedule
+from post_compiler.text_compiler import compile_post_text, format_tags
+from utils.logging_config import log_json
+from benchmarks.bench_html_parsers import parser_settings
+from benchmarks.fixtures import make_emails_backlog, make_post_materials
+
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+def make_cases(emails_qty: int, posts_qty: int) -> list[tuple[str, int, callable]]:
+    """
+    :return: list of (case name, q-ty of ops per call, function to call) tuples.
+    """
+    emails = make_emails_backlog(emails_qty)
+    materials = make_post_materials(posts_qty)
+    tags = [material['tags'] for material in materials]
+
+    def parse_emails():
+        # serial parsing keeps process pool start-up noise out of the measurement
+        with parser_settings(HTML_PARSE_WORKERS=1):
+            extractor.email_parser(emails)
+
+    def compile_posts():
+        for material in materials:
+            compile_post_text(material, 'Intro phrase')
+
+    def format_all_tags():
+        for tags_str in tags:
+            format_tags(tags_str)
+
+    def log_records():
+        for i in range(posts_qty):
+            log_json('BENCHMARK', 'info', 'The subprocess is ended successfully',
+                     result={'Q-ty of items': i, 'status': 'ок'})
+
+    return [
+        ('email_parser', len(emails), parse_emails),
+        ('calculate_publication_schedule', posts_qty, lambda: calculate_publication_schedule(posts_qty)),
+        ('compile_post_text', len(materials), compile_posts),
+        ('format_tags', len(tags), format_all_tags),
+        ('log_json', posts_qty, log_records),
+    ]
+
+
+def measure(ops_per_call: int, func: callable, rounds: int) -> dict[str, float]:
+    """
+    :return: {'ops_per_sec': best rounds throughput, 'peak_kib': peak traced memory of a single call}.
+    """
+    func()  # warm-up: imports, caches, lazily compiled regexes
+
+    best_secs = float('inf')
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func()
+        best_secs = min(best_secs, time.perf_counter() - started)
+
+    tracemalloc.start()
+    func()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'ops_per_sec': round(ops_per_call / best_secs, 1), 'peak_kib': round(peak_bytes / 1024, 1)}
+
+
+def compare_with_baseline(results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]],
+                          threshold: float) -> list[str]:
+    """
+    Prints results next to the baseline ones.
+
+    :return: names of cases whose throughput dropped by more than `threshold` fraction of the baseline.
+    """
+    regressions = []
+
+    print(f'{"case":<32}{"ops/sec":>12}{"baseline":>12}{"change":>9}{"peak KiB":>11}{"baseline":>11}')
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base:
+            change = result['ops_per_sec'] / base['ops_per_sec'] - 1
+            regressed = change < -threshold
+            if regressed:
+                regressions.append(name)
+            print(f'{name:<32}{result["ops_per_sec"]:>12.1f}{base["ops_per_sec"]:>12.1f}{change:>+8.0%}'
+                  f'{result["peak_kib"]:>11.1f}{base["peak_kib"]:>11.1f}{"  REGRESSION" if regressed else ""}')
+        else:
+            print(f'{name:<32}{result["ops_per_sec"]:>12.1f}{"-":>12}{"-":>9}{result["peak_kib"]:>11.1f}{"-":>11}')
+
+    return regressions
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    args_parser.add_argument('--rounds', type=int, default=5, help='timed calls per case, the best one is taken')
+    args_parser.add_argument('--emails', type=int, default=30, help='q-ty of emails in the parsed backlog')
+    args_parser.add_argument('--posts', type=int, default=2000,
+                             help='q-ty of posts, schedule slots, tags strings and log records')
+    args_parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH, help='baseline JSON file path')
+    args_parser.add_argument('--save-baseline', action='store_true', help='save results as the new baseline')
+    args_parser.add_argument('--threshold', type=float, default=0.2,
+                             help='throughput drop (fraction of baseline) reported as a regression')
+    args = args_parser.parse_args()
+
+    # the same log records path as in production, but written to nowhere
+    with open(os.devnull, 'w') as devnull:
+        logging.basicConfig(format='%(message)s', level=logging.INFO, handlers=[logging.StreamHandler(devnull)],
+                            force=True)
+
+        results = {name: measure(ops_per_call, func, args.rounds)
+                   for name, ops_per_call, func in make_cases(args.emails, args.posts)}
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='UTF-8') as f:
+            baseline = json.load(f)
+
+    regressions = compare_with_baseline(results, baseline, args.threshold)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='UTF-8') as f:
+            json.dump(results, f, indent=2)
+        print(f'\nBaseline is saved to {args.baseline}')
+    elif regressions:
+        print(f'\nRegressions beyond {args.threshold:.0%}: {", ".join(regressions)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
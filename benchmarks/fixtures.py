@@ -0,0 +1,125 @@
+"""
+Synthetic offline fixtures for benchmarks: newsletter emails shaped like the real ones.
+"""
+import random
+from email.message import EmailMessage
+
+
+def make_python_weekly_html(articles_qty: int = 80, other_rows_qty: int = 200, seed: int = 1) -> str:
+    """
+    Builds a large Python Weekly-like HTML: nested layout tables with the
+    "Articles, Tutorials and Talks" section followed by other sections.
+    """
+    rnd = random.Random(seed)
+
+    def filler_rows(qty: int) -> str:
+        return ''.join(
+            f'<tr><td class="txt" style="padding:0 24px;"><p style="margin:0;">Filler paragraph {i} '
+            f'with <b>bold</b> and <i>italic</i> text, score {rnd.random():.6f}.</p></td></tr>'
+            for i in range(qty)
+        )
+
+    article_rows = ''.join(
+        f'<tr><td class="dd" style="padding:0 24px 12px;"><p style="margin:0;">'
+        f'<a href="https://link.mail.beehiiv.com/ss/c/{rnd.getrandbits(64):x}" target="_blank" '
+        f'rel="noopener noreferrer nofollow"><span>Article title No. {i} about Python &amp; friends</span></a>'
+        f'</p><p style="margin:0;">Short description of the article No. {i}.</p></td></tr>'
+        for i in range(articles_qty)
+    )
+
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><style>td{font-family:Arial}</style></head><body>'
+        '<table width="100%" cellpadding="0" cellspacing="0"><tr><td><table class="md" width="600">'
+        f'{filler_rows(other_rows_qty // 2)}'
+        '<tr><td id="articles-tutorials-and-talks"><h2>Articles, Tutorials and Talks</h2></td></tr>'
+        f'{article_rows}'
+        '<tr><td id="interesting-projects-tools-and-libraries"><h2>Interesting Projects, Tools and Libraries'
+        '</h2></td></tr>'
+        f'{filler_rows(other_rows_qty // 2)}'
+        '</table></td></tr></table></body></html>'
+    )
+
+
+def make_real_python_articles_html(tutorials_qty: int = 12, other_blocks_qty: int = 100, seed: int = 2) -> str:
+    """
+    Builds a large Real Python-like HTML with "New Tutorial"/"Updated Tutorial" blocks among other content.
+    """
+    rnd = random.Random(seed)
+    blocks = []
+
+    for i in range(other_blocks_qty):
+        blocks.append(f'<tr><td><p>Course block {i}: <a href="https://realpython.com/courses/{i}/">'
+                      f'course</a> {rnd.random():.6f}</p><img src="https://files.realpython.com/{i}.png"></td></tr>')
+        if i % max(1, other_blocks_qty // max(1, tutorials_qty)) == 0 and tutorials_qty:
+            label = 'New Tutorial' if i % 2 else 'Updated Tutorial'
+            blocks.append(
+                f'<tr><td><h3>{label}</h3><h2><span>Tutorial No. {i}: Python &lt;tricks&gt;</span></h2>'
+                f'<p>Intro text.</p><p><a href="https://realpython.com/tutorial-{i}/?utm_source=email">'
+                f'Read the full tutorial »</a></p></td></tr>'
+            )
+            tutorials_qty -= 1
+
+    return f'<html><body><table>{"".join(blocks)}</table></body></html>'
+
+
+def make_real_python_pytrick_html(filler_blocks_qty: int = 50) -> str:
+    """
+    Builds a Real Python PyTricks-like HTML with a single code snippet.
+    """
+    filler = ''.join(f'<tr><td><p>Paragraph {i} about <a href="#">something</a>.</p></td></tr>'
+                     for i in range(filler_blocks_qty))
+    snippet = ('# How to merge two dicts\n&gt;&gt;&gt; x = {"a": 1, "b": 2}\n'
+               '&gt;&gt;&gt; y = {"b": 3, "c": 4}\n&gt;&gt;&gt; {**x, **y}\n{"a": 1, "b": 3, "c": 4}')
+    return f'<html><body><table>{filler}<tr><td><pre>\n{snippet}\n</pre></td></tr>{filler}</table></body></html>'
+
+
+def make_raw_email(from_header: str, subject: str, html: str) -> bytes:
+    """
+    Wraps HTML into a raw multipart email as bytes (as fetched from IMAP server).
+    """
+    message = EmailMessage()
+    message['From'] = from_header
+    message['Subject'] = subject
+    message.set_content('Plain text version')
+    message.add_alternative(html, subtype='html')
+    return message.as_bytes()
+
+
+def make_emails_backlog(emails_qty: int = 40) -> list[bytes]:
+    """
+    Builds a backlog of raw emails from all supported sources in round-robin order.
+    """
+    makers = (
+        lambda i: make_raw_email('Python Weekly <pythonweekly@mail.beehiiv.com>', f'Python Weekly {i}',
+                                 make_python_weekly_html(seed=i)),
+        lambda i: make_raw_email('Real Python <info@realpython.com>', f'Real Python tutorials {i}',
+                                 make_real_python_articles_html(seed=i)),
+        lambda i: make_raw_email('Dan at Real Python <info@realpython.com>', f'[PyTricks]: trick {i}',
+                                 make_real_python_pytrick_html()),
+    )
+    return [makers[i % len(makers)](i) for i in range(emails_qty)]
+
+
+def make_post_materials(posts_qty: int = 2000, seed: int = 3) -> list[dict[str, str]]:
+    """
+    Builds summarized materials as returned by `summarize_material()`: articles and PyTricks in turn.
+    """
+    rnd = random.Random(seed)
+    tags_pool = ('python', 'data science', 'machine learning', 'web development', 'async/await',
+                 'type hints', 'beginner', 'intermediate', 'advanced', 'c++ extensions', 'pandas')
+
+    def tags() -> str:
+        return ', '.join(rnd.sample(tags_pool, 5))
+
+    materials = []
+    for i in range(posts_qty):
+        if i % 2:
+            materials.append({'snippet summary': f'Разбор трюка No. {i}: <dict> merging & unpacking ' * 2,
+                              'tags': tags(),
+                              'snippet': f'>>> x = {{"a": {i}, "b": 2}}\n>>> y = {{"b": 3}}\n>>> {{**x, **y}}'})
+        else:
+            materials.append({'article title': f'Article No. {i} about Python <generics> & friends',
+                              'article summary': f'Краткое содержание статьи No. {i} о "Python" & <typing>. ' * 3,
+                              'tags': tags(),
+                              'url': f'https://realpython.com/tutorial-{i}/'})
+    return materials
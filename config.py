@@ -9,8 +9,40 @@ load_dotenv()
 
 EMAIL_ADDRESS = os.getenv("EMAIL_ADDRESS")
 EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
+# Max q-ty of emails fetched from IMAP server with a single FETCH command
+IMAP_FETCH_CHUNK_SIZE = int(os.getenv('IMAP_FETCH_CHUNK_SIZE', '20'))
+# Q-ty of runs in a row an email may fail to be fetched in before it's skipped, so the sync keeps moving forward
+IMAP_MAX_FETCH_FAILURES = int(os.getenv('IMAP_MAX_FETCH_FAILURES', '3'))
+
+# HTML parser for emails: 'auto' (lxml if installed, otherwise html.parser), 'lxml' or 'html.parser'
+HTML_PARSER_BACKEND = os.getenv('HTML_PARSER_BACKEND', 'auto')
+# Parse only relevant tags of emails where their structure allows it
+HTML_PARTIAL_PARSING = os.getenv('HTML_PARTIAL_PARSING', 'true').lower() == 'true'
+# Q-ty of processes for emails parsing (0 - CPU q-ty, 1 - no process pool)
+HTML_PARSE_WORKERS = int(os.getenv('HTML_PARSE_WORKERS', '0'))
+# Min q-ty of emails to parse them in a process pool
+HTML_PARSE_POOL_MIN_EMAILS = int(os.getenv('HTML_PARSE_POOL_MIN_EMAILS', '8'))
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+# Send several materials of the same type in one Gemini request ('true'/'false')
+GEMINI_BATCH_MODE = os.getenv('GEMINI_BATCH_MODE', 'false').lower() == 'true'
+# Max estimated q-ty of tokens (input and response) of a batched Gemini request
+GEMINI_BATCH_TOKEN_BUDGET = int(os.getenv('GEMINI_BATCH_TOKEN_BUDGET', '8000'))
+# Max q-ty of materials in a batched Gemini request
+GEMINI_BATCH_MAX_ITEMS = int(os.getenv('GEMINI_BATCH_MAX_ITEMS', '8'))
+# Max q-ty of simultaneous Gemini requests in one-request-per-material mode
+GEMINI_CONCURRENCY = int(os.getenv('GEMINI_CONCURRENCY', '1'))
+# Constrain Gemini responses by a JSON schema ('true'/'false')
+GEMINI_STRUCTURED_OUTPUT = os.getenv('GEMINI_STRUCTURED_OUTPUT', 'true').lower() == 'true'
+# Gemini quota of a model: requests per minute and tokens per minute
+GEMINI_DEFAULT_RPM = int(os.getenv('GEMINI_DEFAULT_RPM', '5'))
+GEMINI_DEFAULT_TPM = int(os.getenv('GEMINI_DEFAULT_TPM', '250000'))
+# Per-model quotas overriding the defaults
+# Format: JSON string like '{"gemini-2.5-flash-lite": [10, 250000]}'
+_gemini_model_rate_limits_str = os.getenv('GEMINI_MODEL_RATE_LIMITS', '{}')
+GEMINI_MODEL_RATE_LIMITS = {model: tuple(limits) for model, limits in json.loads(_gemini_model_rate_limits_str).items()}
+# How long parsed Gemini responses are reused from DB cache, 0 - cache is off
+SUMMARY_CACHE_TTL_HOURS = int(os.getenv('SUMMARY_CACHE_TTL_HOURS', '2160'))
 
 DB_NAME = os.getenv('DB_NAME')
 DB_USER = os.getenv('DB_USER')
@@ -18,11 +50,21 @@ DB_PASSWORD = os.getenv('DB_PASSWORD')
 DB_HOST = os.getenv('DB_HOST')
 DB_PORT = os.getenv('DB_PORT')
 DB_PORT = int(DB_PORT) if DB_PORT else None
+# Max number of simultaneously open connections in the process-wide pool
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+# Max time to wait for a free pooled connection when all of them are in use
+DB_POOL_WAIT_TIMEOUT_SECS = float(os.getenv('DB_POOL_WAIT_TIMEOUT_SECS', '30'))
+# Interval of DB notifications connection health checks, and of fallback polls while it's lost
+DB_NOTIFY_FALLBACK_POLL_SECS = float(os.getenv('DB_NOTIFY_FALLBACK_POLL_SECS', '60'))
 
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 TELEGRAM_CHANNEL_ID = os.getenv('TELEGRAM_CHANNEL_ID')
 
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'DEBUG')
+# Serialize and write log messages in a background thread ('true'/'false')
+LOG_BACKGROUND_WRITER = os.getenv('LOG_BACKGROUND_WRITER', 'true').lower() == 'true'
+# Metrics file written at exit: JSON if the path ends with '.json', Prometheus text format otherwise ('' - off)
+METRICS_FILE_PATH = os.getenv('METRICS_FILE_PATH', '')
 
 TZ = ZoneInfo(os.getenv('TZ', 'Europe/Minsk'))
 
@@ -32,10 +74,38 @@ TZ = ZoneInfo(os.getenv('TZ', 'Europe/Minsk'))
 # ==================================================
 # Type of URL resolver: 'playwright' (local) or 'browserless' (cloud service)
 URL_RESOLVER_TYPE = os.getenv('URL_RESOLVER_TYPE', 'playwright')
+# Max q-ty of pages open simultaneously in the shared Playwright browser (1 - pages are loaded one at a time)
+PLAYWRIGHT_CONCURRENCY = int(os.getenv('PLAYWRIGHT_CONCURRENCY', '5'))
+
+# Resolve URLs with plain HTTP requests first, escalating to the browser-based resolver only if needed
+URL_RESOLVER_HTTP_FIRST = os.getenv('URL_RESOLVER_HTTP_FIRST', 'true').lower() == 'true'
+# Max q-ty of URLs resolved simultaneously by HTTP resolver
+HTTP_RESOLVER_CONCURRENCY = int(os.getenv('HTTP_RESOLVER_CONCURRENCY', '10'))
+# Email tracker and redirect interstitial domains (with subdomains), URLs landing there are escalated to browser
+# Format: JSON string like '["beehiiv.com", "convertkit-mail.com"]'
+_tracker_domains_str = os.getenv('URL_RESOLVER_TRACKER_DOMAINS', json.dumps([
+    'beehiiv.com', 'convertkit-mail.com', 'convertkit-mail2.com', 'ck.page', 'kit.com', 'list-manage.com',
+    'mailchi.mp', 'sendgrid.net', 'mandrillapp.com', 'mailgun.org', 'hubspotlinks.com', 'rs6.net',
+]))
+URL_RESOLVER_TRACKER_DOMAINS = tuple(domain.lower() for domain in json.loads(_tracker_domains_str))
+# Resolved URLs are taken from DB cache if resolved less than this q-ty of hours ago (0 - cache is off)
+RESOLVED_URLS_CACHE_TTL_HOURS = int(os.getenv('RESOLVED_URLS_CACHE_TTL_HOURS', '720'))
+# Max q-ty of resolving attempts per URL
+URL_RESOLVE_MAX_ATTEMPTS = int(os.getenv('URL_RESOLVE_MAX_ATTEMPTS', '3'))
+# Delay before the first retry of a URL, doubled after each failed attempt (randomized to 50-100%)
+URL_RESOLVE_BACKOFF_BASE_SECS = float(os.getenv('URL_RESOLVE_BACKOFF_BASE_SECS', '3'))
+# Max delay between two attempts of a URL
+URL_RESOLVE_BACKOFF_MAX_SECS = float(os.getenv('URL_RESOLVE_BACKOFF_MAX_SECS', '30'))
+# Max time of the whole URLs resolving stage
+URL_RESOLVE_DEADLINE_SECS = float(os.getenv('URL_RESOLVE_DEADLINE_SECS', '600'))
 
 # Browserless.io API settings (only needed if URL_RESOLVER_TYPE='browserless')
 BROWSERLESS_API_KEY = os.getenv('BROWSERLESS_API_KEY')
 BROWSERLESS_ENDPOINT = os.getenv('BROWSERLESS_ENDPOINT', 'https://chrome.browserless.io')
+# Max q-ty of URLs navigated in a single BrowserQL request
+BROWSERLESS_BATCH_SIZE = int(os.getenv('BROWSERLESS_BATCH_SIZE', '5'))
+# Max q-ty of simultaneous BrowserQL requests
+BROWSERLESS_CONCURRENCY = int(os.getenv('BROWSERLESS_CONCURRENCY', '3'))
 
 
 # ==================================================
@@ -53,6 +123,11 @@ EVENING_TIME_TO_CHECK_EMAIL = time(
 )
 DELTA = timedelta(minutes=int(os.getenv('EMAIL_CHECK_DELTA_MINUTES', '30')))
 
+# Accumulation pipeline mode: 'batch' (sequential stages, default) or 'streaming' (concurrent stages)
+ACCUMULATION_PIPELINE_MODE = os.getenv('ACCUMULATION_PIPELINE_MODE', 'batch')
+# Max q-ty of items waiting between two stages in 'streaming' mode
+ACCUMULATION_PIPELINE_QUEUE_SIZE = int(os.getenv('ACCUMULATION_PIPELINE_QUEUE_SIZE', '10'))
+
 
 # ==================================================
 # POST PUBLICATIONS SCHEDULING SETTINGS
@@ -84,4 +159,22 @@ TIME_PERIODS_IN_SECS = tuple(tuple(period) for period in json.loads(_time_period
 
 # Format: JSON string like "[70, 25, 5]"
 _probabilities_str = os.getenv('PROBABILITIES', '[70, 25, 5]')
-PROBABILITIES = json.loads(_probabilities_str)
\ No newline at end of file
+PROBABILITIES = json.loads(_probabilities_str)
+
+# Publish all overdue schedule slots in one run instead of one post per run ('true'/'false')
+CATCH_UP_PUBLISHING = os.getenv('CATCH_UP_PUBLISHING', 'false').lower() == 'true'
+# Min interval between two posts published by catch-up
+CATCH_UP_MIN_SPACING_SECS = float(os.getenv('CATCH_UP_MIN_SPACING_SECS', '60'))
+# Max q-ty of overdue slots published in one run (0 - no limit), the rest are published by the next runs
+CATCH_UP_MAX_POSTS = int(os.getenv('CATCH_UP_MAX_POSTS', '20'))
+# Max duration of a cron run, the pause before publication is cut and catch-up publishing leaves the rest
+# of overdue slots for the next run to fit into it
+# (keep it below the runner job timeout minus setup time)
+RUN_TIME_LIMIT_SECS = int(os.getenv('RUN_TIME_LIMIT_SECS', '1200'))
+
+
+# ==================================================
+# DAEMON MODE SETTINGS
+# ==================================================
+# Interval of re-reading the schedule table, picks up schedule changes made outside the daemon
+DAEMON_SCHEDULE_RELOAD_SECS = int(os.getenv('DAEMON_SCHEDULE_RELOAD_SECS', '1800'))
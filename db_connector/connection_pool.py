@@ -0,0 +1,149 @@
+import threading
+import time
+from typing import Callable
+import psycopg2
+from psycopg2.extensions import connection, TRANSACTION_STATUS_IDLE
+from utils.logging_config import log_json
+
+
+LOGGER = 'DB CONNECTION POOL'
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of reusable psycopg2 connections.
+
+    Idle connections are kept in a LIFO stack and are checked for health on checkout,
+    so a connection dropped by the server is silently replaced with a new one.
+    At most `max_size` connections are open at the same time; when all of them are
+    checked out, callers wait until one is returned or `wait_timeout` expires.
+
+    Pool usage is tracked with the following counters:
+      - hits: checkouts served by an idle healthy connection
+      - misses: checkouts that required a new connection to be opened
+      - discarded: connections closed because they failed the health check or were broken
+      - wait_time_secs: total time spent waiting for a free connection
+    """
+
+    def __init__(self, connect: Callable[[], connection], max_size: int, wait_timeout: float | None = None) -> None:
+        """
+        :param connect: callable opening a new DB connection (may raise psycopg2.OperationalError).
+        :param max_size: maximum number of simultaneously open connections (values below 1 are treated as 1).
+        :param wait_timeout: maximum time in seconds to wait for a free connection, None - wait indefinitely.
+        """
+        self._connect = connect
+        self._max_size = max(1, max_size)
+        self._wait_timeout = wait_timeout
+        self._idle: list[connection] = []
+        self._opened = 0
+        self._condition = threading.Condition()
+        self._closed = False
+
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+        self.wait_time_secs = 0.0
+
+    def acquire(self) -> connection:
+        """
+        Checks out a healthy connection from the pool, opening a new one if necessary.
+
+        :return: open psycopg2 connection ready for use.
+        :raises psycopg2.OperationalError: if a new connection can't be opened.
+        :raises TimeoutError: if no connection is released within `wait_timeout`.
+        """
+        with self._condition:
+            wait_started = time.monotonic()
+            while not self._idle and self._opened >= self._max_size:
+                remaining = None
+                if self._wait_timeout is not None:
+                    remaining = self._wait_timeout - (time.monotonic() - wait_started)
+                    if remaining <= 0:
+                        self.wait_time_secs += time.monotonic() - wait_started
+                        raise TimeoutError(f'No free DB connection in the pool within {self._wait_timeout} secs')
+                self._condition.wait(remaining)
+            self.wait_time_secs += time.monotonic() - wait_started
+
+            while self._idle:
+                conn = self._idle.pop()
+                if self._is_healthy(conn):
+                    self.hits += 1
+                    return conn
+                self._discard(conn)
+
+            # reserving a slot before connecting, so that concurrent callers don't exceed max size
+            self._opened += 1
+            self.misses += 1
+
+        try:
+            return self._connect()
+        except Exception:
+            with self._condition:
+                self._opened -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, conn: connection) -> None:
+        """
+        Returns a connection to the pool. Broken connections or connections left
+        inside a transaction are closed instead of being reused.
+
+        :param conn: connection previously received from `acquire()`.
+        :return: None
+        """
+        with self._condition:
+            if self._closed or conn.closed or conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+                self._discard(conn)
+            else:
+                self._idle.append(conn)
+            self._condition.notify()
+
+    def close_all(self) -> None:
+        """
+        Closes all idle connections and prevents checked out ones from returning to the pool.
+
+        :return: None
+        """
+        with self._condition:
+            self._closed = True
+            while self._idle:
+                self._discard(self._idle.pop())
+            self._condition.notify_all()
+
+    def stats(self) -> dict[str, int | float]:
+        """
+        :return: snapshot of the pool usage counters.
+        """
+        with self._condition:
+            return {
+                'max_size': self._max_size,
+                'opened': self._opened,
+                'idle': len(self._idle),
+                'hits': self.hits,
+                'misses': self.misses,
+                'discarded': self.discarded,
+                'wait_time_secs': round(self.wait_time_secs, 3),
+            }
+
+    def _discard(self, conn: connection) -> None:
+        # must be called with the lock held
+        self._opened -= 1
+        self.discarded += 1
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    @staticmethod
+    def _is_healthy(conn: connection) -> bool:
+        if conn.closed:
+            return False
+        try:
+            with conn.cursor() as cur:
+                cur.execute('SELECT 1')
+            # ending the transaction opened by the health check query
+            conn.rollback()
+            return True
+        except psycopg2.Error as e:
+            log_json(LOGGER, 'warning', 'Pooled connection failed health check and is discarded', error=f'{e}')
+            return False
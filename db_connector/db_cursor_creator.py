@@ -1,19 +1,81 @@
 from contextlib import contextmanager
 from typing import Optional, Generator
+import atexit
+import threading
 import psycopg2
 from psycopg2 import OperationalError
 from psycopg2.extras import RealDictCursor
 import time
-from utils.logging_config import log_json
-from config import DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT
+from db_connector.connection_pool import ConnectionPool
+from utils.logging_config import log_json, log_span
+from config import DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, DB_POOL_SIZE, DB_POOL_WAIT_TIMEOUT_SECS
 
 
 LOGGER = "DB CONNECTION AND CURSOR CREATION SUBPROCESS"
 
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def create_db_connection() -> psycopg2.extensions.connection:
+    """
+    Opens a new database connection through IPv4 networks with SSL required.
+
+    :return: new psycopg2 connection producing RealDictCursor cursors.
+    :raises psycopg2.OperationalError: on connection failure.
+    """
+    return psycopg2.connect(
+        dbname=DB_NAME,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        host=DB_HOST,
+        port=DB_PORT,
+        sslmode='require',
+        cursor_factory=RealDictCursor
+    )
+
+
+def get_connection_pool() -> ConnectionPool:
+    """
+    Returns the process-wide connection pool, creating it on first use.
+
+    The pool size is set by DB_POOL_SIZE constant in 'config.py' module. Idle connections
+    are closed and pool usage statistics are logged at interpreter exit.
+
+    :return: process-wide ConnectionPool instance.
+    """
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(create_db_connection, DB_POOL_SIZE, DB_POOL_WAIT_TIMEOUT_SECS)
+            atexit.register(close_connection_pool)
+        return _pool
+
+
+def close_connection_pool() -> None:
+    """
+    Closes all idle pooled connections and logs pool usage statistics.
+
+    :return: None
+    """
+    global _pool
+
+    with _pool_lock:
+        pool, _pool = _pool, None
+
+    if pool is not None:
+        log_json(LOGGER, 'info', 'DB connection pool is closed', pool_stats=pool.stats())
+        pool.close_all()
+
+
 @contextmanager
 def get_db_cursor(retries: int = 3, delay: float = 1.0) -> Generator[Optional[psycopg2.extensions.cursor], None, None]:
     """
-    Creates context manager for establishing a database connection and providing a cursor.
+    Creates context manager for taking a database connection from the process-wide pool and providing a cursor.
+
+    The whole 'with' block is executed in a single transaction, which is committed on success
+    and rolled back on failure. The connection is returned to the pool afterwards.
 
     :param retries: Number of connection attempts before giving up.
     :param delay: Initial delay between attempts in seconds (is doubled after each failure).
@@ -22,37 +84,33 @@ def get_db_cursor(retries: int = 3, delay: float = 1.0) -> Generator[Optional[ps
     """
     log_json(LOGGER, 'info', 'The subprocess is started')
 
+    pool = get_connection_pool()
     conn = None
 
     for attempt in range(1, retries + 1):
         try:
-            # connection to DB through IPv4 networks
-            conn = psycopg2.connect(
-                dbname=DB_NAME,
-                user=DB_USER,
-                password=DB_PASSWORD,
-                host=DB_HOST,
-                port=DB_PORT,
-                sslmode='require',
-                cursor_factory=RealDictCursor
-            )
+            conn = pool.acquire()
             if conn:
                 break
-        except OperationalError as e:
+        except (OperationalError, TimeoutError) as e:
             log_json(LOGGER, 'error', f'Database connection attempt No. {attempt} failure', error=f'{e}')
             if attempt < retries:
                 time.sleep(delay)
                 delay *= 2
 
     if conn:
-        with conn:
-            try:
-                with conn.cursor() as cur:
-                    log_json(LOGGER, 'info', 'The subprocess is ended successfully')
-                    yield cur
-            except psycopg2.Error as e:
-                log_json(LOGGER, 'critical', 'Database error, the subprocess is failed',
-                         error=f'{e}')
+        try:
+            with log_span(LOGGER, 'db_transaction', level='debug') as span, conn:
+                try:
+                    with conn.cursor() as cur:
+                        log_json(LOGGER, 'info', 'The subprocess is ended successfully')
+                        yield cur
+                except psycopg2.Error as e:
+                    span['status'] = 'error'
+                    log_json(LOGGER, 'critical', 'Database error, the subprocess is failed',
+                             error=f'{e}')
+        finally:
+            pool.release(conn)
     else:
         log_json(LOGGER, 'critical', 'Failed to connect to database, the subprocess is failed')
         yield None
@@ -0,0 +1,129 @@
+import asyncio
+from typing import Awaitable, Callable
+import psycopg2
+from db_connector.db_cursor_creator import create_db_connection
+from utils.logging_config import log_json
+from config import DB_NOTIFY_FALLBACK_POLL_SECS
+
+
+LOGGER = 'DB NOTIFICATION LISTENER'
+
+# channel of notifications about 'schedule' and 'posts' tables changes (see migration 0008)
+TABLE_CHANGES_CHANNEL = 'bot_table_changes'
+
+# payload delivered instead of real notifications when they could have been missed: while the connection
+# is lost (every DB_NOTIFY_FALLBACK_POLL_SECS) and right after it's restored
+FALLBACK_POLL_PAYLOAD = 'fallback_poll'
+
+
+class NotificationListener:
+    """
+    Delivers Postgres notifications to an asyncio callback.
+
+    Listens on a dedicated (not pooled) autocommit connection, whose socket is watched by the event loop,
+    so no queries are sent while notifications arrive. The connection is checked every `fallback_poll_secs`;
+    while it's lost, the callback gets FALLBACK_POLL_PAYLOAD at the same interval, so the worker can
+    poll by itself, and reconnection is retried.
+    """
+
+    def __init__(self, callback: Callable[[str], Awaitable[None]], channel: str = TABLE_CHANGES_CHANNEL,
+                 fallback_poll_secs: float = DB_NOTIFY_FALLBACK_POLL_SECS) -> None:
+        """
+        :param callback: coroutine function called with the notification payload, e.g. 'schedule:INSERT'.
+        :param channel: notification channel to listen on.
+        :param fallback_poll_secs: interval of connection health checks and of fallback polls while it's lost.
+        """
+        self._callback = callback
+        self._channel = channel
+        self._fallback_poll_secs = fallback_poll_secs
+        self._connection: psycopg2.extensions.connection | None = None
+        self._connection_lost: asyncio.Event | None = None
+        self._deliveries = set()
+
+    async def run(self) -> None:
+        """
+        Listens until cancelled.
+
+        :return: None
+        """
+        was_connected = False
+
+        while True:
+            try:
+                await self._connect()
+                log_json(LOGGER, 'info', 'Listening is started', channel=self._channel)
+                if was_connected:
+                    # notifications sent while the connection was lost are gone
+                    self._deliver(FALLBACK_POLL_PAYLOAD)
+                was_connected = True
+                await self._watch_connection()
+            except psycopg2.Error as e:
+                log_json(LOGGER, 'error', 'Notifications connection failure',
+                         retry_in_secs=self._fallback_poll_secs, error=f'{e}')
+                self._deliver(FALLBACK_POLL_PAYLOAD)
+            finally:
+                self._disconnect()
+
+            await asyncio.sleep(self._fallback_poll_secs)
+
+    async def _connect(self) -> None:
+        self._connection = await asyncio.to_thread(create_db_connection)
+        self._connection.autocommit = True
+        with self._connection.cursor() as cur:
+            cur.execute(f'LISTEN {self._channel}')
+
+        self._connection_lost = asyncio.Event()
+        asyncio.get_running_loop().add_reader(self._connection.fileno(), self._read_notifications)
+
+    async def _watch_connection(self) -> None:
+        # a dropped TCP connection doesn't always make the socket readable, so it's also checked periodically
+        while True:
+            try:
+                await asyncio.wait_for(self._connection_lost.wait(), timeout=self._fallback_poll_secs)
+                return
+            except asyncio.TimeoutError:
+                pass
+
+            loop = asyncio.get_running_loop()
+            loop.remove_reader(self._connection.fileno())
+            with self._connection.cursor() as cur:
+                await asyncio.to_thread(cur.execute, 'SELECT 1')
+            loop.add_reader(self._connection.fileno(), self._read_notifications)
+            # notifications received along with the check response
+            self._read_notifications()
+
+    def _read_notifications(self) -> None:
+        try:
+            self._connection.poll()
+        except psycopg2.Error as e:
+            log_json(LOGGER, 'error', 'Notifications connection is lost', error=f'{e}')
+            asyncio.get_running_loop().remove_reader(self._connection.fileno())
+            self._connection_lost.set()
+            return
+
+        while self._connection.notifies:
+            notification = self._connection.notifies.pop(0)
+            log_json(LOGGER, 'debug', 'Notification is received', channel=notification.channel,
+                     payload=notification.payload)
+            self._deliver(notification.payload)
+
+    def _deliver(self, payload: str) -> None:
+        task = asyncio.create_task(self._call_back(payload))
+        self._deliveries.add(task)
+        task.add_done_callback(self._deliveries.discard)
+
+    async def _call_back(self, payload: str) -> None:
+        try:
+            await self._callback(payload)
+        except Exception as e:
+            log_json(LOGGER, 'error', 'Notification handling is failed', payload=payload, error=f'{e}')
+
+    def _disconnect(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is None:
+            return
+        try:
+            asyncio.get_running_loop().remove_reader(connection.fileno())
+        except (ValueError, psycopg2.Error):
+            pass
+        connection.close()
@@ -1,6 +1,7 @@
 import json
 import os
 from db_connector.db_cursor_creator import get_db_cursor
+from db_tables_initializer.schema_migrator import apply_pending_migrations
 from utils.logging_config import log_json
 
 LOGGER = 'DB TABLES INITIALIZATION PROCESS'
@@ -52,7 +53,8 @@ def initialize_db_table() -> None:
     Initializes the database by creating the necessary tables and populating 'intro_phrases'.
 
     This function performs the following steps within a single database transaction:
-      1. **Creates tables** ('intro_phrases', 'posts', 'schedule') if they do not already exist.
+      1. **Applies pending schema migrations** (see 'schema_migrator.py' module and 'migrations' directory),
+        which create tables ('intro_phrases', 'posts', 'schedule') and their indexes.
         - The 'intro_phrases' table includes constraints on 'intro_for' and 'type' fields.
       2. **Fetches intro phrases** from JSON files using a fallback mechanism.
       3. **Populates 'intro_phrases'** table by inserting the fetched data, mapping JSON structure to table columns:
@@ -68,18 +70,10 @@ def initialize_db_table() -> None:
 
     with get_db_cursor() as cur:
         if cur:
-            log_json(LOGGER, 'info', '"intro_phrases" table creation is created')
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS intro_phrases(
-                id SERIAL PRIMARY KEY,
-                intro_text TEXT NOT NULL UNIQUE,
-                intro_for TEXT NOT NULL CHECK (intro_for IN ('article', 'pytricks')),
-                type TEXT NOT NULL CHECK (type IN ('usual', 'funny', 'hot')),
-                move_to TEXT CHECK (move_to IN ('funny'))
-                )                
-                """
-            )
+            log_json(LOGGER, 'info', 'DB schema migration is started')
+            applied_migrations = apply_pending_migrations(cur)
+            log_json(LOGGER, 'info', 'DB schema migration is ended',
+                     result={'Applied migrations': applied_migrations})
 
             intros_dict = fetch_intros_from_json_options()
 
@@ -102,29 +96,7 @@ def initialize_db_table() -> None:
                     """,
                     values_to_insert
                 )
-            log_json(LOGGER, 'info', '"intro_phrases" table is created and filled in')
-
-            log_json(LOGGER, 'info', '"posts" table creation is created')
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS posts (
-                id SERIAL PRIMARY KEY,
-                text TEXT NOT NULL,
-                batch_type TEXT NOT NULL,
-                publication_time TIMESTAMPTZ)
-                """
-            )
-            log_json(LOGGER, 'info', '"posts" table is created')
-
-            log_json(LOGGER, 'info', '"schedule" table creation is created')
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS schedule (
-                id SERIAL PRIMARY KEY,
-                publication_time TIMESTAMPTZ)
-                """
-            )
-            log_json(LOGGER, 'info', '"schedule" table is created')
+            log_json(LOGGER, 'info', '"intro_phrases" table is filled in')
 
     log_json(LOGGER, 'info', 'The process is ended')
 
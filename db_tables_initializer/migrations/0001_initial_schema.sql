@@ -0,0 +1,20 @@
+-- Base tables of the bot. IF NOT EXISTS keeps the step safe for DBs created before migrations were introduced.
+CREATE TABLE IF NOT EXISTS intro_phrases(
+id SERIAL PRIMARY KEY,
+intro_text TEXT NOT NULL UNIQUE,
+intro_for TEXT NOT NULL CHECK (intro_for IN ('article', 'pytricks')),
+type TEXT NOT NULL CHECK (type IN ('usual', 'funny', 'hot')),
+move_to TEXT CHECK (move_to IN ('funny'))
+);
+
+CREATE TABLE IF NOT EXISTS posts (
+id SERIAL PRIMARY KEY,
+text TEXT NOT NULL,
+batch_type TEXT NOT NULL,
+publication_time TIMESTAMPTZ
+);
+
+CREATE TABLE IF NOT EXISTS schedule (
+id SERIAL PRIMARY KEY,
+publication_time TIMESTAMPTZ
+);
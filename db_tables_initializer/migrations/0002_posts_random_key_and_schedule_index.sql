@@ -0,0 +1,10 @@
+-- Indexed random post selection for the 'current' batch and due publication lookup.
+ALTER TABLE posts
+ADD COLUMN IF NOT EXISTS random_key DOUBLE PRECISION NOT NULL DEFAULT random();
+
+CREATE INDEX IF NOT EXISTS posts_current_random_key_idx
+ON posts(random_key)
+WHERE batch_type='current';
+
+CREATE INDEX IF NOT EXISTS schedule_publication_time_idx
+ON schedule(publication_time);
@@ -0,0 +1,8 @@
+-- Last processed email UID per mailbox for incremental IMAP sync.
+-- Stored UIDs are valid only while the mailbox UIDVALIDITY is unchanged.
+CREATE TABLE IF NOT EXISTS imap_sync_state (
+mailbox TEXT PRIMARY KEY,
+uid_validity BIGINT NOT NULL,
+last_uid BIGINT NOT NULL,
+updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
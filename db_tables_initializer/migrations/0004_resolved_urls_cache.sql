@@ -0,0 +1,7 @@
+-- Cache of resolved final URLs keyed by original (tracking) URL from newsletters.
+CREATE TABLE IF NOT EXISTS resolved_urls (
+original_url TEXT PRIMARY KEY,
+final_url TEXT NOT NULL,
+resolver TEXT NOT NULL,
+resolved_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
@@ -0,0 +1,7 @@
+-- Token bucket levels of the Gemini rate limiter per model, kept between runs.
+CREATE TABLE IF NOT EXISTS gemini_rate_limits (
+model TEXT PRIMARY KEY,
+requests_level DOUBLE PRECISION NOT NULL,
+tokens_level DOUBLE PRECISION NOT NULL,
+updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
@@ -0,0 +1,10 @@
+-- Cache of parsed Gemini responses keyed by hash of material type, prompt version, model
+-- and material content (resolved article URL or snippet text).
+CREATE TABLE IF NOT EXISTS summary_cache (
+cache_key TEXT PRIMARY KEY,
+material_type TEXT NOT NULL,
+model TEXT NOT NULL,
+prompt_version INTEGER NOT NULL,
+response JSONB NOT NULL,
+created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
@@ -0,0 +1,8 @@
+-- Canonical URL of the article a post is made of (NULL for PyTricks posts and posts added before),
+-- keeps the same article from being stored twice.
+ALTER TABLE posts
+ADD COLUMN IF NOT EXISTS canonical_url TEXT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS posts_canonical_url_idx
+ON posts(canonical_url)
+WHERE canonical_url IS NOT NULL;
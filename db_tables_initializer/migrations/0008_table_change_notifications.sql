@@ -0,0 +1,19 @@
+-- Notifications on 'bot_table_changes' channel about inserts and deletes in 'schedule' and 'posts' tables,
+-- so long-running workers react to changes without polling. Payload format: '<table>:<operation>',
+-- e.g. 'schedule:INSERT'. Statement-level triggers send one notification per statement, not per row.
+CREATE OR REPLACE FUNCTION notify_table_change() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('bot_table_changes', TG_TABLE_NAME || ':' || TG_OP);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS schedule_change_notify ON schedule;
+CREATE TRIGGER schedule_change_notify
+AFTER INSERT OR DELETE ON schedule
+FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change();
+
+DROP TRIGGER IF EXISTS posts_change_notify ON posts;
+CREATE TRIGGER posts_change_notify
+AFTER INSERT OR DELETE ON posts
+FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change();
@@ -0,0 +1,5 @@
+-- First email UID the server failed to return (it holds back last_uid) and q-ty of runs it failed in a row,
+-- so the email is skipped after IMAP_MAX_FETCH_FAILURES runs instead of stopping the sync.
+ALTER TABLE imap_sync_state
+ADD COLUMN IF NOT EXISTS failed_uid BIGINT,
+ADD COLUMN IF NOT EXISTS failed_uid_runs INTEGER NOT NULL DEFAULT 0;
@@ -0,0 +1,153 @@
+import argparse
+import os
+import re
+from db_connector.db_cursor_creator import get_db_cursor
+from utils.logging_config import log_json
+
+LOGGER = 'DB SCHEMA MIGRATION PROCESS'
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), 'migrations')
+
+# migration file name format: '<version>_<name>.sql', e.g. '0002_posts_random_key_and_schedule_index.sql'
+MIGRATION_FILE_PATTERN = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+# arbitrary app-wide key of the transaction-level advisory lock, which keeps concurrent runs from
+# applying the same migrations simultaneously
+MIGRATION_LOCK_KEY = 7_401_202_501
+
+
+def discover_migrations() -> list[tuple[int, str, str]]:
+    """
+    Finds migration files in the 'migrations' directory and orders them by version.
+
+    :return: list of (version, name, file path) tuples sorted by version.
+    :raises ValueError: if two migration files have the same version.
+    """
+    migrations = {}
+
+    for file_name in os.listdir(MIGRATIONS_DIR):
+        match = MIGRATION_FILE_PATTERN.match(file_name)
+        if not match:
+            continue
+        version, name = int(match.group(1)), match.group(2)
+        if version in migrations:
+            raise ValueError(f'Duplicate migration version {version}: '
+                             f'{os.path.basename(migrations[version][2])} and {file_name}')
+        migrations[version] = (version, name, os.path.join(MIGRATIONS_DIR, file_name))
+
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def get_applied_versions(cur) -> set[int]:
+    """
+    Creates 'schema_version' table if it doesn't exist and reads versions of applied migrations.
+
+    :param cur: DB cursor.
+    :return: set of applied migration versions.
+    """
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW())
+        """
+    )
+    cur.execute(
+        """
+        SELECT version FROM schema_version
+        """
+    )
+    return {row['version'] for row in cur.fetchall()}
+
+
+def apply_pending_migrations(cur, target_version: int | None = None) -> list[int]:
+    """
+    Applies not yet applied migrations in version order using the provided cursor.
+
+    All steps are executed in the cursor's transaction, so either every pending migration
+    is applied and recorded in 'schema_version' table, or none of them.
+
+    :param cur: DB cursor.
+    :param target_version: the highest migration version to apply, None - apply all pending migrations.
+    :return: list of applied migration versions.
+    """
+    cur.execute('SELECT pg_advisory_xact_lock(%s)', (MIGRATION_LOCK_KEY,))
+    applied_versions = get_applied_versions(cur)
+
+    newly_applied = []
+    for version, name, path in discover_migrations():
+        if version in applied_versions or (target_version is not None and version > target_version):
+            continue
+
+        with open(path, 'r', encoding='UTF-8') as f:
+            migration_sql = f.read()
+
+        log_json(LOGGER, 'info', 'Applying migration', version=version, name=name)
+        cur.execute(migration_sql)
+        cur.execute(
+            """
+            INSERT INTO schema_version(version, name)
+            VALUES(%s, %s)
+            """,
+            (version, name)
+        )
+        newly_applied.append(version)
+
+    return newly_applied
+
+
+def migrate(target_version: int | None = None) -> list[int] | None:
+    """
+    Applies pending schema migrations in a single transaction.
+
+    :param target_version: the highest migration version to apply, None - apply all pending migrations.
+    :return: list of applied migration versions, or None in case of DB connection failure.
+    """
+    log_json(LOGGER, 'info', 'The process is started')
+
+    with get_db_cursor() as cur:
+        if cur:
+            applied = apply_pending_migrations(cur, target_version)
+            log_json(LOGGER, 'info', 'The process is ended successfully',
+                     result={'Applied migrations': applied})
+            return applied
+        else:
+            log_json(LOGGER, 'critical', 'The process is failed',
+                     reason='DB connection/cursor creation failure')
+
+
+def show_migrations_status() -> None:
+    """
+    Logs every known migration together with its status ('applied' or 'pending').
+
+    :return: None
+    """
+    with get_db_cursor() as cur:
+        if cur:
+            applied_versions = get_applied_versions(cur)
+            for version, name, _ in discover_migrations():
+                log_json(LOGGER, 'info', 'Migration status', version=version, name=name,
+                         status='applied' if version in applied_versions else 'pending')
+        else:
+            log_json(LOGGER, 'critical', 'Migrations status check is failed',
+                     reason='DB connection/cursor creation failure')
+
+
+if __name__ == "__main__":
+    from utils.logging_config import setup_logging, silence_third_party_logs
+
+    parser = argparse.ArgumentParser(description='Applies pending DB schema migrations.')
+    parser.add_argument('--target', type=int, default=None,
+                        help='the highest migration version to apply (default: all pending)')
+    parser.add_argument('--status', action='store_true',
+                        help='only show applied and pending migrations')
+    args = parser.parse_args()
+
+    setup_logging()
+    silence_third_party_logs()
+
+    if args.status:
+        show_migrations_status()
+    else:
+        migrate(args.target)
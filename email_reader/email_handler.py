@@ -1,25 +1,46 @@
 import imaplib
+import re
 import socket
 import ssl
-from utils.logging_config import log_json
-from config import EMAIL_ADDRESS, EMAIL_PASSWORD
+from email_reader.imap_sync_state import get_imap_sync_state, save_imap_sync_state
+from utils.logging_config import log_json, log_span
+from config import EMAIL_ADDRESS, EMAIL_PASSWORD, IMAP_FETCH_CHUNK_SIZE, IMAP_MAX_FETCH_FAILURES
 
 
 LOGGER = 'FETCHING UNSEEN EMAILS SUBPROCESS'
 
+MAILBOX = 'INBOX'
 
+# UID data item in metadata of a FETCH response, e.g. b'12 (UID 345 RFC822 {2048}'
+FETCH_UID_PATTERN = re.compile(rb'\bUID (\d+)')
+
+
+@log_span(LOGGER, 'imap_fetch')
 def fetch_unseen_emails() -> list[bytes]:
     """
     Connects to the Gmail IMAP server, logs in, selects the inbox,
-    searches for unseen emails from specified resources, and fetches raw email
+    searches for new emails from specified resources, and fetches raw email
     messages including headers and body (RFC822 format).
 
+    The last processed email UID and the mailbox UIDVALIDITY are stored in DB after each run,
+    so only emails with greater UIDs are searched for ('incremental' sync, independent of
+    the UNSEEN flag). If the stored state is missing or the mailbox UIDVALIDITY has changed,
+    all unseen emails are searched for instead ('full' sync).
+
+    All resources are searched with a single UID SEARCH command, and messages are fetched
+    with multi-UID FETCH commands, each for up to IMAP_FETCH_CHUNK_SIZE messages (constant
+    set in 'config.py' module). Messages requested but not returned by the server are fetched again by
+    the next run; messages after the first of them are left for the next run too, so none is returned twice.
+    A message failed to be fetched in IMAP_MAX_FETCH_FAILURES runs in a row is skipped, so a single broken
+    message doesn't stop the sync.
+
     :return: list of raw email messages as bytes, or an empty list if not found or any failure
     """
     log_json(LOGGER, 'info', 'The subprocess is started')
 
     imap = None
     raw_email_messages = []
+    round_trips = 0
     resources = (
         "info@realpython.com",
         "rahul@pythonweekly.com",
@@ -41,31 +62,86 @@ def fetch_unseen_emails() -> list[bytes]:
                      error=f'{e}')
             return []
 
-        select_status, _ = imap.select("INBOX")
+        select_status, _ = imap.select(MAILBOX)
         if select_status != "OK":
             log_json(LOGGER, 'info', 'The subprocess is terminated', reason='INBOX folder access failure')
             return []
 
-        email_ids_list = []
-        for resource in resources:
-            # search method parameter '*criteria' are search commands based on IMAP protocol standards (RFC 3501)
-            search_status, data = imap.search(None, f'(UNSEEN FROM {resource})')
-            if search_status != "OK":
-                log_json(LOGGER, 'info', f'Messages search from {resource} failure')
+        uid_validity = get_select_response_number(imap, 'UIDVALIDITY')
+        uid_next = get_select_response_number(imap, 'UIDNEXT')
+
+        sync_state = get_imap_sync_state(MAILBOX)
+        if sync_state and uid_validity is not None and sync_state['uid_validity'] == uid_validity:
+            last_uid = sync_state['last_uid']
+            stored_failed_uid, stored_failed_uid_runs = sync_state['failed_uid'], sync_state['failed_uid_runs']
+            sync_mode = 'incremental'
+        else:
+            # first run, DB failure or mailbox UIDs were reassigned by server - stored UID is meaningless
+            last_uid = 0
+            stored_failed_uid, stored_failed_uid_runs = None, 0
+            sync_mode = 'full'
+            log_json(LOGGER, 'info', 'Full unseen emails search is used', reason='No valid IMAP sync state',
+                     stored_state=sync_state, uid_validity=uid_validity)
+
+        if sync_mode == 'incremental' and uid_next is not None and uid_next <= last_uid + 1:
+            email_uids = []
+            log_json(LOGGER, 'info', 'No new emails in the mailbox since the last run', last_uid=last_uid)
+        else:
+            if sync_mode == 'incremental':
+                # not relying on UNSEEN flag, so emails opened by a human before the run are not missed
+                search_criteria = build_search_criteria(resources, f'UID {last_uid + 1}:*')
             else:
-                email_ids = data[0].split()
-                log_json(LOGGER, 'info', f'{len(email_ids)} unseen email/emails from {resource} found')
-                email_ids_list.extend(email_ids)
-
-        for email_id in email_ids_list:
-            # RFC822 - email format standard that describes email structure, headers formats and how email is encoded
-            fetch_status, raw_email_data = imap.fetch(email_id, "(RFC822)")
-            if fetch_status == "OK" and raw_email_data and raw_email_data[0]:
-                raw_email_message = raw_email_data[0][1]  # excluding email metadata
-                raw_email_messages.append(raw_email_message)
+                search_criteria = build_search_criteria(resources, 'UNSEEN')
+
+            # single search for all resources instead of one search per resource
+            round_trips += 1
+            search_status, data = imap.uid('SEARCH', None, search_criteria)
+            if search_status != "OK":
+                log_json(LOGGER, 'info', 'Messages search failure', resources=resources)
+                return []
+
+            # 'n:*' range always includes the latest email in the mailbox, even if its UID is below n
+            email_uids = [email_uid for email_uid in data[0].split() if int(email_uid) > last_uid]
+            log_json(LOGGER, 'info', f'{len(email_uids)} new email/emails from resources found',
+                     resources=resources, sync_mode=sync_mode)
+
+        fetched_messages = {}
+        for uids_chunk_start in range(0, len(email_uids), IMAP_FETCH_CHUNK_SIZE):
+            uids_chunk = email_uids[uids_chunk_start:uids_chunk_start + IMAP_FETCH_CHUNK_SIZE]
+            round_trips += 1
+            fetched_messages.update(fetch_raw_messages(imap, uids_chunk))
+
+        # requested but not returned, whether the whole chunk failed or the server skipped some messages
+        failed_uids = [int(email_uid) for email_uid in email_uids if int(email_uid) not in fetched_messages]
+
+        if uid_validity is not None:
+            if stored_failed_uid in failed_uids and stored_failed_uid_runs + 1 >= IMAP_MAX_FETCH_FAILURES:
+                # the email holding back the sync is given up, so the following ones aren't held back forever
+                failed_uids.remove(stored_failed_uid)
+                log_json(LOGGER, 'warning', 'Email is skipped', reason='Repeated fetch failures',
+                         uid=stored_failed_uid, failed_runs_qty=stored_failed_uid_runs + 1)
+
+            failed_uid, failed_uid_runs = None, 0
+            if failed_uids:
+                # failed emails are fetched again by the next run, together with all emails after the first
+                # of them, so the latter are held back from this run to not be processed twice
+                failed_uid = min(failed_uids)
+                failed_uid_runs = stored_failed_uid_runs + 1 if failed_uid == stored_failed_uid else 1
+                new_last_uid = max(last_uid, failed_uid - 1)
+                held_back_qty = sum(1 for email_uid in fetched_messages if email_uid > new_last_uid)
+                log_json(LOGGER, 'info', 'Emails are left for the next run', failed_uids=failed_uids,
+                         held_back_qty=held_back_qty, first_failed_uid_runs=failed_uid_runs)
+                raw_email_messages = [message for email_uid, message in fetched_messages.items()
+                                      if email_uid <= new_last_uid]
             else:
-                log_json(LOGGER, 'info',
-                         f'Raw email message fetch failure for email with ID {email_id.decode()}')
+                new_last_uid = max(last_uid, (uid_next or 1) - 1, *(int(email_uid) for email_uid in email_uids))
+                raw_email_messages = list(fetched_messages.values())
+            if (sync_mode == 'full' or new_last_uid != last_uid or failed_uid != stored_failed_uid
+                    or failed_uid_runs != stored_failed_uid_runs):
+                save_imap_sync_state(MAILBOX, uid_validity, new_last_uid, failed_uid, failed_uid_runs)
+        else:
+            # sync state isn't saved without UIDVALIDITY, so nothing would be fetched again by UID
+            raw_email_messages = list(fetched_messages.values())
 
     finally:
         if imap is not None:
@@ -75,6 +151,76 @@ def fetch_unseen_emails() -> list[bytes]:
                 log_json(LOGGER, 'error', 'Mailbox logout failure', error=f'{logout_error}')
 
     log_json(LOGGER, 'info', 'The subprocess is ended successfully',
-             result={'Fetched raw messages q-ty': len(raw_email_messages)})
+             result={'Fetched raw messages q-ty': len(raw_email_messages),
+                     'IMAP search/fetch round trips q-ty': round_trips})
+
+    return raw_email_messages
+
+
+def build_search_criteria(resources: tuple[str, ...], *criteria: str) -> str:
+    """
+    Builds IMAP search criteria matching emails from any of the given resources.
 
-    return raw_email_messages
\ No newline at end of file
+    IMAP 'OR' operator takes exactly two search keys (RFC 3501), so N resources
+    are combined with N-1 prefix 'OR' operators, e.g. 'OR OR FROM a FROM b FROM c'.
+
+    :param resources: email addresses of senders.
+    :param criteria: additional search keys all emails must match, e.g. 'UNSEEN'.
+    :return: parenthesized search criteria string.
+    """
+    senders = ' '.join(f'FROM {resource}' for resource in resources)
+    senders_criteria = 'OR ' * (len(resources) - 1) + senders
+
+    return f'({" ".join((*criteria, senders_criteria))})'
+
+
+def fetch_raw_messages(imap: imaplib.IMAP4, email_uids: list[bytes]) -> dict[int, bytes]:
+    """
+    Fetches raw email messages (RFC822 format) for several UIDs with a single UID FETCH command.
+
+    :param imap: logged in IMAP connection with selected mailbox.
+    :param email_uids: UIDs of emails to fetch.
+    :return: dictionary of 'UID-raw email message' pairs in server response order; messages the server
+        didn't return are missing, the dictionary is empty on fetch failure.
+    """
+    # RFC822 - email format standard that describes email structure, headers formats and how email is encoded
+    fetch_status, raw_email_data = imap.uid('FETCH', b','.join(email_uids).decode(), '(RFC822)')
+    if fetch_status != "OK" or not raw_email_data:
+        log_json(LOGGER, 'info', 'Raw email messages fetch failure',
+                 email_uids=[email_uid.decode() for email_uid in email_uids])
+        return {}
+
+    # response consists of (metadata, message) tuples separated by closing b')' elements
+    raw_email_messages = {}
+    for item in raw_email_data:
+        if not isinstance(item, tuple):
+            continue
+        uid_match = FETCH_UID_PATTERN.search(item[0])
+        if uid_match:
+            raw_email_messages[int(uid_match.group(1))] = item[1]
+        else:
+            log_json(LOGGER, 'warning', 'Fetched email message without UID is skipped', metadata=f'{item[0]!r}')
+
+    if len(raw_email_messages) != len(email_uids):
+        log_json(LOGGER, 'info', 'Not all raw email messages are fetched',
+                 requested_qty=len(email_uids), fetched_qty=len(raw_email_messages))
+
+    return raw_email_messages
+
+
+def get_select_response_number(imap: imaplib.IMAP4, response_code: str) -> int | None:
+    """
+    Reads a numeric untagged response (e.g. UIDVALIDITY, UIDNEXT) received from IMAP server on SELECT.
+
+    :param imap: IMAP connection with selected mailbox.
+    :param response_code: name of the response, e.g. 'UIDVALIDITY'.
+    :return: response value, or None if server didn't send it.
+    """
+    _, data = imap.response(response_code)
+    if data and data[-1]:
+        try:
+            return int(data[-1])
+        except ValueError:
+            log_json(LOGGER, 'warning', 'Unexpected IMAP response value', response_code=response_code,
+                     value=f'{data[-1]}')
+    return None
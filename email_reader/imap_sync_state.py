@@ -0,0 +1,69 @@
+from db_connector.db_cursor_creator import get_db_cursor
+from utils.logging_config import log_json
+
+
+LOGGER_G = 'GETTING IMAP SYNC STATE FROM DB SUBPROCESS'
+LOGGER_S = 'SAVING IMAP SYNC STATE TO DB SUBPROCESS'
+
+
+def get_imap_sync_state(mailbox: str) -> dict[str, int] | None:
+    """
+    Reads the last processed email UID and the UIDVALIDITY it belongs to for the given mailbox,
+    with the first email UID failed to fetch and q-ty of runs it failed in a row.
+
+    :param mailbox: mailbox name, e.g. 'INBOX'.
+    :return: dict with 'uid_validity', 'last_uid', 'failed_uid' and 'failed_uid_runs' keys, or None
+        if the mailbox was never synced or DB connection fails.
+    """
+    log_json(LOGGER_G, 'info', 'The subprocess is started', mailbox=mailbox)
+
+    with get_db_cursor() as cur:
+        if cur:
+            cur.execute(
+                """
+                SELECT uid_validity, last_uid, failed_uid, failed_uid_runs FROM imap_sync_state
+                WHERE mailbox=%s
+                """,
+                (mailbox,)
+            )
+            query_result = cur.fetchone()
+            log_json(LOGGER_G, 'info', 'The subprocess is ended successfully', mailbox=mailbox,
+                     result=dict(query_result) if query_result else None)
+            return dict(query_result) if query_result else None
+        else:
+            log_json(LOGGER_G, 'warning', 'The subprocess is failed', mailbox=mailbox,
+                     reason='DB connection/cursor creation failure')
+
+
+def save_imap_sync_state(mailbox: str, uid_validity: int, last_uid: int, failed_uid: int | None = None,
+                         failed_uid_runs: int = 0) -> None:
+    """
+    Stores the last processed email UID and the current UIDVALIDITY for the given mailbox.
+
+    :param mailbox: mailbox name, e.g. 'INBOX'.
+    :param uid_validity: UIDVALIDITY value of the mailbox reported by IMAP server on SELECT.
+    :param last_uid: UID of the last processed email.
+    :param failed_uid: the first email UID failed to fetch (right after `last_uid`), None if there isn't one.
+    :param failed_uid_runs: q-ty of runs in a row `failed_uid` failed to fetch in.
+    :return: None
+    """
+    log_json(LOGGER_S, 'info', 'The subprocess is started', mailbox=mailbox)
+
+    with get_db_cursor() as cur:
+        if cur:
+            cur.execute(
+                """
+                INSERT INTO imap_sync_state(mailbox, uid_validity, last_uid, failed_uid, failed_uid_runs, updated_at)
+                VALUES(%s, %s, %s, %s, %s, NOW())
+                ON CONFLICT (mailbox) DO UPDATE
+                SET uid_validity=EXCLUDED.uid_validity, last_uid=EXCLUDED.last_uid, failed_uid=EXCLUDED.failed_uid,
+                    failed_uid_runs=EXCLUDED.failed_uid_runs, updated_at=NOW()
+                """,
+                (mailbox, uid_validity, last_uid, failed_uid, failed_uid_runs)
+            )
+            log_json(LOGGER_S, 'info', 'The subprocess is ended successfully', mailbox=mailbox,
+                     result={'uid_validity': uid_validity, 'last_uid': last_uid, 'failed_uid': failed_uid,
+                             'failed_uid_runs': failed_uid_runs})
+        else:
+            log_json(LOGGER_S, 'warning', 'The subprocess is failed', mailbox=mailbox,
+                     reason='DB connection/cursor creation failure')
@@ -1,12 +1,55 @@
 import email.message
+import os
+from concurrent.futures import ProcessPoolExecutor
 from email.policy import default
 from email.parser import BytesParser
-from bs4 import BeautifulSoup
-from utils.logging_config import log_json
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
+from utils.logging_config import log_json, log_span
+from config import HTML_PARSER_BACKEND, HTML_PARTIAL_PARSING, HTML_PARSE_WORKERS, HTML_PARSE_POOL_MIN_EMAILS
 
 
 LOGGER = 'EMAIL DATA EXTRACTION SUBPROCESS'
 
+
+def select_html_parser(backend: str) -> str:
+    """
+    Selects BeautifulSoup tree builder for HTML parsing.
+
+    :param backend: 'auto' (C-accelerated 'lxml' if installed, otherwise 'html.parser'),
+        or a name of BeautifulSoup tree builder, e.g. 'lxml' or 'html.parser'.
+    :return: name of an installed tree builder ('html.parser' as fallback).
+    """
+    backend = backend.lower()
+    if backend == 'auto':
+        backend = 'lxml'
+
+    if builder_registry.lookup(backend) is None:
+        if backend != 'html.parser':
+            log_json(LOGGER, 'warning', f'HTML parser "{backend}" is not installed, "html.parser" is used')
+        return 'html.parser'
+
+    return backend
+
+
+HTML_PARSER = select_html_parser(HTML_PARSER_BACKEND)
+
+# Only these tags (with their whole content) are kept in the parsed tree if partial parsing is on
+REAL_PYTHON_ARTICLES_TAGS = SoupStrainer(['h3', 'h2', 'a'])
+REAL_PYTHON_PYTRICK_TAGS = SoupStrainer('pre')
+
+
+def make_soup(html: str, parse_only: SoupStrainer | None = None) -> BeautifulSoup:
+    """
+    Parses HTML with the selected parser backend (HTML_PARSER).
+
+    :param html: HTML to parse.
+    :param parse_only: tags to keep in the parsed tree, used only if HTML_PARTIAL_PARSING is on.
+    :return: parsed BeautifulSoup tree.
+    """
+    return BeautifulSoup(html, HTML_PARSER, parse_only=parse_only if HTML_PARTIAL_PARSING else None)
+
+@log_span(LOGGER, 'parse')
 def email_parser(emails_for_parsing: list[bytes]) -> dict[str, list[str] | dict[str, str]]:
     """
     Receives list of raw email messages as bytes, parses them according to specified criteria,
@@ -17,6 +60,9 @@ def email_parser(emails_for_parsing: list[bytes]) -> dict[str, list[str] | dict[
         - Real Python articles: extracts 'article title-link to article' pairs for tutorials as dictionary
         - Python Weekly: extracts 'article title-link to article' pairs for articles as dictionary
 
+    Emails are parsed in a process pool of HTML_PARSE_WORKERS processes (CPU q-ty if 0)
+    when there are at least HTML_PARSE_POOL_MIN_EMAILS of them (constants set in 'config.py' module).
+
     :param emails_for_parsing: list of raw email messages as bytes
     :return: a dictionary with two keys:
          - 'pytricks': list of code snippet strings
@@ -27,29 +73,23 @@ def email_parser(emails_for_parsing: list[bytes]) -> dict[str, list[str] | dict[
 
     material_sources = {'pytricks': [], 'articles': {}}
 
-    for email_for_parsing in emails_for_parsing:
-        msg = BytesParser(policy=default).parsebytes(email_for_parsing)
-
-        if 'PyTricks' in msg['Subject']:
-            html_part = decode_email_html_part(msg)
-            if html_part:
-                pytrick = parse_html_with_real_python_pytrick(html_part)
-                if pytrick:
-                    material_sources['pytricks'].append(pytrick)
-
-        elif msg['From'] == 'Real Python <info@realpython.com>':
-            html_part = decode_email_html_part(msg)
-            if html_part:
-                articles = parse_html_with_real_python_articles(html_part)
-                if articles:
-                    material_sources['articles'].update(articles)
-
-        elif msg['From'] in ('Python Weekly <pythonweekly@mail.beehiiv.com>', 'Python Weekly <rahul@pythonweekly.com>'):
-            html_part = decode_email_html_part(msg)
-            if html_part:
-                articles = parse_html_with_python_weekly_articles(html_part)
-                if articles:
-                    material_sources['articles'].update(articles)
+    workers = HTML_PARSE_WORKERS or os.cpu_count() or 1
+    if workers > 1 and len(emails_for_parsing) >= HTML_PARSE_POOL_MIN_EMAILS:
+        log_json(LOGGER, 'debug', 'Emails are parsed in process pool', workers=workers)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            extracted_materials = list(executor.map(extract_materials_from_email, emails_for_parsing))
+    else:
+        extracted_materials = [extract_materials_from_email(email_for_parsing)
+                               for email_for_parsing in emails_for_parsing]
+
+    # merging in emails order, so the result doesn't depend on the way emails were parsed
+    for extracted_material in extracted_materials:
+        if extracted_material:
+            material_type, material = extracted_material
+            if material_type == 'pytricks':
+                material_sources['pytricks'].append(material)
+            else:
+                material_sources['articles'].update(material)
 
     log_json(LOGGER, 'info', 'The subprocess is ended successfully',
              result={'Extracted snippets q-ty': len(material_sources['pytricks']),
@@ -58,6 +98,42 @@ def email_parser(emails_for_parsing: list[bytes]) -> dict[str, list[str] | dict[
     return material_sources
 
 
+def extract_materials_from_email(email_for_parsing: bytes) -> tuple[str, str | dict[str, str]] | None:
+    """
+    Parses a single raw email message and extracts materials according to its source.
+
+    :param email_for_parsing: raw email message as bytes
+    :return: tuple of material type and material:
+         - ('pytricks', code snippet string) for Real Python PyTricks
+         - ('articles', {'title': 'url'} dict) for Real Python articles or Python Weekly
+         or None if the email is not from known sources or nothing is found.
+    """
+    msg = BytesParser(policy=default).parsebytes(email_for_parsing)
+
+    if 'PyTricks' in msg['Subject']:
+        html_part = decode_email_html_part(msg)
+        if html_part:
+            pytrick = parse_html_with_real_python_pytrick(html_part)
+            if pytrick:
+                return 'pytricks', pytrick
+
+    elif msg['From'] == 'Real Python <info@realpython.com>':
+        html_part = decode_email_html_part(msg)
+        if html_part:
+            articles = parse_html_with_real_python_articles(html_part)
+            if articles:
+                return 'articles', articles
+
+    elif msg['From'] in ('Python Weekly <pythonweekly@mail.beehiiv.com>', 'Python Weekly <rahul@pythonweekly.com>'):
+        html_part = decode_email_html_part(msg)
+        if html_part:
+            articles = parse_html_with_python_weekly_articles(html_part)
+            if articles:
+                return 'articles', articles
+
+    return None
+
+
 def decode_email_html_part(message_object: email.message.EmailMessage) -> str | None:
     """
     Extracts and decodes the HTML part from an email message.
@@ -95,7 +171,7 @@ def parse_html_with_real_python_articles(html: str) -> dict[str, str]:
     :param html: the decoded HTML part of the email.
     :return: dict of {'article title': 'link to article'} pairs, or an empty dict if not found.
     """
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = make_soup(html, REAL_PYTHON_ARTICLES_TAGS)
     articles = {}
 
     article_headings = soup.find_all('h3', string=['New Tutorial', 'Updated Tutorial'])
@@ -122,7 +198,7 @@ def parse_html_with_real_python_pytrick(html: str) -> str:
     :param html: the decoded HTML part of the email.
     :return: the PyTrick code snippet, or an empty string if not found.
     """
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = make_soup(html, REAL_PYTHON_PYTRICK_TAGS)
     pytrick_content = ''
 
     pre_tag = soup.find('pre')
@@ -144,7 +220,8 @@ def parse_html_with_python_weekly_articles(html: str) -> dict[str, str]:
     :param html: the decoded HTML part of the email
     :return: dict of {'article title': 'link to article'} pairs, or an empty dict if not found.
     """
-    soup = BeautifulSoup(html, "html.parser")
+    # section boundaries are found by sibling <tr> rows, so the whole tree is needed
+    soup = make_soup(html)
     articles = {}
 
     start_td = soup.find("td", id="articles-tutorials-and-talks")
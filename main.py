@@ -1,15 +1,25 @@
 from processes.post_accumulation_process import is_time_to_add_post_texts, add_post_texts
+from processes.post_accumulation_pipeline import add_post_texts_streaming
 from processes.publication_scheduling_process import (is_time_to_schedule_next_week_publications,
                                                       schedule_next_week_publications)
 from processes.post_publication_process import is_time_to_publish_post, publish_post
+from processes.daemon_process import run_daemon
 from utils.logging_config import setup_logging, log_json, silence_third_party_logs
+from utils.metrics import setup_metrics_export
+from config import ACCUMULATION_PIPELINE_MODE, RUN_TIME_LIMIT_SECS
+import argparse
+import asyncio
 import logging
 import sys
+import time
 
 
 def run_post_accumulating() -> None:
     if is_time_to_add_post_texts():
-        add_post_texts()
+        if ACCUMULATION_PIPELINE_MODE.lower() == 'streaming':
+            add_post_texts_streaming()
+        else:
+            add_post_texts()
 
 
 def run_post_publication_scheduling() -> None:
@@ -17,9 +27,9 @@ def run_post_publication_scheduling() -> None:
         schedule_next_week_publications()
 
 
-def run_post_publishing() -> None:
+def run_post_publishing(deadline: float) -> None:
     if is_time_to_publish_post():
-        publish_post()
+        publish_post(deadline=deadline)
 
 
 def main() -> None:
@@ -27,20 +37,30 @@ def main() -> None:
     Orchestrates the main bot processes:
       1. Accumulates new post texts if time has come
       2. Schedules next week's publications if time has come
-      3. Publishes post if publication time has come
+      3. Publishes post if publication time has come, within RUN_TIME_LIMIT_SECS from the start
     """
+    run_deadline = time.monotonic() + RUN_TIME_LIMIT_SECS
     log_json('APP', 'info', 'APP has started work')
     run_post_accumulating()
     run_post_publication_scheduling()
-    run_post_publishing()
+    run_post_publishing(run_deadline)
     log_json('APP', 'info', 'APP has ended work')
 
 
 if __name__ == "__main__":
+    args_parser = argparse.ArgumentParser(description='Telegram channel admin bot')
+    args_parser.add_argument('--daemon', action='store_true',
+                             help='run continuously, firing processes right at their scheduled time')
+    args = args_parser.parse_args()
+
     try:
         setup_logging()
         silence_third_party_logs()
-        main()
+        setup_metrics_export()
+        if args.daemon:
+            asyncio.run(run_daemon())
+        else:
+            main()
         sys.exit(0)
     except Exception as e:
         logging.exception(f'Unexpected error:\n{e}')
@@ -6,106 +6,83 @@ from utils.logging_config import log_json
 LOGGER = 'POST INTRO SELECTION SUBPROCESS'
 
 
-def get_article_intro_phrase() -> str | None:
+def get_intro_phrases(articles_qty: int, pytricks_qty: int) -> tuple[list[str], list[str]] | None:
     """
-    Selects and returns an intro phrase for article posts with priority-based logic.
-
-    Uses a hierarchical selection system:
-      - First priority: 'hot' phrases (topical/trending content) - these are either moved to 'funny' category or
-        deleted after use based on 'move_to' flag
-      - Fallback: weighted random selection from 'usual' (70%) and 'funny' (30%) phrases.
-
-    :return: Selected intro phrase text, or None if DB connection fails.
+    Selects intro phrases for a whole batch of article and PyTricks posts in a single transaction.
+
+    All intro phrases are read with one query, and article phrases are selected by priority:
+      - First priority: 'hot' article phrases (topical/trending content), assigned in the order they were
+        added to DB. Every 'hot' phrase is used once: consumed phrases are either moved to their 'move_to'
+        category with a single UPDATE or deleted with a single DELETE. Phrases moved to 'funny' become
+        available for the rest of the batch.
+      - Remaining article posts get a weighted random selection from 'usual' (70%) and 'funny' (30%) phrases.
+      - PyTricks posts get a simple random selection from all PyTricks intro phrases.
+
+    :param articles_qty: number of article posts that need an intro phrase.
+    :param pytricks_qty: number of PyTricks posts that need an intro phrase.
+    :return: tuple of (article intro phrases list, PyTricks intro phrases list) with lengths equal to
+        `articles_qty` and `pytricks_qty` respectively, or None if DB connection fails.
     """
-    log_json(LOGGER, 'info', 'The subprocess is started', intro_type='for article')
+    log_json(LOGGER, 'info', 'The subprocess is started', intro_type='bulk',
+             articles_qty=articles_qty, pytricks_qty=pytricks_qty)
 
     with get_db_cursor() as cur:
         if cur:
             cur.execute(
                 """
-                SELECT id, intro_text, move_to FROM intro_phrases
-                WHERE intro_for='article' AND type='hot'                    
+                SELECT id, intro_text, intro_for, type, move_to FROM intro_phrases
+                ORDER BY id
                 """
             )
-            query_result = cur.fetchone()
-            if query_result:
-                intro_phrase = query_result['intro_text']
-                intro_id = query_result['id']
-                intro_move_to = query_result['move_to']
-
-                if intro_move_to:
-                    cur.execute(
-                        """
-                        UPDATE intro_phrases
-                        SET type=%s
-                        WHERE id=%s
-                        """,
-                        (intro_move_to, intro_id)
-                    )
-                else:
-                    cur.execute(
-                        """
-                        DELETE FROM intro_phrases
-                        WHERE id=%s
-                        """,
-                        (intro_id,)
-                    )
-
-                return intro_phrase
-
-            # if not hot intro phrases in DB
-            cur.execute(
-                """
-                SELECT intro_text, type FROM intro_phrases
-                WHERE intro_for='article' AND type IN ('usual', 'funny')                
-                """
-            )
-
             query_result = cur.fetchall()
-            intro_phrases = {'usual': [], 'funny': []}
+
+            hot_phrases = []
+            intro_phrases = {'usual': [], 'funny': [], 'pytricks': []}
             for elem in query_result:
-                if elem['type'] == 'usual':
-                    intro_phrases['usual'].append(elem['intro_text'])
+                if elem['intro_for'] == 'pytricks':
+                    intro_phrases['pytricks'].append(elem['intro_text'])
+                elif elem['type'] == 'hot':
+                    hot_phrases.append(elem)
                 else:
-                    intro_phrases['funny'].append(elem['intro_text'])
-
-            intro_phrase = random.choice(
-                random.choices((intro_phrases['usual'], intro_phrases['funny']), (0.7, 0.3))[0]
-            )
-
-            log_json(LOGGER, 'info', 'The subprocess is ended successfully', intro_type='for article')
-            return intro_phrase
-
-        else:
-            log_json(LOGGER, 'warning', 'The subprocess is failed', intro_type='for article',
-                     reason='DB connection/cursor creation failure')
-
-
-def get_pytrick_intro_phrase() -> str | None:
-    """
-    Selects and returns a random intro phrase for PyTricks posts.
-
-    Performs simple random selection from all available PyTricks intro phrases
-    without any priority system.
-
-    :return: Selected intro phrase text, or None if DB connection fails.
-    """
-    log_json(LOGGER, 'info', 'The subprocess is started', intro_type='for pytrick')
-
-    with get_db_cursor() as cur:
-        if cur:
-            cur.execute(
-                """
-                SELECT intro_text FROM intro_phrases
-                WHERE intro_for='pytricks'                    
-                """
-            )
-            query_result = cur.fetchall()
-            intro_phrase = random.choice(query_result)['intro_text']
-
-            log_json(LOGGER, 'info', 'The subprocess is ended successfully', intro_type='for pytrick')
-            return intro_phrase
+                    intro_phrases[elem['type']].append(elem['intro_text'])
+
+            consumed_hot_phrases = hot_phrases[:articles_qty]
+            article_intros = [elem['intro_text'] for elem in consumed_hot_phrases]
+
+            ids_to_move = [elem['id'] for elem in consumed_hot_phrases if elem['move_to']]
+            ids_to_delete = [elem['id'] for elem in consumed_hot_phrases if not elem['move_to']]
+            if ids_to_move:
+                cur.execute(
+                    """
+                    UPDATE intro_phrases
+                    SET type=move_to
+                    WHERE id = ANY(%s)
+                    """,
+                    (ids_to_move,)
+                )
+            if ids_to_delete:
+                cur.execute(
+                    """
+                    DELETE FROM intro_phrases
+                    WHERE id = ANY(%s)
+                    """,
+                    (ids_to_delete,)
+                )
+            for elem in consumed_hot_phrases:
+                if elem['move_to']:
+                    intro_phrases[elem['move_to']].append(elem['intro_text'])
+
+            for _ in range(articles_qty - len(article_intros)):
+                article_intros.append(random.choice(
+                    random.choices((intro_phrases['usual'], intro_phrases['funny']), (0.7, 0.3))[0]
+                ))
+
+            pytrick_intros = [random.choice(intro_phrases['pytricks']) for _ in range(pytricks_qty)]
+
+            log_json(LOGGER, 'info', 'The subprocess is ended successfully', intro_type='bulk',
+                     result={'Q-ty of used hot intro phrases': len(consumed_hot_phrases)})
+            return article_intros, pytrick_intros
 
         else:
-            log_json(LOGGER, 'warning', 'The subprocess is failed', intro_type='for pytrick',
+            log_json(LOGGER, 'warning', 'The subprocess is failed', intro_type='bulk',
                      reason='DB connection/cursor creation failure')
@@ -1,3 +1,6 @@
+import random
+from datetime import datetime
+from psycopg2.extras import execute_values
 from db_connector.db_cursor_creator import get_db_cursor
 from utils.logging_config import log_json
 
@@ -5,13 +8,21 @@ from utils.logging_config import log_json
 LOGGER_A = "ADDING POST TEXTS TO DB SUBPROCESS"
 LOGGER_M = "MOVING POST TEXTS TO \'CURRENT\' SUBPROCESS"
 LOGGER_G = "GETTING A POST TEXT FROM DB SUBPROCESS"
+LOGGER_C = "CHECKING STORED ARTICLE URLS SUBPROCESS"
+LOGGER_O = "CLAIMING A POST FOR OVERDUE SLOT SUBPROCESS"
+LOGGER_R = "RETURNING AN UNSENT POST TO \'CURRENT\' SUBPROCESS"
 
 
-def add_posts_to_next_batch(new_posts_list: list[str]) -> None:
+def add_posts_to_next_batch(new_posts_list: list[str], canonical_urls: list[str | None] | None = None) -> None:
     """
     Inserts a list of new posts into the database with `batch_type='next'`.
 
+    Posts with a canonical article URL already stored in 'posts' table are skipped
+    (the unique index on `canonical_url` guards against duplicates from concurrent runs as well).
+
     :param new_posts_list: A list of post texts to be inserted.
+    :param canonical_urls: canonical URLs of articles the posts are made of, in the same order
+        as post texts (None for PyTricks posts), or None if unknown.
     :return: None
     """
     log_json(LOGGER_A, 'info', 'The subprocess is started')
@@ -19,21 +30,60 @@ def add_posts_to_next_batch(new_posts_list: list[str]) -> None:
     with get_db_cursor() as cur:
         if cur:
             if new_posts_list:
-                values_to_insert = [(new_post, 'next', None) for new_post in new_posts_list]
-                cur.executemany(
+                if canonical_urls is None:
+                    canonical_urls = [None] * len(new_posts_list)
+                values_to_insert = [(new_post, 'next', None, canonical_url)
+                                    for new_post, canonical_url in zip(new_posts_list, canonical_urls)]
+                inserted_rows = execute_values(
+                    cur,
                     """
-                    INSERT INTO posts(text, batch_type, publication_time)
-                    VALUES(%s, %s, %s)                
+                    INSERT INTO posts(text, batch_type, publication_time, canonical_url)
+                    VALUES %s
+                    ON CONFLICT (canonical_url) WHERE canonical_url IS NOT NULL DO NOTHING
+                    RETURNING id
                     """,
-                    values_to_insert
+                    values_to_insert,
+                    fetch=True
                 )
                 log_json(LOGGER_A, 'info', 'The subprocess is ended successfully',
-                         result={'Q-ty of added post texts': len(values_to_insert)})
+                         result={'Q-ty of added post texts': len(inserted_rows),
+                                 'Q-ty of skipped duplicate post texts': len(values_to_insert) - len(inserted_rows)})
         else:
             log_json(LOGGER_A, 'info', 'The subprocess is failed',
                      reason='DB connection/cursor creation failure')
 
 
+def get_existing_canonical_urls(canonical_urls: list[str]) -> set[str]:
+    """
+    Finds which of the given canonical article URLs belong to already stored posts (in any batch).
+
+    :param canonical_urls: canonical article URLs to check.
+    :return: set of already stored canonical URLs, or an empty set if DB connection fails.
+    """
+    if not canonical_urls:
+        return set()
+
+    log_json(LOGGER_C, 'info', 'The subprocess is started')
+
+    with get_db_cursor() as cur:
+        if cur:
+            cur.execute(
+                """
+                SELECT canonical_url FROM posts
+                WHERE canonical_url = ANY(%s)
+                """,
+                (list(canonical_urls),)
+            )
+            stored_urls = {row['canonical_url'] for row in cur.fetchall()}
+            log_json(LOGGER_C, 'info', 'The subprocess is ended successfully',
+                     result={'Q-ty of already stored URLs': len(stored_urls)})
+            return stored_urls
+        else:
+            log_json(LOGGER_C, 'warning', 'The subprocess is failed',
+                     reason='DB connection/cursor creation failure')
+    return set()
+
+
 def move_posts_to_current_batch() -> int | None:
     """
     Moves all posts from `batch_type='next'` to `batch_type='current'`.
@@ -75,7 +125,9 @@ def get_post_from_current_batch() -> str | None:
     marks it as published, and removes one corresponding entry from the publication schedule.
 
     Behavior:
-      - A post is selected randomly from the 'current' batch.
+      - A post is selected randomly from the 'current' batch: the first post whose `random_key`
+        (assigned at insert time) follows a random point, so the lookup is an index scan
+        instead of sorting the whole batch.
       - The selected post is marked as published (`batch_type='published'`) and its
         `publication_time` is set to the current timestamp.
       - One record from the schedule table (the earliest with `publication_time <= NOW()`)
@@ -93,14 +145,22 @@ def get_post_from_current_batch() -> str | None:
 
     with get_db_cursor() as cur:
         if cur:
+            # random point on 'random_key' scale, wrapping around to the lowest key if nothing is above it;
+            # both branches are served by the partial index on 'current' batch
             cur.execute(
                 """
-                SELECT id, text FROM posts
-                WHERE batch_type=%s
-                ORDER BY RANDOM()
-                LIMIT 1 
+                (SELECT id, text FROM posts
+                WHERE batch_type=%(batch_type)s AND random_key >= %(random_point)s
+                ORDER BY random_key
+                LIMIT 1)
+                UNION ALL
+                (SELECT id, text FROM posts
+                WHERE batch_type=%(batch_type)s
+                ORDER BY random_key
+                LIMIT 1)
+                LIMIT 1
                 """,
-                ('current',)
+                {'batch_type': 'current', 'random_point': random.random()}
             )
 
             query_result = cur.fetchone()
@@ -137,3 +197,111 @@ def get_post_from_current_batch() -> str | None:
             log_json(LOGGER_G, 'info', 'The subprocess is failed',
                      reason='DB connection/cursor creation failure')
     return post_text
+
+
+def claim_post_for_overdue_slot() -> dict | None:
+    """
+    Atomically claims the earliest past-due schedule slot together with a random post from the current batch,
+    for catch-up publishing: the slot is deleted and the post is marked as published.
+
+    Unlike `get_post_from_current_batch()`, a slot locked by a concurrent run is skipped, and no post is taken
+    if there isn't an overdue slot, so concurrent runs never publish more posts than slots are due.
+    Claiming one post at a time right before its sending keeps unsent posts in the batch if the run is stopped.
+
+    :return: dict with 'id' and 'text' of the post and 'slot_time' of the deleted slot (for
+        `return_post_to_current_batch()`), or None if there isn't an overdue slot, a post or DB connection.
+    """
+    log_json(LOGGER_O, 'info', 'The subprocess is started')
+
+    with get_db_cursor() as cur:
+        if cur:
+            cur.execute(
+                """
+                SELECT id, publication_time
+                FROM schedule
+                WHERE publication_time <= NOW()
+                ORDER BY publication_time ASC
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+                """
+            )
+            slot = cur.fetchone()
+            if not slot:
+                log_json(LOGGER_O, 'info', 'The subprocess is terminated', reason='No overdue schedule slots')
+                return None
+
+            cur.execute(
+                """
+                (SELECT id, text FROM posts
+                WHERE batch_type=%(batch_type)s AND random_key >= %(random_point)s
+                ORDER BY random_key
+                LIMIT 1)
+                UNION ALL
+                (SELECT id, text FROM posts
+                WHERE batch_type=%(batch_type)s
+                ORDER BY random_key
+                LIMIT 1)
+                LIMIT 1
+                """,
+                {'batch_type': 'current', 'random_point': random.random()}
+            )
+            post = cur.fetchone()
+            if not post:
+                log_json(LOGGER_O, 'critical', 'The subprocess is terminated',
+                         reason='Unexpectedly no posts in \'current\' batch')
+                return None
+
+            cur.execute(
+                """
+                UPDATE posts
+                SET batch_type=%s, publication_time=NOW()
+                WHERE id=%s
+                """,
+                ('published', post['id'])
+            )
+            cur.execute(
+                """
+                DELETE FROM schedule
+                WHERE id=%s
+                """,
+                (slot['id'],)
+            )
+            log_json(LOGGER_O, 'info', 'The subprocess is ended successfully')
+            return {'id': post['id'], 'text': post['text'], 'slot_time': slot['publication_time']}
+
+        else:
+            log_json(LOGGER_O, 'info', 'The subprocess is failed',
+                     reason='DB connection/cursor creation failure')
+    return None
+
+
+def return_post_to_current_batch(post_id: int, slot_time: datetime) -> None:
+    """
+    Reverts `claim_post_for_overdue_slot()` for a post that wasn't sent: the post is moved back
+    to the current batch and its schedule slot is restored, so a later run publishes it.
+
+    :param post_id: id of the claimed post.
+    :param slot_time: publication time of the claimed schedule slot.
+    :return: None
+    """
+    with get_db_cursor() as cur:
+        if cur:
+            cur.execute(
+                """
+                UPDATE posts
+                SET batch_type=%s, publication_time=NULL
+                WHERE id=%s
+                """,
+                ('current', post_id)
+            )
+            cur.execute(
+                """
+                INSERT INTO schedule(publication_time)
+                VALUES(%s)
+                """,
+                (slot_time,)
+            )
+            log_json(LOGGER_R, 'info', 'The subprocess is ended successfully', post_id=post_id)
+        else:
+            log_json(LOGGER_R, 'critical', 'The subprocess is failed', post_id=post_id,
+                     reason='DB connection/cursor creation failure')
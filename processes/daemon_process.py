@@ -0,0 +1,228 @@
+import asyncio
+import signal
+from datetime import datetime, timedelta, time
+from processes.post_accumulation_process import add_post_texts
+from processes.post_accumulation_pipeline import add_post_texts_streaming
+from processes.publication_scheduling_process import (is_time_to_schedule_next_week_publications,
+                                                      schedule_next_week_publications)
+from processes.post_publication_process import (is_time_to_publish_post, publish_next_post, publish_overdue_posts,
+                                                get_publication_times)
+from scheduler.timer_heap import TimerHeap
+from db_connector.notification_listener import NotificationListener, FALLBACK_POLL_PAYLOAD
+from utils.logging_config import log_json
+from config import (TZ, MORNING_TIME_TO_CHECK_EMAIL, EVENING_TIME_TO_CHECK_EMAIL, DELTA, ACCUMULATION_PIPELINE_MODE,
+                    WEEKDAY_TO_CREATE_NEW_SCHEDULE, DAEMON_SCHEDULE_RELOAD_SECS, CATCH_UP_PUBLISHING,
+                    CATCH_UP_MIN_SPACING_SECS)
+
+
+LOGGER = 'DAEMON PROCESS'
+
+# kinds of timer heap events
+PUBLICATION = 'publication'
+ACCUMULATION = 'accumulation'
+WEEKLY_SCHEDULING = 'weekly_scheduling'
+SCHEDULE_RELOAD = 'schedule_reload'
+# not a timer heap event: schedule reload requested by a DB notification
+SCHEDULE_CHANGE = 'schedule_change'
+
+# how often weekly scheduling is retried on its weekday while the current schedule isn't exhausted
+WEEKLY_SCHEDULING_RECHECK = timedelta(minutes=30)
+
+
+def next_daily_time(day_time: time, now: datetime, grace: timedelta = timedelta(0)) -> datetime:
+    """
+    :param day_time: time of day in TZ timezone.
+    :param now: current timezone-aware datetime.
+    :param grace: how long after `day_time` it's still considered due today.
+    :return: today's `day_time` if it hasn't passed (including the grace period), tomorrow's one otherwise.
+    """
+    today_time = datetime.combine(now.date(), day_time, tzinfo=TZ)
+    if now < today_time + grace:
+        return today_time
+    return datetime.combine(now.date() + timedelta(days=1), day_time, tzinfo=TZ)
+
+
+def next_weekday_start(weekday: int, now: datetime) -> datetime:
+    """
+    :param weekday: ISO day of week (Monday - 1, ..., Sunday - 7).
+    :param now: current timezone-aware datetime.
+    :return: `now` if it's the weekday today, start of the nearest such weekday otherwise.
+    """
+    if now.isoweekday() == weekday:
+        return now
+    days_ahead = (weekday - now.isoweekday()) % 7
+    return datetime.combine(now.date() + timedelta(days=days_ahead), time(0, 0), tzinfo=TZ)
+
+
+class BotDaemon:
+    """
+    Long-running replacement of the cron-driven `main()`: all bot processes are fired from a single
+    timer heap (see 'scheduler/timer_heap.py' module) and the event loop sleeps exactly until the next event.
+
+    Events:
+        - publication: one per row of the `schedule` table, re-read periodically and after weekly scheduling;
+          posts are published right at their scheduled time, without the random pause of the cron mode,
+          overdue ones (e.g. after downtime) at least CATCH_UP_MIN_SPACING_SECS apart
+        - accumulation: at MORNING_TIME_TO_CHECK_EMAIL and EVENING_TIME_TO_CHECK_EMAIL every day
+        - weekly scheduling: on WEEKDAY_TO_CREATE_NEW_SCHEDULE day, rechecked until the schedule is created
+        - schedule reload: every DAEMON_SCHEDULE_RELOAD_SECS, a safety net for schedule changes made outside the daemon
+
+    The schedule is also reloaded as soon as the `schedule` table changes, on DB notifications
+    (see 'db_connector/notification_listener.py' module); bursts of notifications cause a single reload.
+    Blocking processes run in worker threads; processes of the same kind never overlap.
+    """
+
+    def __init__(self) -> None:
+        self.timers = TimerHeap()
+        self._locks = {kind: asyncio.Lock()
+                       for kind in (PUBLICATION, ACCUMULATION, WEEKLY_SCHEDULING, SCHEDULE_RELOAD, SCHEDULE_CHANGE)}
+        self._tasks = set()
+        self._stopping = False
+        self._schedule_change_pending = False
+
+    async def run(self) -> None:
+        """
+        Runs the daemon until `stop()` is called, then waits for running processes to finish.
+
+        :return: None
+        """
+        log_json(LOGGER, 'info', 'The process is started')
+
+        now = datetime.now(tz=TZ)
+        await self.reload_publications()
+        for day_time in (MORNING_TIME_TO_CHECK_EMAIL, EVENING_TIME_TO_CHECK_EMAIL):
+            self.timers.push(next_daily_time(day_time, now, DELTA), ACCUMULATION, day_time)
+        self.timers.push(next_weekday_start(WEEKDAY_TO_CREATE_NEW_SCHEDULE, now), WEEKLY_SCHEDULING)
+        self.timers.push(now + timedelta(seconds=DAEMON_SCHEDULE_RELOAD_SECS), SCHEDULE_RELOAD)
+        listener_task = asyncio.create_task(NotificationListener(self._on_table_change).run())
+
+        while not self._stopping:
+            for due_time, kind, payload in await self.timers.pop_due():
+                lateness_secs = round((datetime.now(tz=TZ) - due_time).total_seconds(), 3)
+                log_json(LOGGER, 'debug', 'The event is due', kind=kind, due_time=f'{due_time}',
+                         lateness_secs=lateness_secs)
+                self._start(kind, payload)
+
+        listener_task.cancel()
+        await asyncio.gather(listener_task, return_exceptions=True)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        log_json(LOGGER, 'info', 'The process is ended')
+
+    def stop(self) -> None:
+        """
+        Makes `run()` return once running processes finish; no new events are fired.
+
+        :return: None
+        """
+        log_json(LOGGER, 'info', 'Stopping is requested')
+        self._stopping = True
+        self.timers.wake_up()
+
+    def _start(self, kind: str, payload: time | None) -> None:
+        handlers = {
+            PUBLICATION: self._publish_due_posts,
+            ACCUMULATION: lambda: self._accumulate(payload),
+            WEEKLY_SCHEDULING: self._schedule_next_week,
+            SCHEDULE_RELOAD: self._reload_periodically,
+            SCHEDULE_CHANGE: self._reload_on_change,
+        }
+        task = asyncio.create_task(self._run_locked(kind, handlers[kind]))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_locked(self, kind: str, handler: callable) -> None:
+        async with self._locks[kind]:
+            try:
+                await handler()
+            except Exception as e:
+                log_json(LOGGER, 'error', 'The event handling is failed', kind=kind, reason='Unexpected error',
+                         error=f'{e}')
+
+    async def reload_publications(self) -> None:
+        """
+        Replaces publication events in the timer heap with the current content of the `schedule` table.
+
+        :return: None
+        """
+        publication_times = await asyncio.to_thread(get_publication_times)
+        self.timers.remove_kind(PUBLICATION)
+        for publication_time in publication_times:
+            self.timers.push(publication_time, PUBLICATION)
+        log_json(LOGGER, 'info', 'The schedule is loaded', result={'Q-ty of publications': len(publication_times)})
+
+    async def _on_table_change(self, payload: str) -> None:
+        if self._stopping:
+            return
+        if payload.startswith('schedule:') or payload == FALLBACK_POLL_PAYLOAD:
+            if not self._schedule_change_pending:
+                self._schedule_change_pending = True
+                self._start(SCHEDULE_CHANGE, None)
+        if payload == 'schedule:DELETE' and datetime.now(tz=TZ).isoweekday() == WEEKDAY_TO_CREATE_NEW_SCHEDULE:
+            # the last publication of the week may have emptied the schedule
+            self.timers.push(datetime.now(tz=TZ), WEEKLY_SCHEDULING)
+
+    async def _reload_on_change(self) -> None:
+        # changes notified from now on need another reload, earlier ones are covered by this one
+        self._schedule_change_pending = False
+        await self.reload_publications()
+
+    async def _publish_due_posts(self) -> None:
+        # every schedule row has its own event, so a single post is published per event;
+        # events left by an outdated heap find nothing due
+        if CATCH_UP_PUBLISHING:
+            await publish_overdue_posts()
+        elif await asyncio.to_thread(is_time_to_publish_post):
+            if await publish_next_post():
+                log_json(LOGGER, 'info', 'The post is published')
+        if await asyncio.to_thread(is_time_to_publish_post):
+            # slots still overdue (e.g. after downtime, or returned with undelivered posts) have their events
+            # already due, so the next publication waits here, holding the publication lock
+            await asyncio.sleep(CATCH_UP_MIN_SPACING_SECS)
+
+    async def _accumulate(self, day_time: time) -> None:
+        try:
+            if ACCUMULATION_PIPELINE_MODE.lower() == 'streaming':
+                await asyncio.to_thread(add_post_texts_streaming)
+            else:
+                await asyncio.to_thread(add_post_texts)
+        finally:
+            self.timers.push(next_daily_time(day_time, datetime.now(tz=TZ)), ACCUMULATION, day_time)
+
+    async def _schedule_next_week(self) -> None:
+        scheduled = False
+        try:
+            if await asyncio.to_thread(is_time_to_schedule_next_week_publications):
+                await asyncio.to_thread(schedule_next_week_publications)
+                scheduled = True
+                await self.reload_publications()
+        finally:
+            # replaces the event pushed on a schedule change notification, if any, so there's a single recheck chain
+            self.timers.remove_kind(WEEKLY_SCHEDULING)
+            now = datetime.now(tz=TZ)
+            if not scheduled and now.isoweekday() == WEEKDAY_TO_CREATE_NEW_SCHEDULE:
+                self.timers.push(now + WEEKLY_SCHEDULING_RECHECK, WEEKLY_SCHEDULING)
+            else:
+                self.timers.push(next_weekday_start(WEEKDAY_TO_CREATE_NEW_SCHEDULE, now + timedelta(days=1)),
+                                 WEEKLY_SCHEDULING)
+
+    async def _reload_periodically(self) -> None:
+        try:
+            await self.reload_publications()
+        finally:
+            self.timers.push(datetime.now(tz=TZ) + timedelta(seconds=DAEMON_SCHEDULE_RELOAD_SECS), SCHEDULE_RELOAD)
+
+
+async def run_daemon() -> None:
+    """
+    Runs the bot as a long-running process (see `BotDaemon`), stopped gracefully by SIGINT or SIGTERM.
+
+    :return: None
+    """
+    daemon = BotDaemon()
+
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signal_number, daemon.stop)
+
+    await daemon.run()
@@ -0,0 +1,243 @@
+import asyncio
+import time
+from config import ACCUMULATION_PIPELINE_QUEUE_SIZE
+from email_reader.email_handler import fetch_unseen_emails
+from email_reader.material_sources_extractor import email_parser
+from summarizer.redirect_url_resolver import retry_resolve_urls
+from summarizer.url_deduplicator import deduplicate_articles
+from summarizer.article_summary_generator import summarize_material, create_generator
+from post_storage.pg_storage_manager import add_posts_to_next_batch
+from processes.post_accumulation_process import compile_post_texts, get_post_canonical_urls
+from utils.logging_config import log_json
+
+
+LOGGER = 'POST TEXTS ACCUMULATION PIPELINE PROCESS'
+
+# marks the end of the items stream in a queue
+_END_OF_STREAM = object()
+
+
+class StageTimer:
+    """
+    Collects wall time, busy time and processed items q-ty of a single pipeline stage.
+
+    Wall time is measured from the stage start to its end, busy time is the sum of
+    durations of the blocking work done by the stage (its idle waiting for upstream items
+    is excluded).
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.items = 0
+        self.busy_secs = 0.0
+        self._started = None
+        self._ended = None
+
+    def start(self) -> None:
+        self._started = time.monotonic()
+
+    def end(self) -> None:
+        self._ended = time.monotonic()
+
+    async def run_blocking(self, func, *args):
+        """
+        Runs a blocking function in a worker thread, adding its duration to the stage busy time.
+        """
+        started = time.monotonic()
+        try:
+            return await asyncio.to_thread(func, *args)
+        finally:
+            self.busy_secs += time.monotonic() - started
+
+    def summary(self) -> dict[str, float | int]:
+        wall_secs = (self._ended or time.monotonic()) - (self._started or time.monotonic())
+        return {'wall_secs': round(wall_secs, 2), 'busy_secs': round(self.busy_secs, 2), 'items': self.items}
+
+
+async def _fetch_stage(output_queue: asyncio.Queue, timer: StageTimer) -> None:
+    timer.start()
+    try:
+        raw_messages = await timer.run_blocking(fetch_unseen_emails)
+        for raw_message in raw_messages:
+            timer.items += 1
+            await output_queue.put(raw_message)
+        await output_queue.put(_END_OF_STREAM)
+    finally:
+        timer.end()
+
+
+async def _parse_stage(input_queue: asyncio.Queue, output_queue: asyncio.Queue, timer: StageTimer) -> None:
+    timer.start()
+    # article titles are unique keys within a run, as in `email_parser()` output
+    seen_titles = set()
+    try:
+        while (raw_message := await input_queue.get()) is not _END_OF_STREAM:
+            material_sources = await timer.run_blocking(email_parser, [raw_message])
+            for title, url in material_sources['articles'].items():
+                if title not in seen_titles:
+                    seen_titles.add(title)
+                    timer.items += 1
+                    await output_queue.put(('articles', (title, url)))
+            for snippet in material_sources['pytricks']:
+                timer.items += 1
+                await output_queue.put(('pytricks', snippet))
+        await output_queue.put(_END_OF_STREAM)
+    finally:
+        timer.end()
+
+
+async def _resolve_stage(input_queue: asyncio.Queue, output_queue: asyncio.Queue, timer: StageTimer) -> None:
+    """
+    Resolves article URLs in micro-batches of all articles waiting in the input queue,
+    so a resolver (browser) launch is shared by items that arrived together. Resolved duplicate articles
+    (by canonical URL, within the run and already stored posts) are dropped. PyTricks are passed through.
+    """
+    timer.start()
+    end_of_stream = False
+    seen_canonical_urls = set()
+    try:
+        while not end_of_stream:
+            items = [await input_queue.get()]
+            while not input_queue.empty():
+                items.append(input_queue.get_nowait())
+            if items[-1] is _END_OF_STREAM:
+                end_of_stream = True
+                items.pop()
+
+            articles = {}
+            for material_type, material in items:
+                if material_type == 'articles':
+                    articles[material[0]] = material[1]
+                else:
+                    await output_queue.put((material_type, material))
+
+            if articles:
+                resolved = await timer.run_blocking(retry_resolve_urls, {'pytricks': [], 'articles': articles})
+                unique = await timer.run_blocking(deduplicate_articles, resolved, seen_canonical_urls)
+                for title, url in unique['articles'].items():
+                    timer.items += 1
+                    await output_queue.put(('articles', (title, url)))
+        await output_queue.put(_END_OF_STREAM)
+    finally:
+        timer.end()
+
+
+async def _summarize_stage(input_queue: asyncio.Queue, output_queue: asyncio.Queue, timer: StageTimer) -> None:
+    """
+    Summarizes materials in micro-batches of all materials waiting in the input queue, so they can share
+    concurrent Gemini requests (see `summarize_material()`). Gemini quota waits happen in a worker thread,
+    so they don't block other stages. Micro-batches share a model fallback generator, so a model exhausted
+    by one of them isn't requested by the next ones.
+    """
+    timer.start()
+    end_of_stream = False
+    generator = None
+    try:
+        while not end_of_stream:
+            items = [await input_queue.get()]
+            while not input_queue.empty():
+                items.append(input_queue.get_nowait())
+            if items[-1] is _END_OF_STREAM:
+                end_of_stream = True
+                items.pop()
+            if not items:
+                continue
+
+            materials = {'pytricks': [], 'articles': {}}
+            for material_type, material in items:
+                if material_type == 'articles':
+                    materials['articles'][material[0]] = material[1]
+                else:
+                    materials['pytricks'].append(material)
+
+            generator = generator or create_generator()
+            summaries = await timer.run_blocking(summarize_material, materials, generator)
+            for material_type in ('articles', 'pytricks'):
+                for summary in summaries.get(material_type, []):
+                    timer.items += 1
+                    await output_queue.put((material_type, summary))
+        await output_queue.put(_END_OF_STREAM)
+    finally:
+        timer.end()
+
+
+async def _compile_stage(input_queue: asyncio.Queue, timer: StageTimer) -> tuple[list[str], list[str | None]]:
+    """
+    Collects summarized materials and compiles post texts once the stream has ended,
+    since intro phrases for the whole run are selected with a single bulk DB request.
+    """
+    timer.start()
+    post_elements = {'articles': [], 'pytricks': []}
+    try:
+        while (item := await input_queue.get()) is not _END_OF_STREAM:
+            material_type, summary = item
+            post_elements[material_type].append(summary)
+
+        post_texts = []
+        if post_elements['articles'] or post_elements['pytricks']:
+            post_texts = await timer.run_blocking(compile_post_texts, post_elements)
+            timer.items = len(post_texts)
+        return post_texts, get_post_canonical_urls(post_elements)
+    finally:
+        timer.end()
+
+
+async def run_streaming_pipeline() -> tuple[list[str], list[str | None]]:
+    """
+    Runs post accumulation stages concurrently, connected by bounded queues.
+
+    Stages (fetch -> parse -> resolve -> summarize -> compile) pass materials downstream one by one,
+    so e.g. the first article is summarized while the following ones are still being resolved, and
+    URL resolution keeps going while summarization waits for the Gemini quota. Blocking stage work
+    is executed in worker threads. Queue size is set by ACCUMULATION_PIPELINE_QUEUE_SIZE constant
+    in 'config.py' module.
+
+    If a stage fails, the other stages are cancelled and the stage exception is raised.
+
+    :return: tuple of (compiled post texts, canonical article URLs of the posts, see `get_post_canonical_urls()`).
+    """
+    queues = [asyncio.Queue(maxsize=ACCUMULATION_PIPELINE_QUEUE_SIZE) for _ in range(4)]
+    timers = [StageTimer(name) for name in ('fetch', 'parse', 'resolve', 'summarize', 'compile')]
+
+    stages = [
+        asyncio.create_task(_fetch_stage(queues[0], timers[0])),
+        asyncio.create_task(_parse_stage(queues[0], queues[1], timers[1])),
+        asyncio.create_task(_resolve_stage(queues[1], queues[2], timers[2])),
+        asyncio.create_task(_summarize_stage(queues[2], queues[3], timers[3])),
+        asyncio.create_task(_compile_stage(queues[3], timers[4])),
+    ]
+
+    try:
+        *_, (post_texts, canonical_urls) = await asyncio.gather(*stages)
+    except BaseException:
+        # a failed stage never ends its stream, so its neighbours would wait for it (or for a free queue slot)
+        # forever
+        for stage in stages:
+            stage.cancel()
+        await asyncio.gather(*stages, return_exceptions=True)
+        raise
+    finally:
+        log_json(LOGGER, 'info', 'Pipeline stages timing',
+                 stage_timings={timer.name: timer.summary() for timer in timers})
+
+    return post_texts, canonical_urls
+
+
+def add_post_texts_streaming() -> None:
+    """
+    Streaming alternative to `add_post_texts()`: accumulates new posts by running
+    the pipeline stages concurrently (see `run_streaming_pipeline()`) and stores
+    completed posts in database for future publication.
+
+    :return: None
+    """
+    log_json(LOGGER, 'info', 'The process is started')
+
+    post_texts, canonical_urls = asyncio.run(run_streaming_pipeline())
+    if not post_texts:
+        log_json(LOGGER, 'info', 'The process is terminated', reason='No post texts are compiled')
+        return
+
+    add_posts_to_next_batch(post_texts, canonical_urls)
+
+    log_json(LOGGER, 'info', 'The process is ended')
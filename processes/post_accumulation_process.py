@@ -3,11 +3,12 @@ from config import TZ, MORNING_TIME_TO_CHECK_EMAIL, EVENING_TIME_TO_CHECK_EMAIL,
 from email_reader.email_handler import fetch_unseen_emails
 from email_reader.material_sources_extractor import email_parser
 from summarizer.redirect_url_resolver import retry_resolve_urls
+from summarizer.url_deduplicator import deduplicate_articles, canonicalize_url
 from summarizer.article_summary_generator import summarize_material
 from post_compiler.text_compiler import compile_post_text
-from post_compiler.intro_selector_from_pg import get_article_intro_phrase, get_pytrick_intro_phrase
+from post_compiler.intro_selector_from_pg import get_intro_phrases
 from post_storage.pg_storage_manager import add_posts_to_next_batch
-from utils.logging_config import log_json
+from utils.logging_config import log_json, log_span
 
 
 LOGGER = 'POST TEXTS ACCUMULATION PROCESS'
@@ -45,9 +46,10 @@ def add_post_texts() -> None:
         1. Fetches unseen emails from configured sources
         2. Extracts materials (articles and PyTricks) from email content
         3. Resolves final URLs for extracted articles (handles JS-redirects)
-        4. Generates AI summaries and tags for all materials
-        5. Creates formatted post texts with appropriate intro phrases
-        6. Stores completed posts in database for future publication
+        4. Drops duplicate articles by canonical URL (within the run and already stored posts)
+        5. Generates AI summaries and tags for all materials
+        6. Creates formatted post texts with appropriate intro phrases (selected for all posts at once)
+        7. Stores completed posts in database for future publication
 
     The function implements fail-fast logic - if any step returns empty results,
     the pipeline terminates early. Different intro phrases are selected based on
@@ -75,25 +77,58 @@ def add_post_texts() -> None:
                  reason='No URLs are resolved for further processing by LLM')
         return
 
-    post_elements = summarize_material(extracted_materials_with_resolved_urls)
+    unique_materials = deduplicate_articles(extracted_materials_with_resolved_urls)
+    if not unique_materials.get('articles') and not unique_materials.get('pytricks'):
+        log_json(LOGGER, 'info', 'The process is terminated',
+                 reason='All extracted articles are duplicates, no PyTricks are extracted')
+        return
+
+    post_elements = summarize_material(unique_materials)
     if not post_elements:
         log_json(LOGGER, 'info', 'The process is terminated',
                  reason='LLM didn\'t generate summary and tags for none of the provided URLs')
         return
 
-    post_texts = []
-    for material_type, material_type_samples in post_elements.items():
-        if material_type == 'articles':
-            for text_elements in material_type_samples:
-                intro_phrase = get_article_intro_phrase()
-                post_text = compile_post_text(text_elements, intro_phrase if intro_phrase else '')
-                post_texts.append(post_text)
-        else:
-            for text_elements in material_type_samples:
-                intro_phrase = get_pytrick_intro_phrase()
-                post_text = compile_post_text(text_elements, intro_phrase if intro_phrase else '')
-                post_texts.append(post_text)
-
-    add_posts_to_next_batch(post_texts)
+    post_texts = compile_post_texts(post_elements)
+    add_posts_to_next_batch(post_texts, get_post_canonical_urls(post_elements))
 
     log_json(LOGGER, 'info', 'The process is ended')
+
+
+@log_span(LOGGER, 'compile')
+def compile_post_texts(post_elements: dict[str, list[dict[str, str]]]) -> list[str]:
+    """
+    Creates formatted post texts for all summarized materials.
+
+    Intro phrases for all article and PyTricks posts are selected with a single bulk DB request.
+    If intro phrases can't be selected (DB connection failure), posts are compiled with empty intros.
+
+    :param post_elements: dictionary with 'articles' and/or 'pytricks' keys and lists of
+        summarized materials as values, typically from `summarize_material()`.
+    :return: list of compiled post texts, articles first.
+    """
+    articles = post_elements.get('articles', [])
+    pytricks = post_elements.get('pytricks', [])
+
+    intro_phrases = get_intro_phrases(len(articles), len(pytricks))
+    article_intros, pytrick_intros = intro_phrases if intro_phrases else ([''] * len(articles),
+                                                                         [''] * len(pytricks))
+
+    post_texts = []
+    for text_elements, intro_phrase in zip(articles, article_intros):
+        post_texts.append(compile_post_text(text_elements, intro_phrase))
+    for text_elements, intro_phrase in zip(pytricks, pytrick_intros):
+        post_texts.append(compile_post_text(text_elements, intro_phrase))
+
+    return post_texts
+
+
+def get_post_canonical_urls(post_elements: dict[str, list[dict[str, str]]]) -> list[str | None]:
+    """
+    Gets canonical article URLs of posts in the order of `compile_post_texts()` output.
+
+    :param post_elements: see `compile_post_texts()`.
+    :return: list of canonical URLs for article posts followed by None for each PyTricks post.
+    """
+    return ([canonicalize_url(article['url']) for article in post_elements.get('articles', [])] +
+            [None] * len(post_elements.get('pytricks', [])))
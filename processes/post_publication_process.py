@@ -1,15 +1,25 @@
-from time import sleep
+from time import sleep, monotonic
+from datetime import datetime, timedelta
 from random import randint, choices
 from db_connector.db_cursor_creator import get_db_cursor
-from post_storage.pg_storage_manager import get_post_from_current_batch
+from post_storage.pg_storage_manager import (get_post_from_current_batch, claim_post_for_overdue_slot,
+                                             return_post_to_current_batch)
+from telegram.error import RetryAfter
 from telegram_poster.admin_bot import post_to_telegram_channel
 import asyncio
 from utils.logging_config import log_json
-from config import TIME_PERIODS_IN_SECS, PROBABILITIES
+from config import (TIME_PERIODS_IN_SECS, PROBABILITIES, CATCH_UP_PUBLISHING, CATCH_UP_MIN_SPACING_SECS,
+                    CATCH_UP_MAX_POSTS)
 
 
 LOGGER = "POST PUBLICATION PROCESS"
 
+# max q-ty of sending attempts of a post hitting Telegram flood control
+MAX_SEND_ATTEMPTS = 3
+# time reserved for a single sending (including Telegram request timeouts) when fitting catch-up into a deadline
+SEND_TIME_RESERVE_SECS = 30
+
+
 def is_time_to_publish_post() -> bool:
     """
     Checks if there is at least one past datetime in the schedule table.
@@ -37,7 +47,26 @@ def is_time_to_publish_post() -> bool:
     return False
 
 
-def publish_post() -> None:
+def get_overdue_slots_qty() -> int:
+    """
+    Counts past datetimes in the schedule table.
+
+    :return: q-ty of overdue publications, 0 in case of DB connection failure.
+    """
+    with get_db_cursor() as cur:
+        if cur:
+            cur.execute(
+                """
+                SELECT COUNT(*) AS overdue_qty
+                FROM schedule
+                WHERE publication_time <= NOW()
+                """
+            )
+            return cur.fetchone()['overdue_qty']
+    return 0
+
+
+def publish_post(deadline: float | None = None) -> None:
     """
     Publishes a post to Telegram channel with randomized timing to simulate human behavior.
 
@@ -51,27 +80,158 @@ def publish_post() -> None:
         3. Publishes the post to configured Telegram channel
         4. Handles publication errors with basic logging
 
+    If CATCH_UP_PUBLISHING constant set in 'config.py' module is on, steps 2-3 are done for every
+    overdue schedule entry (see `publish_overdue_posts()`), so missed runs don't delay the schedule;
+    the delay is skipped if more than one entry is overdue.
+
     If no posts are available in current batch, returns early without action.
 
+    :param deadline: `time.monotonic()` value the run must end by: the delay is cut to fit into it,
+        and catch-up publishing leaves the rest of overdue entries for the next run; None - no limit.
     :return: None
     """
     log_json(LOGGER, 'info', 'The process is started')
 
-    delays = [randint(*period) for period in TIME_PERIODS_IN_SECS]
-    pause_in_secs = choices(delays, weights=PROBABILITIES)[0]
-    log_json(LOGGER, 'debug', 'The process is on pause', pause_in_secs=pause_in_secs,
-             pause_in_min=int(round(pause_in_secs/60, 0)))
+    overdue_qty = get_overdue_slots_qty() if CATCH_UP_PUBLISHING else 1
+    if overdue_qty > 1:
+        log_json(LOGGER, 'debug', 'The pause is skipped', reason='Several publications are overdue',
+                 overdue_qty=overdue_qty)
+    else:
+        delays = [randint(*period) for period in TIME_PERIODS_IN_SECS]
+        pause_in_secs = choices(delays, weights=PROBABILITIES)[0]
+        if deadline is not None:
+            # the post must still be sent before the deadline
+            pause_in_secs = max(0, min(pause_in_secs, int(deadline - monotonic() - SEND_TIME_RESERVE_SECS)))
+        log_json(LOGGER, 'debug', 'The process is on pause', pause_in_secs=pause_in_secs,
+                 pause_in_min=int(round(pause_in_secs/60, 0)))
+
+        sleep(pause_in_secs)
 
-    sleep(pause_in_secs)
+    try:
+        if CATCH_UP_PUBLISHING:
+            published = asyncio.run(publish_overdue_posts(deadline=deadline))
+        else:
+            published = asyncio.run(publish_next_post())
+        if published:
+            log_json(LOGGER, 'info', 'The process is ended')
+    except Exception as e:
+        log_json(LOGGER, 'error', 'The process is failed', reason='Unexpected error', error=f'{e}')
 
-    post = get_post_from_current_batch()
+
+async def publish_next_post() -> bool:
+    """
+    Retrieves a random post from current batch (atomically marks it as published and removes
+    corresponding schedule entry) and publishes it to Telegram channel, without a pause.
+
+    Used by `publish_post()` and by the daemon mode, which awaits it in its own event loop.
+
+    :return: True if a post was sent, False if there isn't a post to publish or sending failed.
+    """
+    post = await asyncio.to_thread(get_post_from_current_batch)
 
     if not post:
         log_json(LOGGER, 'info', 'The process is terminated', reason='Failed to get post text')
-        return
+        return False
 
-    try:
-        asyncio.run(post_to_telegram_channel(post))
-        log_json(LOGGER, 'info', 'The process is ended')
-    except Exception as e:
-        log_json(LOGGER, 'error', 'The process is failed', reason='Unexpected error', error=f'{e}')
+    return await send_post(post)
+
+
+async def send_post(post_text: str, deadline: float | None = None) -> bool:
+    """
+    Sends a post to Telegram channel; if Telegram flood control is exceeded, waits for the requested
+    `retry_after` time and sends it again, up to MAX_SEND_ATTEMPTS attempts.
+
+    :param post_text: the message text to be sent.
+    :param deadline: `time.monotonic()` value waiting must not exceed, None - no limit.
+    :return: True if the post is delivered, False otherwise.
+    """
+    for attempt in range(1, MAX_SEND_ATTEMPTS + 1):
+        try:
+            return await post_to_telegram_channel(post_text)
+        except RetryAfter as e:
+            retry_after = e.retry_after
+            wait_secs = retry_after.total_seconds() if isinstance(retry_after, timedelta) else float(retry_after)
+            if attempt == MAX_SEND_ATTEMPTS or (deadline is not None and monotonic() + wait_secs > deadline):
+                return False
+            log_json(LOGGER, 'info', 'The post sending is postponed', reason='Flood control exceeded',
+                     retry_after_secs=wait_secs)
+            await asyncio.sleep(wait_secs)
+    return False
+
+
+async def publish_overdue_posts(min_spacing_secs: float = CATCH_UP_MIN_SPACING_SECS,
+                                max_qty: int = CATCH_UP_MAX_POSTS, deadline: float | None = None) -> int:
+    """
+    Catch-up publishing: publishes a post for every overdue schedule entry, one by one,
+    at least `min_spacing_secs` apart (see `send_post()` for flood control handling).
+
+    Every post is claimed with its schedule entry right before sending (see `claim_post_for_overdue_slot()`)
+    and returned to the current batch with its entry if it isn't delivered, so stopped or failed sendings
+    don't lose posts: the rest of overdue entries are published by the next run. A failed post doesn't stop
+    the rest. The q-ty of posts after the first one is limited to fit into the deadline with the spacing.
+
+    With a single overdue entry, it's the same as `publish_next_post()`.
+
+    :param min_spacing_secs: min interval between starts of two sendings.
+    :param max_qty: max q-ty of posts to publish, 0 - no limit.
+    :param deadline: `time.monotonic()` value publishing must end by, None - no limit.
+    :return: q-ty of delivered posts.
+    """
+    overdue_qty = await asyncio.to_thread(get_overdue_slots_qty)
+    planned_qty = min(overdue_qty, max_qty) if max_qty else overdue_qty
+    if deadline is not None and min_spacing_secs > 0:
+        # the first post is always sent, the following ones only if they fit into the deadline with the spacing
+        time_left_secs = max(0.0, deadline - monotonic() - SEND_TIME_RESERVE_SECS)
+        planned_qty = min(planned_qty, 1 + int(time_left_secs // min_spacing_secs))
+
+    if not planned_qty:
+        log_json(LOGGER, 'info', 'The process is terminated', reason='No overdue publications')
+        return 0
+
+    log_json(LOGGER, 'info', 'Catch-up publishing is started', overdue_qty=overdue_qty, planned_qty=planned_qty,
+             min_spacing_secs=min_spacing_secs)
+
+    sent_qty = 0
+    last_sent_at = None
+    for _ in range(planned_qty):
+        if last_sent_at is not None:
+            await asyncio.sleep(max(0.0, last_sent_at + min_spacing_secs - monotonic()))
+
+        post = await asyncio.to_thread(claim_post_for_overdue_slot)
+        if not post:
+            break
+
+        last_sent_at = monotonic()
+        try:
+            delivered = await send_post(post['text'], deadline)
+        except Exception as e:
+            log_json(LOGGER, 'error', 'The post sending is failed', reason='Unexpected error', error=f'{e}')
+            delivered = False
+
+        if delivered:
+            sent_qty += 1
+        else:
+            await asyncio.to_thread(return_post_to_current_batch, post['id'], post['slot_time'])
+
+    log_json(LOGGER, 'info', 'Catch-up publishing is ended',
+             result={'Q-ty of delivered posts': sent_qty, 'Q-ty of overdue publications left': overdue_qty - sent_qty})
+    return sent_qty
+
+
+def get_publication_times() -> list[datetime]:
+    """
+    Reads all scheduled publication times, including the past ones not published yet.
+
+    :return: list of timezone-aware datetimes in ascending order, empty in case of DB connection failure.
+    """
+    with get_db_cursor() as cur:
+        if cur:
+            cur.execute(
+                """
+                SELECT publication_time
+                FROM schedule
+                ORDER BY publication_time ASC
+                """
+            )
+            return [row['publication_time'] for row in cur.fetchall()]
+    return []
@@ -0,0 +1,85 @@
+import asyncio
+import heapq
+import itertools
+from datetime import datetime
+from typing import Any
+from config import TZ
+
+
+# max time of a single sleep, so wall clock changes (e.g. host suspend, NTP corrections) are noticed
+MAX_SLEEP_SECS = 600
+
+
+class TimerHeap:
+    """
+    Min-heap of timed events for an asyncio loop.
+
+    An event is a (due time, kind, payload) tuple. `pop_due()` sleeps exactly until the earliest event
+    is due and returns all due events at once. Pushing or removing events wakes the sleeper up, so
+    an event earlier than the current earliest one isn't missed.
+    """
+
+    def __init__(self) -> None:
+        # heap of (due time, sequence number, kind, payload), sequence number keeps push order for equal times
+        self._heap = []
+        self._sequence = itertools.count()
+        self._changed = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, due_time: datetime, kind: str, payload: Any = None) -> None:
+        """
+        Adds an event.
+
+        :param due_time: timezone-aware time the event is due at.
+        :param kind: event kind, e.g. 'publication'.
+        :param payload: any event data.
+        """
+        heapq.heappush(self._heap, (due_time, next(self._sequence), kind, payload))
+        self._changed.set()
+
+    def remove_kind(self, kind: str) -> None:
+        """
+        Removes all events of the given kind, e.g. to replace them with fresh ones.
+        """
+        self._heap = [event for event in self._heap if event[2] != kind]
+        heapq.heapify(self._heap)
+        self._changed.set()
+
+    def wake_up(self) -> None:
+        """
+        Makes a sleeping `pop_due()` re-check the heap, e.g. when the process is stopping.
+        """
+        self._changed.set()
+
+    def next_due_time(self) -> datetime | None:
+        return self._heap[0][0] if self._heap else None
+
+    async def pop_due(self) -> list[tuple[datetime, str, Any]]:
+        """
+        Sleeps until at least one event is due and takes all due events.
+
+        :return: list of (due time, kind, payload) tuples in due time order, or an empty list if the sleep
+            was interrupted by `wake_up()`.
+        """
+        while True:
+            self._changed.clear()
+            now = datetime.now(tz=TZ)
+
+            due_events = []
+            while self._heap and self._heap[0][0] <= now:
+                due_time, _, kind, payload = heapq.heappop(self._heap)
+                due_events.append((due_time, kind, payload))
+            if due_events:
+                return due_events
+
+            sleep_secs = MAX_SLEEP_SECS
+            if self._heap:
+                sleep_secs = min(sleep_secs, (self._heap[0][0] - now).total_seconds())
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=sleep_secs)
+            except asyncio.TimeoutError:
+                continue
+            if not self._heap or self._heap[0][0] > datetime.now(tz=TZ):
+                return []
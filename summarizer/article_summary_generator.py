@@ -1,11 +1,19 @@
 import google.genai as genai
-from google.genai import errors
-from collections import defaultdict
-import time
-from json import loads, JSONDecodeError
-from summarizer.prompts import SNIPPET_ANALYSIS_PROMPT, ARTICLE_ANALYSIS_PROMPT
-from utils.logging_config import log_json
-from config import GEMINI_API_KEY
+from google.genai import errors, types
+import asyncio
+import threading
+from collections import Counter
+from json import loads, dumps, JSONDecodeError
+from summarizer.prompts import (SNIPPET_ANALYSIS_PROMPT, ARTICLE_ANALYSIS_PROMPT, ARTICLES_BATCH_ANALYSIS_PROMPT,
+                                SNIPPETS_BATCH_ANALYSIS_PROMPT, SNIPPET_BATCH_ITEM, JSON_REPAIR_PROMPT)
+from summarizer.summary_cache import make_summary_cache_key, get_cached_summaries, save_summaries
+from summarizer.rate_limit_state import get_rate_limits_state, save_rate_limits_state
+from utils.rate_limiter import TokenBucketRateLimiter
+from utils.metrics import REGISTRY
+from utils.logging_config import log_json, log_span
+from config import (GEMINI_API_KEY, GEMINI_BATCH_MODE, GEMINI_BATCH_TOKEN_BUDGET, GEMINI_BATCH_MAX_ITEMS,
+                    GEMINI_DEFAULT_RPM, GEMINI_DEFAULT_TPM, GEMINI_MODEL_RATE_LIMITS, GEMINI_CONCURRENCY,
+                    GEMINI_STRUCTURED_OUTPUT)
 
 
 LOGGER = 'SUMMARIZING POST MATERIALS SUBPROCESS '
@@ -17,143 +25,373 @@ MODELS = [
     'gemini-2.5-flash-lite',
 ]
 
+# Rough token estimates used to fit batched prompts into GEMINI_BATCH_TOKEN_BUDGET:
+# an article is read by the model from its link, a snippet is a part of the prompt (~4 chars per token)
+ESTIMATED_ARTICLE_TOKENS = 2000
+ESTIMATED_RESPONSE_TOKENS_PER_ITEM = 200
+CHARS_PER_TOKEN = 4
 
-def summarize_material(materials: dict[str, list[str]|dict[str, str]]) -> dict[str, list[dict[str, str]]]:
+# Keys required in LLM response by prompts for each material type
+RESPONSE_KEYS = {
+    'articles': ('article summary', 'tags'),
+    'pytricks': ('snippet summary', 'tags'),
+}
+
+# Key of material id in batched responses
+BATCH_ID_KEY = 'id'
+
+
+def build_response_schema(material_type: str, is_batch: bool = False) -> types.Schema:
     """
-    Generates summaries and tags for given materials (articles or PyTricks) using Gemini API.
+    Builds a response schema of single (JSON object) or batched (JSON array of objects with ids) prompts
+    for Gemini structured output.
 
-    Iterates over the provided material types, sends them to the Gemini model with specific
-    prompts, and parses the JSON responses. Only valid responses with required keys are kept
-    and returned.
+    :param material_type: 'articles' or 'pytricks'.
+    :param is_batch: True for batched prompts.
+    :return: response schema.
+    """
+    keys = ((BATCH_ID_KEY,) if is_batch else ()) + RESPONSE_KEYS[material_type]
+    item_schema = types.Schema(
+        type=types.Type.OBJECT,
+        properties={key: types.Schema(type=types.Type.STRING) for key in keys},
+        required=list(keys),
+        property_ordering=list(keys),
+    )
+    return types.Schema(type=types.Type.ARRAY, items=item_schema) if is_batch else item_schema
 
-    If a model returns a 429 RESOURCE_EXHAUSTED error (daily/minute quota exceeded), automatically
-    switches to the next model in MODELS list and retries the current material on the new model.
-    If all models are exhausted, the remaining materials are skipped and logged.
 
-    :param materials: a dictionary with keys like 'articles' or 'pytricks', and values —
-        dictionary of 'article title-urls' pairs or an empty dictionary and list of snippets
-        or an empty list respectively
-    :return: a dictionary with the same keys ('articles' or 'pytricks'), where each value is
-        a list of parsed and validated JSON responses from Gemini
+_rate_limiter: TokenBucketRateLimiter | None = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> TokenBucketRateLimiter:
     """
-    log_json(LOGGER, 'info', 'The subprocess is started')
+    Returns the process-wide Gemini rate limiter, creating it on first use with quota usage
+    saved in DB by previous runs (see `save_rate_limiter_state()`).
+
+    Quotas are set by GEMINI_DEFAULT_RPM, GEMINI_DEFAULT_TPM and GEMINI_MODEL_RATE_LIMITS constants
+    in 'config.py' module.
+
+    :return: process-wide TokenBucketRateLimiter instance keyed by model name.
+    """
+    global _rate_limiter
+
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = TokenBucketRateLimiter(GEMINI_MODEL_RATE_LIMITS, (GEMINI_DEFAULT_RPM, GEMINI_DEFAULT_TPM))
+            _rate_limiter.load_state(get_rate_limits_state())
+        return _rate_limiter
 
-    materials_with_summaries = defaultdict(list)
 
-    client = genai.Client(api_key=GEMINI_API_KEY)
+def save_rate_limiter_state() -> None:
+    """
+    Saves quota usage of the process-wide Gemini rate limiter to DB, so the next run doesn't overshoot the quota.
 
-    model_index = 0
-    current_model = MODELS[model_index]
+    :return: None
+    """
+    if _rate_limiter is not None:
+        save_rate_limits_state(_rate_limiter.export_state())
+
+
+class ModelFallbackGenerator:
+    """
+    Sends prompts to Gemini models, switching to the next model in MODELS list on 429 (quota exhausted).
 
-    def switch_model() -> bool:
-        nonlocal model_index, current_model
-        model_index += 1
-        if model_index < len(MODELS):
-            current_model = MODELS[model_index]
+    The current model is kept between requests, so once a model is exhausted, it is not requested again.
+    Every request waits for the model quota in the rate limiter first.
+
+    Sync (`generate()`) and async (`generate_async()`) requests share the current model, so concurrent
+    requests failed with 429 on the same model switch it only once.
+    """
+
+    def __init__(self, client: genai.Client, rate_limiter: TokenBucketRateLimiter) -> None:
+        self._client = client
+        self._rate_limiter = rate_limiter
+        self._model_index = 0
+        self.requests_qty = 0
+        self.requests_by_model = Counter()
+        self.wasted_requests_by_model = Counter()
+
+    @property
+    def current_model(self) -> str | None:
+        return MODELS[self._model_index] if self._model_index < len(MODELS) else None
+
+    def use_client(self, client: genai.Client) -> None:
+        """
+        Replaces the SDK client, keeping the current model and requests counters.
+
+        Needed before async requests in a new event loop: async client connections are bound to the loop
+        they were opened in.
+        """
+        self._client = client
+
+    def switch_model(self, failed_model: str | None = None) -> bool:
+        """
+        Switches to the next model in MODELS list.
+
+        :param failed_model: model which returned 429; if another request has already switched
+            away from it, the current model is kept.
+        :return: True if there is a model to retry on, False if all models are exhausted.
+        """
+        if failed_model is not None and failed_model != self.current_model:
+            return self.current_model is not None
+
+        self._model_index += 1
+        if self._model_index < len(MODELS):
             log_json(LOGGER, 'warning', 'Switching to next model due to quota exhaustion',
-                     previous_model=MODELS[model_index - 1], new_model=current_model)
+                     previous_model=MODELS[self._model_index - 1], new_model=self.current_model)
             return True
         else:
             log_json(LOGGER, 'critical', 'All models exhausted, remaining materials will be skipped',
                      models_tried=MODELS)
             return False
 
-    def generate_with_fallback(prompt: str) -> str | None:
+    def generate(self, prompt: str, estimated_tokens: int,
+                 response_schema: types.Schema | None = None) -> tuple[str | None, str | None]:
         """
         Sends a prompt to the current model. On 429 switches to the next model and retries.
-        Returns response text or None if all models are exhausted or a non-recoverable error occurs.
+
+        :param prompt: prompt text.
+        :param estimated_tokens: estimated q-ty of request tokens (input and response) for the rate limiter.
+        :param response_schema: JSON schema of the response, used if GEMINI_STRUCTURED_OUTPUT is on
+            (constant set in 'config.py' module).
+        :return: tuple of (response text, model which responded), or (None, None) if all models
+            are exhausted or a non-recoverable error occurs.
         """
-        nonlocal current_model
-        while True:
+        while model := self.current_model:
             try:
-                response = client.models.generate_content(
-                    model=current_model,
-                    contents=prompt
+                self._rate_limiter.acquire(model, estimated_tokens)
+                self._count_request(model)
+                response = self._client.models.generate_content(
+                    model=model,
+                    contents=prompt,
+                    config=self._build_config(response_schema)
                 )
-                return response.text
+                self._adjust_tokens(model, response, estimated_tokens)
+                return response.text, model
             except errors.APIError as e:
-                if e.code == 429:
-                    log_json(LOGGER, 'warning', 'Quota exhausted on current model',
-                             model=current_model, error=f'{e}')
-                    if switch_model():
-                        continue
-                    else:
-                        return None
-                else:
-                    log_json(LOGGER, 'critical', 'Gemini API error', model=current_model,
-                             error=f'{e}', details=f'{e.details}')
-                    return None
+                if not self._handle_api_error(model, e):
+                    return None, None
+        return None, None
 
-    request_number = 0
+    async def generate_async(self, prompt: str, estimated_tokens: int,
+                             response_schema: types.Schema | None = None) -> tuple[str | None, str | None]:
+        """
+        Async version of `generate()` using the SDK async client, waits for the rate limiter without blocking.
 
-    if materials['articles']:
-        articles = materials['articles']
+        :param prompt: prompt text.
+        :param estimated_tokens: estimated q-ty of request tokens (input and response) for the rate limiter.
+        :param response_schema: see `generate()`.
+        :return: see `generate()`.
+        """
+        while model := self.current_model:
+            try:
+                wait_secs = self._rate_limiter.reserve(model, estimated_tokens)
+                if wait_secs > 0:
+                    await asyncio.sleep(wait_secs)
+                self._count_request(model)
+                response = await self._client.aio.models.generate_content(
+                    model=model,
+                    contents=prompt,
+                    config=self._build_config(response_schema)
+                )
+                self._adjust_tokens(model, response, estimated_tokens)
+                return response.text, model
+            except errors.APIError as e:
+                if not self._handle_api_error(model, e):
+                    return None, None
+        return None, None
 
-        for index, (article_title, link_to_article) in enumerate(articles.items(), start=request_number + 1):
-            request_number = index
-            # bypassing the requests per minute limit (5 req/min)
-            if request_number % 5 == 1 and request_number != 1:
-                time.sleep(60)
+    def mark_wasted(self, model: str) -> None:
+        """
+        Records a request of the model whose response turned out unusable (not a valid JSON as required by prompt).
+        """
+        self.wasted_requests_by_model[model] += 1
+        REGISTRY.inc('bot_gemini_wasted_requests_total', help_text='Gemini requests with unusable responses.',
+                     model=model)
 
-            response_text = generate_with_fallback(
-                ARTICLE_ANALYSIS_PROMPT.format(url=link_to_article)
-            )
+    def wasted_requests_stats(self) -> dict[str, dict[str, int | float]]:
+        """
+        :return: q-ty of requests, wasted requests and wasted requests rate by model.
+        """
+        return {model: {'requests': requests_qty,
+                        'wasted': self.wasted_requests_by_model[model],
+                        'wasted rate': round(self.wasted_requests_by_model[model] / requests_qty, 3)}
+                for model, requests_qty in self.requests_by_model.items()}
 
-            if response_text is None:
-                log_json(LOGGER, 'warning', 'Skipping article: all models exhausted or API error',
-                         article_title=article_title, url=link_to_article)
-                continue
+    def _count_request(self, model: str) -> None:
+        self.requests_qty += 1
+        self.requests_by_model[model] += 1
+        REGISTRY.inc('bot_gemini_requests_total', help_text='Gemini requests sent.', model=model)
 
-            try:
-                decoded_response = loads(response_text.strip())
-                try:
-                    if all((
-                            decoded_response['article summary'],
-                            decoded_response['tags']
-                    )):
-                        decoded_response['article title'] = article_title
-                        decoded_response['url'] = link_to_article
-                        materials_with_summaries['articles'].append(decoded_response)
-                except KeyError as e:
-                    log_json(LOGGER, 'error', 'No key in LLM response as required by prompt',
-                             error=f'{e}')
-            except JSONDecodeError as e:
-                log_json(LOGGER, 'error', 'LLM response has not JSON format as required by prompt',
-                         error=f'{e}', response=f'{response_text}')
+    @staticmethod
+    def _build_config(response_schema: types.Schema | None) -> types.GenerateContentConfig | None:
+        if response_schema is None or not GEMINI_STRUCTURED_OUTPUT:
+            return None
+        return types.GenerateContentConfig(response_mime_type='application/json', response_schema=response_schema)
 
-    if materials['pytricks']:
-        pytricks = materials['pytricks']
+    def _adjust_tokens(self, model: str, response, estimated_tokens: int) -> None:
+        usage = response.usage_metadata
+        if usage and usage.total_token_count:
+            self._rate_limiter.adjust_tokens(model, usage.total_token_count - estimated_tokens)
 
-        for index, snippet in enumerate(pytricks, start=request_number + 1):
-            request_number = index
-            # bypassing the requests per minute limit (10 req/min)
-            if request_number % 10 == 1 and request_number != 1:
-                time.sleep(60)
+    def _handle_api_error(self, model: str, e: errors.APIError) -> bool:
+        """
+        :return: True if the request should be retried on the next model (429), False otherwise.
+        """
+        if e.code == 429:
+            log_json(LOGGER, 'warning', 'Quota exhausted on current model',
+                     model=model, error=f'{e}')
+            return self.switch_model(model)
+        log_json(LOGGER, 'critical', 'Gemini API error', model=model,
+                 error=f'{e}', details=f'{e.details}')
+        return False
 
-            response_text = generate_with_fallback(
-                SNIPPET_ANALYSIS_PROMPT.format(code=snippet)
-            )
 
-            if response_text is None:
-                log_json(LOGGER, 'warning', 'Skipping pytrick: all models exhausted or API error',
-                         snippet=snippet[:100])
-                continue
+def validate_response(material_type: str, decoded_response: dict, material: dict[str, str]) -> dict[str, str] | None:
+    """
+    Checks that decoded LLM response has non-empty values for all keys required by prompt,
+    and adds material data ('article title' and 'url', or 'snippet') to it.
 
-            try:
-                decoded_response = loads(response_text.strip())
-                try:
-                    if all((
-                            decoded_response['snippet summary'],
-                            decoded_response['tags']
-                    )):
-                        decoded_response['snippet'] = snippet
-                        materials_with_summaries['pytricks'].append(decoded_response)
-                except KeyError as e:
-                    log_json(LOGGER, 'error', 'No key in LLM response as required by prompt',
-                             error=f'{e}')
-            except JSONDecodeError as e:
-                log_json(LOGGER, 'error', 'LLM response has not JSON format as required by prompt',
-                         error=f'{e}', response=f'{response_text}')
+    :param material_type: 'articles' or 'pytricks'.
+    :param decoded_response: LLM response decoded from JSON.
+    :param material: {'article title': ..., 'url': ...} for an article or {'snippet': ...} for a PyTrick.
+    :return: response with material data, or None if required keys are missing or empty
+        (empty values are returned by prompt for non-article content, e.g. videos).
+    """
+    try:
+        if all(decoded_response[key] for key in RESPONSE_KEYS[material_type]):
+            return {**decoded_response, **material}
+    except KeyError as e:
+        log_json(LOGGER, 'error', 'No key in LLM response as required by prompt',
+                 error=f'{e}')
+    except TypeError as e:
+        log_json(LOGGER, 'error', 'LLM response has unexpected structure',
+                 error=f'{e}', response=f'{decoded_response}')
+    return None
+
+
+def get_material_content(material_type: str, material: dict[str, str]) -> str:
+    """
+    :return: the part of material sent to Gemini: article URL or snippet text.
+    """
+    return material['url'] if material_type == 'articles' else material['snippet']
+
+
+def get_cached_responses(materials: dict[str, list[str] | dict[str, str]]) -> dict[tuple[str, str], dict]:
+    """
+    Looks up parsed Gemini responses of the given materials made by any of MODELS in summary cache
+    with a single DB request. If a material is cached for several models, the highest priority model wins.
+
+    :param materials: see `summarize_material()`.
+    :return: dict of {(material type, article URL or snippet text): parsed response} pairs found in cache.
+    """
+    contents = {('articles', url) for url in materials['articles'].values()}
+    contents.update(('pytricks', snippet) for snippet in materials['pytricks'])
+
+    keys = {make_summary_cache_key(material_type, content, model): (material_type, content, model_index)
+            for material_type, content in contents
+            for model_index, model in enumerate(MODELS)}
+    cached_summaries = get_cached_summaries(list(keys))
+
+    cached_responses = {}
+    for key, (material_type, content, model_index) in sorted(keys.items(), key=lambda item: -item[1][2]):
+        if key in cached_summaries:
+            cached_responses[(material_type, content)] = cached_summaries[key]
+    return cached_responses
+
+
+def create_generator() -> ModelFallbackGenerator:
+    """
+    :return: ModelFallbackGenerator starting with the first model in MODELS list, paced by the process-wide
+        rate limiter (see `get_rate_limiter()`).
+    """
+    return ModelFallbackGenerator(genai.Client(api_key=GEMINI_API_KEY), get_rate_limiter())
+
+
+@log_span(LOGGER, 'summarize')
+def summarize_material(materials: dict[str, list[str]|dict[str, str]],
+                       generator: ModelFallbackGenerator | None = None) -> dict[str, list[dict[str, str]]]:
+    """
+    Generates summaries and tags for given materials (articles or PyTricks) using Gemini API.
+
+    Iterates over the provided material types, sends them to the Gemini model with specific
+    prompts, and parses the JSON responses. Only valid responses with required keys are kept
+    and returned.
+
+    If GEMINI_BATCH_MODE is on (constant set in 'config.py' module), several materials of the same
+    type are sent in one prompt (see `summarize_in_batches()`), otherwise one request per material is made.
+    One-per-material requests are sent concurrently with the async client if GEMINI_CONCURRENCY
+    is greater than 1 (see `summarize_concurrently()`).
+
+    If a model returns a 429 RESOURCE_EXHAUSTED error (daily/minute quota exceeded), automatically
+    switches to the next model in MODELS list and retries the current material on the new model.
+    If all models are exhausted, the remaining materials are skipped and logged.
+
+    Requests are paced by the process-wide per-model rate limiter (see `get_rate_limiter()`),
+    which sleeps only as long as needed to stay within the model quota.
+
+    If GEMINI_STRUCTURED_OUTPUT is on, responses are constrained by a JSON schema (see `build_response_schema()`).
+    An invalid response is fixed with a cheap repair re-ask containing only that response (see `generate_json()`),
+    and the rate of requests wasted on invalid responses is logged per model.
+
+    Parsed responses are cached in DB by material content, prompt version and model (see
+    'summary_cache.py' module), so materials already summarized, e.g. in another newsletter or
+    in a crashed run, are looked up in bulk instead of new requests.
+
+    :param materials: a dictionary with keys like 'articles' or 'pytricks', and values —
+        dictionary of 'article title-urls' pairs or an empty dictionary and list of snippets
+        or an empty list respectively
+    :param generator: generator shared by several calls (see `create_generator()`), so models exhausted
+        by earlier calls are not requested again; None - a new one is created.
+    :return: a dictionary with the same keys ('articles' or 'pytricks'), where each value is
+        a list of parsed and validated JSON responses from Gemini
+    """
+    log_json(LOGGER, 'info', 'The subprocess is started')
+
+    rate_limiter = get_rate_limiter()
+    wait_secs_before = sum(rate_limiter.wait_secs.values())
+    generator = generator or create_generator()
+    requests_qty_before = generator.requests_qty
+
+    cached_responses = get_cached_responses(materials)
+    not_cached_materials = {
+        'articles': {title: url for title, url in materials['articles'].items()
+                     if ('articles', url) not in cached_responses},
+        'pytricks': [snippet for snippet in materials['pytricks'] if ('pytricks', snippet) not in cached_responses],
+    }
+
+    new_responses = []
+    if GEMINI_BATCH_MODE:
+        new_summaries = summarize_in_batches(not_cached_materials, generator, new_responses)
+    elif GEMINI_CONCURRENCY > 1:
+        generator.use_client(genai.Client(api_key=GEMINI_API_KEY))
+        new_summaries = asyncio.run(summarize_concurrently(not_cached_materials, generator, new_responses))
+    else:
+        new_summaries = summarize_one_by_one(not_cached_materials, generator, new_responses)
+
+    save_rate_limiter_state()
+    save_summaries(new_responses)
+
+    # merging cached and new summaries in the original materials order
+    new_articles = {summary['article title']: summary for summary in new_summaries['articles']}
+    new_pytricks = {summary['snippet']: summary for summary in new_summaries['pytricks']}
+    materials_with_summaries = {'articles': [], 'pytricks': []}
+    for title, url in materials['articles'].items():
+        if ('articles', url) in cached_responses:
+            summary = validate_response('articles', cached_responses[('articles', url)],
+                                        {'article title': title, 'url': url})
+        else:
+            summary = new_articles.get(title)
+        if summary:
+            materials_with_summaries['articles'].append(summary)
+    for snippet in materials['pytricks']:
+        if ('pytricks', snippet) in cached_responses:
+            summary = validate_response('pytricks', cached_responses[('pytricks', snippet)], {'snippet': snippet})
+        else:
+            summary = new_pytricks.get(snippet)
+        if summary:
+            materials_with_summaries['pytricks'].append(summary)
 
     log_json(LOGGER, 'info', 'The subprocess is ended successfully',
              result={'Q-ty of summarized articles': len(materials_with_summaries['articles']),
@@ -161,6 +399,387 @@ def summarize_material(materials: dict[str, list[str]|dict[str, str]]) -> dict[s
                                                              len(materials_with_summaries['articles']),
                      'Q-ty of summarized pytricks': len(materials_with_summaries['pytricks']),
                      'Q-ty of not summarized pytricks': len(materials['pytricks']) -
-                                                             len(materials_with_summaries['pytricks'])})
+                                                             len(materials_with_summaries['pytricks']),
+                     'Q-ty of summaries found in cache': len(cached_responses),
+                     'Q-ty of Gemini requests': generator.requests_qty - requests_qty_before,
+                     'Wasted Gemini requests by model': generator.wasted_requests_stats(),
+                     'Gemini rate limit wait, secs': round(sum(rate_limiter.wait_secs.values()) -
+                                                           wait_secs_before, 1)})
+
+    return materials_with_summaries
+
+
+def summarize_one_by_one(materials: dict[str, list[str] | dict[str, str]], generator: ModelFallbackGenerator,
+                         new_responses: list[tuple[str, str, str, dict]]) -> dict[str, list[dict[str, str]]]:
+    """
+    Summarizes materials with one Gemini request per article or snippet.
+
+    :param materials: see `summarize_material()`.
+    :param generator: Gemini requests sender with model fallback.
+    :param new_responses: list to append (material type, content, model, parsed response) tuples
+        of parsed responses to, for summary cache.
+    :return: see `summarize_material()`, always contains both 'articles' and 'pytricks' keys.
+    """
+    materials_with_summaries = {'articles': [], 'pytricks': []}
+
+    if materials['articles']:
+        for article_title, link_to_article in materials['articles'].items():
+            summary = summarize_single_material(
+                generator, 'articles', {'article title': article_title, 'url': link_to_article}, new_responses
+            )
+            if summary:
+                materials_with_summaries['articles'].append(summary)
+
+    if materials['pytricks']:
+        for snippet in materials['pytricks']:
+            summary = summarize_single_material(generator, 'pytricks', {'snippet': snippet}, new_responses)
+            if summary:
+                materials_with_summaries['pytricks'].append(summary)
+
+    return materials_with_summaries
+
+
+def summarize_single_material(generator: ModelFallbackGenerator, material_type: str, material: dict[str, str],
+                              new_responses: list[tuple[str, str, str, dict]]) -> dict[str, str] | None:
+    """
+    Summarizes a single article or snippet with one Gemini request.
+
+    :param generator: Gemini requests sender with model fallback.
+    :param material_type: 'articles' or 'pytricks'.
+    :param material: {'article title': ..., 'url': ...} for an article or {'snippet': ...} for a PyTrick.
+    :param new_responses: see `summarize_one_by_one()`.
+    :return: validated response with material data, or None on failure.
+    """
+    prompt = build_single_prompt(material_type, material)
+    decoded_response, model = generate_json(generator, material_type, prompt,
+                                            estimate_prompt_tokens(material_type, prompt, 1))
+    return parse_single_response(material_type, material, decoded_response, model, new_responses)
+
+
+def build_single_prompt(material_type: str, material: dict[str, str]) -> str:
+    """
+    :return: prompt for a single article or snippet.
+    """
+    if material_type == 'articles':
+        return ARTICLE_ANALYSIS_PROMPT.format(url=material['url'])
+    return SNIPPET_ANALYSIS_PROMPT.format(code=material['snippet'])
+
+
+def parse_single_response(material_type: str, material: dict[str, str], decoded_response: dict | None,
+                          model: str | None, new_responses: list[tuple[str, str, str, dict]]) -> dict[str, str] | None:
+    """
+    Validates decoded Gemini response to a single material prompt and adds it to responses for summary cache.
+
+    :param material_type: 'articles' or 'pytricks'.
+    :param material: {'article title': ..., 'url': ...} for an article or {'snippet': ...} for a PyTrick.
+    :param decoded_response: decoded response, None if no valid response is received.
+    :param model: model which responded.
+    :param new_responses: see `summarize_one_by_one()`.
+    :return: validated response with material data, or None on failure.
+    """
+    if decoded_response is None:
+        if material_type == 'articles':
+            log_json(LOGGER, 'warning', 'Skipping article: all models exhausted, API error or invalid response',
+                     article_title=material['article title'], url=material['url'])
+        else:
+            log_json(LOGGER, 'warning', 'Skipping pytrick: all models exhausted, API error or invalid response',
+                     snippet=material['snippet'][:100])
+        return None
+
+    add_new_response(new_responses, model, material_type, material, decoded_response)
+    return validate_response(material_type, decoded_response, material)
+
+
+def decode_response(material_type: str, response_text: str, is_batch: bool = False) -> dict | list | None:
+    """
+    Decodes Gemini response text and checks its structure required by prompt: a JSON object with all
+    required keys for single prompts, or a JSON array for batched prompts (its items are checked by caller).
+
+    :param material_type: 'articles' or 'pytricks'.
+    :param response_text: response text.
+    :param is_batch: True for batched prompts.
+    :return: decoded response, or None if it has invalid format or structure.
+    """
+    try:
+        decoded_response = loads(response_text.strip())
+    except JSONDecodeError as e:
+        log_json(LOGGER, 'error', 'LLM response has not JSON format as required by prompt',
+                 error=f'{e}', response=f'{response_text}')
+        return None
+
+    if is_batch:
+        if isinstance(decoded_response, list):
+            return decoded_response
+        log_json(LOGGER, 'error', 'Batched LLM response is not a JSON array as required by prompt',
+                 response=f'{response_text}')
+        return None
+
+    if isinstance(decoded_response, dict) and all(key in decoded_response for key in RESPONSE_KEYS[material_type]):
+        return decoded_response
+    log_json(LOGGER, 'error', 'No key in LLM response as required by prompt',
+             required_keys=RESPONSE_KEYS[material_type], response=f'{response_text}')
+    return None
+
+
+def build_repair_prompt(material_type: str, response_text: str, is_batch: bool = False) -> tuple[str, int]:
+    """
+    Builds a repair re-ask containing only the invalid response, which is much cheaper than redoing the material.
+
+    :param material_type: 'articles' or 'pytricks'.
+    :param response_text: invalid response text.
+    :param is_batch: True for batched prompts.
+    :return: tuple of (prompt text, estimated q-ty of request tokens: the prompt and the response of similar size).
+    """
+    keys = ((BATCH_ID_KEY,) if is_batch else ()) + RESPONSE_KEYS[material_type]
+    prompt = JSON_REPAIR_PROMPT.format(json_type='array of objects' if is_batch else 'object',
+                                       keys=', '.join(f'"{key}"' for key in keys),
+                                       response=response_text)
+    return prompt, len(prompt) // CHARS_PER_TOKEN + len(response_text) // CHARS_PER_TOKEN
+
+
+def generate_json(generator: ModelFallbackGenerator, material_type: str, prompt: str, estimated_tokens: int,
+                  is_batch: bool = False) -> tuple[dict | list | None, str | None]:
+    """
+    Sends a prompt with a response schema and decodes the response (see `decode_response()`).
+    An invalid response is counted as a wasted request and fixed with a single repair re-ask
+    (see `build_repair_prompt()`).
+
+    :param generator: Gemini requests sender with model fallback.
+    :param material_type: 'articles' or 'pytricks'.
+    :param prompt: prompt text.
+    :param estimated_tokens: estimated q-ty of request tokens.
+    :param is_batch: True for batched prompts.
+    :return: tuple of (decoded response, model which responded), or (None, None) on failure.
+    """
+    response_schema = build_response_schema(material_type, is_batch)
+    response_text, model = generator.generate(prompt, estimated_tokens, response_schema)
+    if response_text is None:
+        return None, None
+    decoded_response = decode_response(material_type, response_text, is_batch)
+    if decoded_response is not None:
+        return decoded_response, model
+
+    generator.mark_wasted(model)
+    repair_prompt, repair_tokens = build_repair_prompt(material_type, response_text, is_batch)
+    response_text, model = generator.generate(repair_prompt, repair_tokens, response_schema)
+    return check_repaired_response(generator, material_type, response_text, model, is_batch)
+
+
+async def generate_json_async(generator: ModelFallbackGenerator, material_type: str, prompt: str,
+                              estimated_tokens: int, is_batch: bool = False) -> tuple[dict | list | None, str | None]:
+    """
+    Async version of `generate_json()`.
+    """
+    response_schema = build_response_schema(material_type, is_batch)
+    response_text, model = await generator.generate_async(prompt, estimated_tokens, response_schema)
+    if response_text is None:
+        return None, None
+    decoded_response = decode_response(material_type, response_text, is_batch)
+    if decoded_response is not None:
+        return decoded_response, model
+
+    generator.mark_wasted(model)
+    repair_prompt, repair_tokens = build_repair_prompt(material_type, response_text, is_batch)
+    response_text, model = await generator.generate_async(repair_prompt, repair_tokens, response_schema)
+    return check_repaired_response(generator, material_type, response_text, model, is_batch)
+
+
+def check_repaired_response(generator: ModelFallbackGenerator, material_type: str, response_text: str | None,
+                            model: str | None, is_batch: bool) -> tuple[dict | list | None, str | None]:
+    """
+    Decodes the response to a repair re-ask, counting it as a wasted request if it's still invalid.
+
+    :return: tuple of (decoded response, model which responded), or (None, None) on failure.
+    """
+    if response_text is None:
+        return None, None
+    decoded_response = decode_response(material_type, response_text, is_batch)
+    if decoded_response is None:
+        generator.mark_wasted(model)
+        return None, None
+    log_json(LOGGER, 'info', 'Invalid LLM response is repaired', model=model, material_type=material_type)
+    return decoded_response, model
+
+
+def add_new_response(new_responses: list[tuple[str, str, str, dict]], model: str, material_type: str,
+                     material: dict[str, str], decoded_response: dict) -> None:
+    """
+    Appends a parsed response to the list of responses for summary cache, if it has all keys required by prompt
+    (responses with empty values for non-article content are cached too, so they don't cost requests again).
+    """
+    if isinstance(decoded_response, dict) and all(key in decoded_response for key in RESPONSE_KEYS[material_type]):
+        new_responses.append((material_type, get_material_content(material_type, material), model, decoded_response))
+
+
+async def summarize_concurrently(materials: dict[str, list[str] | dict[str, str]], generator: ModelFallbackGenerator,
+                                 new_responses: list[tuple[str, str, str, dict]]) -> dict[str, list[dict[str, str]]]:
+    """
+    Summarizes materials with one Gemini request per article or snippet, keeping up to GEMINI_CONCURRENCY
+    requests (constant set in 'config.py' module) in flight. Articles and PyTricks are requested concurrently,
+    within the model quota of the shared rate limiter.
+
+    :param materials: see `summarize_material()`.
+    :param generator: Gemini requests sender with model fallback.
+    :param new_responses: see `summarize_one_by_one()`.
+    :return: see `summarize_one_by_one()`, materials keep their original order.
+    """
+    semaphore = asyncio.Semaphore(GEMINI_CONCURRENCY)
+
+    async def summarize(material_type: str, material: dict[str, str]) -> dict[str, str] | None:
+        prompt = build_single_prompt(material_type, material)
+        async with semaphore:
+            decoded_response, model = await generate_json_async(
+                generator, material_type, prompt, estimate_prompt_tokens(material_type, prompt, 1)
+            )
+        return parse_single_response(material_type, material, decoded_response, model, new_responses)
+
+    work_items = [('articles', {'article title': title, 'url': url}) for title, url in materials['articles'].items()]
+    work_items += [('pytricks', {'snippet': snippet}) for snippet in materials['pytricks']]
+    summaries = await asyncio.gather(*(summarize(material_type, material) for material_type, material in work_items))
+
+    materials_with_summaries = {'articles': [], 'pytricks': []}
+    for (material_type, _), summary in zip(work_items, summaries):
+        if summary:
+            materials_with_summaries[material_type].append(summary)
+    return materials_with_summaries
+
+
+def estimate_material_tokens(material_type: str, material: dict[str, str]) -> int:
+    """
+    Roughly estimates q-ty of tokens a material adds to a batched request (input and response).
+
+    :param material_type: 'articles' or 'pytricks'.
+    :param material: {'article title': ..., 'url': ...} for an article or {'snippet': ...} for a PyTrick.
+    :return: estimated q-ty of tokens.
+    """
+    if material_type == 'articles':
+        return ESTIMATED_ARTICLE_TOKENS + len(material['url']) // CHARS_PER_TOKEN + ESTIMATED_RESPONSE_TOKENS_PER_ITEM
+    return len(material['snippet']) // CHARS_PER_TOKEN + ESTIMATED_RESPONSE_TOKENS_PER_ITEM
+
+
+def estimate_prompt_tokens(material_type: str, prompt: str, materials_qty: int) -> int:
+    """
+    Roughly estimates q-ty of tokens of a request (input and response) for the rate limiter.
+
+    :param material_type: 'articles' or 'pytricks'.
+    :param prompt: prompt text.
+    :param materials_qty: q-ty of materials in the prompt.
+    :return: estimated q-ty of tokens.
+    """
+    per_material_tokens = ESTIMATED_RESPONSE_TOKENS_PER_ITEM
+    if material_type == 'articles':
+        per_material_tokens += ESTIMATED_ARTICLE_TOKENS
+    return len(prompt) // CHARS_PER_TOKEN + per_material_tokens * materials_qty
+
+
+def split_into_batches(material_type: str, materials: list[dict[str, str]]) -> list[list[dict[str, str]]]:
+    """
+    Greedily groups materials into batches fitting GEMINI_BATCH_TOKEN_BUDGET estimated tokens
+    and GEMINI_BATCH_MAX_ITEMS materials (constants set in 'config.py' module).
+    A material exceeding the budget alone forms its own batch.
+
+    :param material_type: 'articles' or 'pytricks'.
+    :param materials: materials of the given type in original order.
+    :return: list of batches, materials order is kept.
+    """
+    batches, batch, batch_tokens = [], [], 0
+
+    for material in materials:
+        material_tokens = estimate_material_tokens(material_type, material)
+        if batch and (batch_tokens + material_tokens > GEMINI_BATCH_TOKEN_BUDGET or
+                      len(batch) >= GEMINI_BATCH_MAX_ITEMS):
+            batches.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append(material)
+        batch_tokens += material_tokens
+
+    if batch:
+        batches.append(batch)
+
+    return batches
+
+
+def build_batch_prompt(material_type: str, batch: list[dict[str, str]]) -> str:
+    """
+    Builds a prompt for several materials of the same type, identified by their position in the batch.
+
+    :param material_type: 'articles' or 'pytricks'.
+    :param batch: materials of the given type.
+    :return: prompt text.
+    """
+    if material_type == 'articles':
+        items = dumps([{BATCH_ID_KEY: str(i), 'url': material['url']} for i, material in enumerate(batch)],
+                      ensure_ascii=False)
+        return ARTICLES_BATCH_ANALYSIS_PROMPT.format(items=items)
+
+    items = '\n\n'.join(SNIPPET_BATCH_ITEM.format(id=i, code=material['snippet']) for i, material in enumerate(batch))
+    return SNIPPETS_BATCH_ANALYSIS_PROMPT.format(items=items)
+
+
+def summarize_in_batches(materials: dict[str, list[str] | dict[str, str]], generator: ModelFallbackGenerator,
+                         new_responses: list[tuple[str, str, str, dict]]) -> dict[str, list[dict[str, str]]]:
+    """
+    Summarizes materials with batched Gemini requests: several articles (or snippets) in one prompt,
+    which returns a JSON array of responses keyed by material id (see `split_into_batches()`).
+
+    Materials missing in a batch response or having invalid response (e.g. the whole response is not
+    a valid JSON array even after a repair re-ask) are re-queued and summarized individually with
+    one request per material.
+    Materials with valid but empty response (non-article content) are skipped as in single requests.
+
+    :param materials: see `summarize_material()`.
+    :param generator: Gemini requests sender with model fallback.
+    :param new_responses: see `summarize_one_by_one()`.
+    :return: see `summarize_material()`, always contains both 'articles' and 'pytricks' keys,
+        materials keep their original order.
+    """
+    materials_with_summaries = {'articles': [], 'pytricks': []}
+    grouped_materials = {
+        'articles': [{'article title': title, 'url': url} for title, url in materials['articles'].items()],
+        'pytricks': [{'snippet': snippet} for snippet in materials['pytricks']],
+    }
+
+    for material_type, type_materials in grouped_materials.items():
+        summaries = [None] * len(type_materials)
+        requeued_positions = []
+        position = 0
+
+        for batch in split_into_batches(material_type, type_materials):
+            batch_positions = range(position, position + len(batch))
+            position += len(batch)
+
+            prompt = build_batch_prompt(material_type, batch)
+            decoded_response, model = generate_json(generator, material_type, prompt,
+                                                    estimate_prompt_tokens(material_type, prompt, len(batch)),
+                                                    is_batch=True)
+            if decoded_response is None:
+                log_json(LOGGER, 'warning', 'No valid response to batch: all models exhausted, API error '
+                                            'or invalid response', material_type=material_type, batch_size=len(batch))
+                requeued_positions.extend(batch_positions)
+                continue
+
+            responses_by_id = {str(item.get(BATCH_ID_KEY)): item for item in decoded_response if isinstance(item, dict)}
+
+            for batch_id, (material_position, material) in enumerate(zip(batch_positions, batch)):
+                item_response = responses_by_id.get(str(batch_id))
+                if item_response is None:
+                    requeued_positions.append(material_position)
+                    continue
+                item_response.pop(BATCH_ID_KEY, None)
+                if all(key in item_response for key in RESPONSE_KEYS[material_type]):
+                    add_new_response(new_responses, model, material_type, material, item_response)
+                    summaries[material_position] = validate_response(material_type, item_response, material)
+                else:
+                    requeued_positions.append(material_position)
+
+        if requeued_positions:
+            log_json(LOGGER, 'warning', 'Materials are re-queued for individual summarization',
+                     material_type=material_type, materials_qty=len(requeued_positions))
+        for material_position in requeued_positions:
+            summaries[material_position] = summarize_single_material(
+                generator, material_type, type_materials[material_position], new_responses
+            )
+
+        materials_with_summaries[material_type] = [summary for summary in summaries if summary]
 
-    return dict(materials_with_summaries)
\ No newline at end of file
+    return materials_with_summaries
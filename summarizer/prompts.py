@@ -1,3 +1,7 @@
+# Version of prompts and their response format, is a part of summary cache keys.
+# Must be increased on any prompt change, so summaries made by old prompts are not reused.
+PROMPT_VERSION = 1
+
 SNIPPET_ANALYSIS_PROMPT = """You are a Python code analyzer. Analyze this Python code snippet from PyTrick.
 
 CRITICAL: Your response must be ONLY a valid JSON object. Do NOT include:
@@ -71,3 +75,83 @@ FINAL CHECK: Before sending your FINAL response, check it one more time:
 3. Verify your final JSON is valid for json.loads().
 
 Article link: {url}"""
+
+ARTICLES_BATCH_ANALYSIS_PROMPT = """You are an expert article analyzer. Your goal is to extract specific information from several provided article links.
+
+CRITICAL: Your response must be ONLY a valid JSON array. Do NOT include:
+- No markdown code blocks (```json```)  
+- No explanatory text before or after
+- No formatting symbols
+- Use plain text only, no markdown formatting within JSON values
+- Start directly with [ and end with ]
+
+Return exactly one JSON object per provided article, keeping its "id" unchanged:
+[{{"id": "article id", "article summary": "Brief summary in Russian (2-3 lines max)", "tags": "tag1, tag2, tag3, tag4, tag5"}}]
+
+If a link leads to a video page (YouTube, Vimeo, etc.) or any non-article content, return empty values for it:
+{{"id": "article id", "article summary": "", "tags": ""}}
+
+Requirements for article analysis:
+- Analyze each article independently, never mix content of different articles.
+- Article summary in Russian: NO greetings or introductory phrases, start directly with content summary, conversational tone, 2-3 lines maximum.
+- Highlight main topic and optionally mention target audience.  
+- Tags in English, separated by commas, include:
+  * Python concepts mentioned in the article
+  * Technologies, libraries, frameworks discussed
+  * Programming approaches/paradigms
+  * Development areas (web, data science, ML, etc.)
+  * Difficulty level (beginner, intermediate, advanced)
+- Provide 4-6 most relevant tags.
+- If you need to use quotes inside text values, use only single quotes (') - never double quotes inside string content.
+
+FINAL CHECK: Before sending your FINAL response, check it one more time:
+1. Ensure there is exactly one object for every provided article id.
+2. Ensure all JSON keys and string values are properly enclosed in double quotes.
+3. Verify your final JSON is valid for json.loads().
+
+Articles (JSON array of id and link pairs): {items}"""
+
+SNIPPETS_BATCH_ANALYSIS_PROMPT = """You are a Python code analyzer. Analyze several Python code snippets from PyTrick.
+
+CRITICAL: Your response must be ONLY a valid JSON array. Do NOT include:
+- No markdown code blocks (```json```)  
+- No explanatory text before or after
+- No formatting symbols
+- Use plain text only, no markdown formatting within JSON values
+- Start directly with [ and end with ]
+
+Return exactly one JSON object per provided snippet, keeping its "id" unchanged:
+[{{"id": "snippet id", "snippet summary": "Brief explanation in Russian (2-3 lines max)", "tags": "tag1, tag2, tag3, tag4, tag5"}}]
+
+Requirements for content:
+- Analyze each snippet independently, never mix content of different snippets.
+- Snippet summary in Russian: NO greetings, start directly with explanation, conversational tone, 2-3 lines maximum
+- Write as if talking to readers, vary opening phrases naturally - mention Python trick, technique, magic, etc.
+- Focus on practical lesson or benefit, make it engaging and relatable  
+- Tags in English, comma-separated, include:
+  * Python concepts demonstrated
+  * Language features used
+  * Programming techniques shown
+  * Difficulty level (beginner, intermediate, advanced)
+- Provide 3-4 most relevant tags
+- If you need to use quotes inside text values, use only single quotes (') - never double quotes inside string content
+
+FINAL CHECK: Before sending your FINAL response, check it one more time:
+1. Ensure there is exactly one object for every provided snippet id.
+2. Ensure all JSON keys and string values are properly enclosed in double quotes.
+3. Verify your final JSON is valid for json.loads().
+
+Code snippets to analyze, each one starts with its id:
+{items}"""
+
+SNIPPET_BATCH_ITEM = """Snippet id: {id}
+```python
+{code}
+```"""
+
+JSON_REPAIR_PROMPT = """The text below was meant to be a valid JSON {json_type} with string values for the keys: {keys}.
+Fix its JSON syntax and structure only: keep all text values as they are, don't add new content.
+Return ONLY the fixed JSON, without markdown code blocks or any explanations.
+
+Text to fix:
+{response}"""
@@ -0,0 +1,68 @@
+from psycopg2.extras import execute_values
+from db_connector.db_cursor_creator import get_db_cursor
+from utils.logging_config import log_json
+
+
+LOGGER_G = 'GETTING GEMINI RATE LIMITS STATE SUBPROCESS'
+LOGGER_S = 'SAVING GEMINI RATE LIMITS STATE SUBPROCESS'
+
+
+def get_rate_limits_state() -> list[tuple[str, float, float, float]]:
+    """
+    Reads token bucket levels of all models from 'gemini_rate_limits' table.
+
+    :return: list of (model, requests level, tokens level, levels UNIX timestamp) tuples,
+        or an empty list if nothing is saved yet or DB connection fails.
+    """
+    log_json(LOGGER_G, 'info', 'The subprocess is started')
+
+    with get_db_cursor() as cur:
+        if cur:
+            cur.execute(
+                """
+                SELECT model, requests_level, tokens_level, EXTRACT(EPOCH FROM updated_at) AS updated_at
+                FROM gemini_rate_limits
+                """
+            )
+            state = [(row['model'], row['requests_level'], row['tokens_level'], float(row['updated_at']))
+                     for row in cur.fetchall()]
+            log_json(LOGGER_G, 'info', 'The subprocess is ended successfully',
+                     result={'Q-ty of models': len(state)})
+            return state
+        else:
+            log_json(LOGGER_G, 'warning', 'The subprocess is failed',
+                     reason='DB connection/cursor creation failure')
+    return []
+
+
+def save_rate_limits_state(state: list[tuple[str, float, float, float]]) -> None:
+    """
+    Inserts or refreshes token bucket levels of models in 'gemini_rate_limits' table with a single query.
+
+    :param state: list of (model, requests level, tokens level, levels UNIX timestamp) tuples.
+    :return: None
+    """
+    if not state:
+        return
+
+    log_json(LOGGER_S, 'info', 'The subprocess is started')
+
+    with get_db_cursor() as cur:
+        if cur:
+            execute_values(
+                cur,
+                """
+                INSERT INTO gemini_rate_limits(model, requests_level, tokens_level, updated_at)
+                VALUES %s
+                ON CONFLICT (model) DO UPDATE
+                SET requests_level=EXCLUDED.requests_level, tokens_level=EXCLUDED.tokens_level,
+                    updated_at=EXCLUDED.updated_at
+                """,
+                state,
+                template='(%s, %s, %s, to_timestamp(%s))'
+            )
+            log_json(LOGGER_S, 'info', 'The subprocess is ended successfully',
+                     result={'Q-ty of models': len(state)})
+        else:
+            log_json(LOGGER_S, 'warning', 'The subprocess is failed',
+                     reason='DB connection/cursor creation failure')
@@ -1,202 +1,530 @@
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError, Error as PlaywrightError
-import time
+from playwright.async_api import (async_playwright, BrowserContext, TimeoutError as PlaywrightTimeoutError,
+                                  Error as PlaywrightError)
+import asyncio
+import re
+import threading
+from urllib.parse import urljoin, urlsplit
 import requests
-from utils.logging_config import log_json
-from config import URL_RESOLVER_TYPE, BROWSERLESS_API_KEY, BROWSERLESS_ENDPOINT
+from requests.adapters import HTTPAdapter
+from summarizer.resolved_urls_cache import get_cached_resolved_urls, save_resolved_urls
+from utils.retry_scheduler import RetryScheduler
+from utils.logging_config import log_json, log_span
+from config import (URL_RESOLVER_TYPE, BROWSERLESS_API_KEY, BROWSERLESS_ENDPOINT, PLAYWRIGHT_CONCURRENCY,
+                    URL_RESOLVER_HTTP_FIRST, HTTP_RESOLVER_CONCURRENCY, URL_RESOLVER_TRACKER_DOMAINS,
+                    BROWSERLESS_BATCH_SIZE, BROWSERLESS_CONCURRENCY, URL_RESOLVE_MAX_ATTEMPTS,
+                    URL_RESOLVE_BACKOFF_BASE_SECS, URL_RESOLVE_BACKOFF_MAX_SECS, URL_RESOLVE_DEADLINE_SECS)
 
 LOGGER = 'URLS RESOLVING SUBPROCESS'
 
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
 
-def resolve_urls_playwright(article_urls: dict[str, str], timeout=10000) -> tuple[dict[str, str], dict[str, str]]:
+# max q-ty of <meta http-equiv="refresh"> hops followed by HTTP resolver
+MAX_META_REFRESH_HOPS = 5
+# only the beginning of a page is read by HTTP resolver, meta refresh is located in <head>
+MAX_HTML_BYTES_TO_READ = 64 * 1024
+# markers of pages redirecting by JavaScript, which HTTP resolver can't follow
+JS_REDIRECT_MARKERS = ('window.location', 'location.href', 'location.replace', 'location.assign')
+# pages smaller than that and containing JS redirect markers are considered as redirect interstitials
+MAX_INTERSTITIAL_PAGE_BYTES = 8 * 1024
+
+META_TAG_PATTERN = re.compile(r'<meta\b[^>]*>', re.IGNORECASE)
+META_REFRESH_PATTERN = re.compile(r'http-equiv\s*=\s*["\']?refresh', re.IGNORECASE)
+META_CONTENT_PATTERN = re.compile(r'content\s*=\s*(["\'])(.*?)\1', re.IGNORECASE | re.DOTALL)
+REFRESH_URL_PATTERN = re.compile(r'url\s*=\s*["\']?([^"\'\s]+)', re.IGNORECASE)
+
+# max time a URL escalated to Browserless waits for other URLs to be sent in the same request
+BROWSERLESS_GROUP_WAIT_SECS = 0.5
+
+_http_session: requests.Session | None = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
     """
-    Resolves final URLs using local Playwright browser.
+    Returns the process-wide HTTP session with keep-alive connection pool, creating it on first use.
 
-    Launches headless browser with single context for all URLs, for each URL loads page
-    waiting for DOM ready, waits 1.5s for JS redirects, if URL unchanged, attempts
-    networkidle wait as fallback.
+    The session is shared by HTTP resolver and Browserless API requests.
 
-    :param article_urls: dict of 'article title-URL' pairs for URL resolving
-    :param timeout: page navigation timeout in milliseconds (default: 10000)
-    :return: tuple of (resolved_urls_dict, unresolved_urls_dict)
+    :return: shared requests.Session instance.
     """
-    dict_with_resolved_urls, dict_with_unresolved_urls = {}, {}
+    global _http_session
+
+    with _http_session_lock:
+        if _http_session is None:
+            _http_session = requests.Session()
+            pool_size = max(HTTP_RESOLVER_CONCURRENCY, BROWSERLESS_CONCURRENCY, 1)
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            _http_session.mount('https://', adapter)
+            _http_session.mount('http://', adapter)
+            _http_session.headers.update({'User-Agent': USER_AGENT})
+        return _http_session
 
-    try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            )
 
-            # Block static resources for faster loading
-            context.route("**/*.{png,jpg,jpeg,gif,svg,ico,css,woff,woff2}", lambda route: route.abort())
+def is_tracker_url(url: str) -> bool:
+    """
+    Checks whether URL belongs to a known email tracker or redirect interstitial domain
+    (URL_RESOLVER_TRACKER_DOMAINS constant set in 'config.py' module), including its subdomains.
 
-            for title, url in article_urls.items():
+    :param url: URL to check.
+    :return: True if URL host is a tracker domain or its subdomain, False otherwise.
+    """
+    host = (urlsplit(url).hostname or '').lower()
+    return any(host == domain or host.endswith(f'.{domain}') for domain in URL_RESOLVER_TRACKER_DOMAINS)
+
+
+def find_meta_refresh_url(html: str) -> str | None:
+    """
+    Finds target URL of <meta http-equiv="refresh" content="0; url=..."> tag.
+
+    :param html: beginning of HTML page.
+    :return: target URL as written in the tag (may be relative), or None if there is no such tag.
+    """
+    for meta_tag in META_TAG_PATTERN.finditer(html):
+        if META_REFRESH_PATTERN.search(meta_tag.group()):
+            content = META_CONTENT_PATTERN.search(meta_tag.group())
+            if content:
+                refresh_url = REFRESH_URL_PATTERN.search(content.group(2))
+                if refresh_url:
+                    return refresh_url.group(1)
+    return None
+
+
+def resolve_url_http(url: str, timeout=10000) -> str | None:
+    """
+    Resolves final URL without a browser: follows HTTP redirects and <meta http-equiv="refresh"> tags.
+
+    :param url: URL to resolve.
+    :param timeout: request timeout in milliseconds (default: 10000)
+    :return: final URL, or None if the page needs a browser: it ends on a tracker domain,
+        looks like a JS redirect interstitial or returns an error status (e.g. bot protection).
+    """
+    session = get_http_session()
+    current_url = url
+
+    for _ in range(MAX_META_REFRESH_HOPS + 1):
+        with session.get(current_url, allow_redirects=True, timeout=timeout / 1000, stream=True) as response:
+            final_url = response.url
+            if response.status_code >= 400:
+                log_json(LOGGER, 'debug', 'HTTP resolver got error status', url=url, final_url=final_url,
+                         status_code=response.status_code)
+                return None
+
+            html = ''
+            if 'html' in response.headers.get('Content-Type', ''):
+                html_bytes = b''
+                for chunk in response.iter_content(chunk_size=16 * 1024):
+                    html_bytes += chunk
+                    if len(html_bytes) >= MAX_HTML_BYTES_TO_READ:
+                        break
                 try:
-                    page = context.new_page()
-                    page.set_default_timeout(timeout)
-                    page.goto(url, wait_until='domcontentloaded', timeout=timeout)
-
-                    # Wait for JavaScript redirects
-                    page.wait_for_timeout(1500)
-                    final_url = page.url
-
-                    # Fallback: try networkidle if no redirect detected
-                    if final_url == url:
-                        try:
-                            page.wait_for_load_state('networkidle', timeout=3000)
-                            final_url = page.url
-                        except PlaywrightTimeoutError as e:
-                            log_json(LOGGER, 'warning', 'Network idle timeout, using current URL',
-                                     error=f'{e}', url=url)
-                            final_url = page.url
-
-                    page.close()
-                    dict_with_resolved_urls[title] = final_url
+                    html = html_bytes.decode(response.encoding or 'utf-8', errors='ignore')
+                except LookupError:
+                    # unknown charset in Content-Type header
+                    html = html_bytes.decode('utf-8', errors='ignore')
 
-                except PlaywrightTimeoutError as e:
-                    log_json(LOGGER, 'warning', 'Navigation timeout', error=f'{e}', url=url)
-                    dict_with_unresolved_urls[title] = url
+        refresh_url = find_meta_refresh_url(html)
+        if refresh_url:
+            current_url = urljoin(final_url, refresh_url)
+            continue
 
-                except PlaywrightError as e:
-                    log_json(LOGGER, 'error', 'Playwright page/browser error', error=f'{e}', url=url)
-                    dict_with_unresolved_urls[title] = url
+        if is_tracker_url(final_url):
+            return None
+        if len(html) < MAX_INTERSTITIAL_PAGE_BYTES and any(marker in html for marker in JS_REDIRECT_MARKERS):
+            return None
+        return final_url
+
+    log_json(LOGGER, 'debug', 'HTTP resolver exceeded meta refresh hops limit', url=url)
+    return None
 
-                except Exception as e:
-                    log_json(LOGGER, 'error', 'Unexpected error while resolving URL',
-                             error=f'{e}', url=url, title=title)
-                    dict_with_unresolved_urls[title] = url
 
-            context.close()
-            browser.close()
+def resolve_url_http_safely(url: str, timeout=10000) -> str | None:
+    """
+    Same as `resolve_url_http()`, but request failures and unexpected errors are logged
+    and the URL is treated as unresolved, i.e. escalated to a browser-based resolver.
 
+    :param url: URL to resolve.
+    :param timeout: request timeout in milliseconds (default: 10000)
+    :return: final URL, or None if the URL isn't resolved.
+    """
+    try:
+        return resolve_url_http(url, timeout)
+    except requests.RequestException as e:
+        log_json(LOGGER, 'debug', 'HTTP resolver request failure', error=f'{e}', url=url)
     except Exception as e:
-        log_json(LOGGER, 'critical', 'Critical error: failed to launch browser or during URL resolving',
-                 error=f'{e}')
-        return {}, article_urls
+        log_json(LOGGER, 'warning', 'Unexpected error while resolving URL via HTTP', error=f'{e}', url=url)
+    return None
 
-    return dict_with_resolved_urls, dict_with_unresolved_urls
+
+async def resolve_url_on_async_page(context: BrowserContext, url: str, timeout: int) -> str:
+    """
+    Resolves final URL of a single page in the given async Playwright browser context.
+
+    Loads page waiting for DOM ready, waits 1.5s for JS redirects, if URL unchanged,
+    attempts networkidle wait as fallback.
+
+    :param context: async Playwright browser context.
+    :param url: URL to resolve.
+    :param timeout: page navigation timeout in milliseconds.
+    :return: final URL of the page.
+    """
+    page = await context.new_page()
+    try:
+        page.set_default_timeout(timeout)
+        await page.goto(url, wait_until='domcontentloaded', timeout=timeout)
+
+        # Wait for JavaScript redirects
+        await page.wait_for_timeout(1500)
+        final_url = page.url
+
+        # Fallback: try networkidle if no redirect detected
+        if final_url == url:
+            try:
+                await page.wait_for_load_state('networkidle', timeout=3000)
+            except PlaywrightTimeoutError as e:
+                log_json(LOGGER, 'warning', 'Network idle timeout, using current URL',
+                         error=f'{e}', url=url)
+            final_url = page.url
+
+        return final_url
+    finally:
+        await page.close()
 
 
-def resolve_urls_browserless(article_urls: dict[str, str], timeout=10000) -> tuple[dict[str, str], dict[str, str]]:
+async def resolve_url_on_async_page_safely(context: BrowserContext, title: str, url: str,
+                                           timeout: int) -> str | None:
     """
-    Resolves final URLs using Browserless.io BrowserQL (GraphQL API).
+    Same as `resolve_url_on_async_page()`, but with an overall time limit of the page covering navigation
+    and redirects waiting, so one slow page can't hold up the others; errors are logged.
+
+    :param context: async Playwright browser context.
+    :param title: article title, for logging.
+    :param url: URL to resolve.
+    :param timeout: page navigation timeout in milliseconds.
+    :return: final URL of the page, or None if the URL isn't resolved.
+    """
+    # navigation timeout + JS redirect and networkidle waits + margin
+    page_time_limit_secs = timeout / 1000 + 1.5 + 3 + 5
+
+    try:
+        return await asyncio.wait_for(resolve_url_on_async_page(context, url, timeout), page_time_limit_secs)
 
-    Uses BrowserQL with GraphQL syntax which includes automatic CAPTCHA solving
-    and stealth mode for bypassing bot detection.
+    except (PlaywrightTimeoutError, asyncio.TimeoutError) as e:
+        log_json(LOGGER, 'warning', 'Navigation timeout', error=f'{e}', url=url)
 
+    except PlaywrightError as e:
+        log_json(LOGGER, 'error', 'Playwright page/browser error', error=f'{e}', url=url)
+
+    except Exception as e:
+        log_json(LOGGER, 'error', 'Unexpected error while resolving URL',
+                 error=f'{e}', url=url, title=title)
+    return None
+
+
+def build_browserless_query(urls_qty: int) -> str:
+    """
+    Builds BrowserQL (GraphQL) mutation navigating to several URLs in one request.
+
+    Each navigation is an aliased 'goto' operation ('url0', 'url1', ...) with its own URL variable,
+    so results of every URL can be read from response separately.
+
+    :param urls_qty: q-ty of URLs in the mutation.
+    :return: mutation text.
+    """
+    variables = ', '.join(f'$url{i}: String!' for i in range(urls_qty))
+    operations = '\n'.join(
+        f"""  url{i}: goto(url: $url{i}, waitUntil: domContentLoaded) {{
+    status
+    url
+  }}"""
+        for i in range(urls_qty)
+    )
+    return f'mutation Navigate({variables}) {{\n{operations}\n}}'
+
+
+def resolve_urls_browserless_group(api_url: str, article_urls: dict[str, str],
+                                   timeout=10000) -> tuple[dict[str, str], dict[str, str]]:
+    """
+    Resolves a group of URLs with a single Browserless BrowserQL request (see `build_browserless_query()`).
+
+    :param api_url: BrowserQL endpoint URL with token.
     :param article_urls: dict of 'article title-URL' pairs for URL resolving
     :param timeout: page navigation timeout in milliseconds (default: 10000)
     :return: tuple of (resolved_urls_dict, unresolved_urls_dict)
     """
     dict_with_resolved_urls, dict_with_unresolved_urls = {}, {}
+    titles, urls = list(article_urls.keys()), list(article_urls.values())
 
-    if not BROWSERLESS_API_KEY:
-        log_json(LOGGER, 'critical', 'Browserless API key is not configured')
-        return {}, article_urls
+    payload = {
+        "query": build_browserless_query(len(urls)),
+        "variables": {f'url{i}': url for i, url in enumerate(urls)}
+    }
 
-    # BrowserQL endpoint - uses GraphQL
-    api_url = f"{BROWSERLESS_ENDPOINT}/chromium/bql?token={BROWSERLESS_API_KEY}"
+    try:
+        response = get_http_session().post(
+            api_url,
+            json=payload,
+            # navigations in one request are executed one after another
+            timeout=timeout / 1000 * len(urls) + 10,
+            headers={'Content-Type': 'application/json'}
+        )
+    except requests.Timeout as e:
+        log_json(LOGGER, 'warning', 'Browserless request timeout', error=f'{e}', urls=urls)
+        return {}, article_urls
+    except requests.RequestException as e:
+        log_json(LOGGER, 'error', 'Browserless API error', error=f'{e}', urls=urls)
+        return {}, article_urls
 
-    for title, url in article_urls.items():
-        try:
-            # GraphQL mutation to navigate and get final URL
-            query = """
-            mutation Navigate($url: String!) {
-              goto(url: $url, waitUntil: domContentLoaded) {
-                status
-                url
-              }
-            }
-            """
-
-            variables = {
-                "url": url
-            }
-
-            payload = {
-                "query": query,
-                "variables": variables
-            }
-
-            response = requests.post(
-                api_url,
-                json=payload,
-                timeout=timeout / 1000 + 10,
-                headers={'Content-Type': 'application/json'}
-            )
-
-            if response.status_code == 200:
-                result = response.json()
-
-                # GraphQL response structure: data -> goto -> url
-                if 'data' in result and 'goto' in result['data']:
-                    goto_result = result['data']['goto']
-                    final_url = goto_result.get('url', url)
+    if response.status_code != 200:
+        log_json(LOGGER, 'warning', f'Browserless BrowserQL returned non-200 status',
+                 status_code=response.status_code,
+                 response_text=response.text[:500] if response.text else 'No response text',
+                 urls=urls)
+        return {}, article_urls
 
-                    dict_with_resolved_urls[title] = final_url
-                    log_json(LOGGER, 'debug', 'URL resolved successfully via Browserless BrowserQL',
-                             original_url=url, final_url=final_url, status=goto_result.get('status'))
-                else:
-                    log_json(LOGGER, 'warning', 'Unexpected BrowserQL response structure',
-                             response=result, url=url)
-                    dict_with_unresolved_urls[title] = url
-            else:
-                log_json(LOGGER, 'warning', f'Browserless BrowserQL returned non-200 status',
-                         status_code=response.status_code,
-                         response_text=response.text[:500] if response.text else 'No response text',
-                         url=url)
-                dict_with_unresolved_urls[title] = url
-
-        except requests.Timeout as e:
-            log_json(LOGGER, 'warning', 'Browserless request timeout', error=f'{e}', url=url)
-            dict_with_unresolved_urls[title] = url
+    try:
+        result = response.json()
+    except ValueError as e:
+        log_json(LOGGER, 'warning', 'Unexpected BrowserQL response structure', error=f'{e}',
+                 response_text=response.text[:500], urls=urls)
+        return {}, article_urls
 
-        except requests.RequestException as e:
-            log_json(LOGGER, 'error', 'Browserless API error', error=f'{e}', url=url)
-            dict_with_unresolved_urls[title] = url
+    # GraphQL response structure: data -> url<i> -> url, failed navigations are null and listed in errors
+    if not isinstance(result, dict):
+        log_json(LOGGER, 'warning', 'Unexpected BrowserQL response structure',
+                 response_text=response.text[:500], urls=urls)
+        return {}, article_urls
+    if result.get('errors'):
+        log_json(LOGGER, 'warning', 'BrowserQL response contains errors', errors=result['errors'], urls=urls)
+    data = result.get('data') or {}
+    if not isinstance(data, dict):
+        log_json(LOGGER, 'warning', 'Unexpected BrowserQL response structure',
+                 response_text=response.text[:500], urls=urls)
+        return {}, article_urls
 
-        except Exception as e:
-            log_json(LOGGER, 'error', 'Unexpected error while resolving URL via Browserless',
-                     error=f'{e}', url=url, title=title)
+    for i, (title, url) in enumerate(zip(titles, urls)):
+        goto_result = data.get(f'url{i}')
+        if isinstance(goto_result, dict) and goto_result.get('url'):
+            dict_with_resolved_urls[title] = goto_result['url']
+            log_json(LOGGER, 'debug', 'URL resolved successfully via Browserless BrowserQL',
+                     original_url=url, final_url=goto_result['url'], status=goto_result.get('status'))
+        else:
             dict_with_unresolved_urls[title] = url
 
     return dict_with_resolved_urls, dict_with_unresolved_urls
 
 
-def resolve_urls(article_urls: dict[str, str], timeout=10000) -> tuple[dict[str, str], dict[str, str]]:
+class BrowserlessGroupBatcher:
     """
-    Resolves final URLs for URLs in dict of 'article title-url' pairs, handling JavaScript redirects.
+    Groups URLs escalated to Browserless one by one (by concurrent per-URL tasks) into multi-navigation
+    requests (see `resolve_urls_browserless_group()`): a group is sent once it has BROWSERLESS_BATCH_SIZE URLs
+    or BROWSERLESS_GROUP_WAIT_SECS after its first URL, at most BROWSERLESS_CONCURRENCY requests at a time.
+    """
+
+    def __init__(self, api_url: str, timeout: int) -> None:
+        self._api_url = api_url
+        self._timeout = timeout
+        self._batch_size = max(1, BROWSERLESS_BATCH_SIZE)
+        self._semaphore = asyncio.Semaphore(max(1, BROWSERLESS_CONCURRENCY))
+        # 'article title-(URL, future of final URL)' pairs of the group being collected
+        self._pending: dict[str, tuple[str, asyncio.Future]] = {}
+        self._send_timer: asyncio.TimerHandle | None = None
+        self._requests = set()
+        self.requests_qty = 0
+
+    async def resolve(self, title: str, url: str) -> str | None:
+        """
+        :return: final URL, or None if the URL isn't resolved.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[title] = (url, future)
+
+        if len(self._pending) >= self._batch_size:
+            self._send_pending()
+        elif self._send_timer is None:
+            self._send_timer = loop.call_later(BROWSERLESS_GROUP_WAIT_SECS, self._send_pending)
+
+        return await future
+
+    def _send_pending(self) -> None:
+        if self._send_timer is not None:
+            self._send_timer.cancel()
+            self._send_timer = None
+
+        group, self._pending = self._pending, {}
+        if group:
+            request = asyncio.create_task(self._send(group))
+            self._requests.add(request)
+            request.add_done_callback(self._requests.discard)
+
+    async def _send(self, group: dict[str, tuple[str, asyncio.Future]]) -> None:
+        resolved_urls = {}
+        try:
+            async with self._semaphore:
+                self.requests_qty += 1
+                resolved_urls, _ = await asyncio.to_thread(
+                    resolve_urls_browserless_group, self._api_url,
+                    {title: url for title, (url, _) in group.items()}, self._timeout
+                )
+        except Exception as e:
+            log_json(LOGGER, 'error', 'Unexpected error while resolving URLs via Browserless', error=f'{e}',
+                     urls=[url for url, _ in group.values()])
+        finally:
+            for title, (_, future) in group.items():
+                # the waiting attempt may have been cancelled by the deadline
+                if not future.done():
+                    future.set_result(resolved_urls.get(title))
+
+
+class StageUrlResolver:
+    """
+    Resolves URLs one at a time for concurrent per-URL tasks, sharing resources for the whole resolving stage:
+    pooled HTTP session, a single Playwright browser (launched when the first URL is escalated to it)
+    or grouped Browserless requests (see `BrowserlessGroupBatcher`).
+
+    URLs are resolved in two tiers:
+      1. lightweight HTTP resolver following HTTP redirects and meta refresh (see `resolve_url_http()`),
+         if URL_RESOLVER_HTTP_FIRST is on, up to HTTP_RESOLVER_CONCURRENCY URLs at a time;
+      2. browser-based resolver set by URL_RESOLVER_TYPE, only for URLs the first tier couldn't resolve,
+         e.g. still landing on a tracker domain or a JS redirect interstitial: Playwright pages
+         (up to PLAYWRIGHT_CONCURRENCY at a time) or Browserless requests.
+    Must be used as an async context manager.
+    """
+
+    def __init__(self, timeout=10000) -> None:
+        self._timeout = timeout
+        self._http_semaphore = asyncio.Semaphore(max(1, HTTP_RESOLVER_CONCURRENCY))
+        self._page_semaphore = asyncio.Semaphore(max(1, PLAYWRIGHT_CONCURRENCY))
+        self._browser_lock = asyncio.Lock()
+        self._playwright = None
+        self._browser = None
+        self._context: BrowserContext | None = None
+        self._browser_launch_failed = False
+
+        self.browser_resolver = 'browserless' if URL_RESOLVER_TYPE.lower() == 'browserless' else 'playwright'
+        if URL_RESOLVER_TYPE.lower() not in ('browserless', 'playwright'):
+            log_json(LOGGER, 'warning', f'Unknown URL_RESOLVER_TYPE: {URL_RESOLVER_TYPE}, defaulting to Playwright')
+        self._browserless = None
+        if self.browser_resolver == 'browserless' and BROWSERLESS_API_KEY:
+            self._browserless = BrowserlessGroupBatcher(
+                f"{BROWSERLESS_ENDPOINT}/chromium/bql?token={BROWSERLESS_API_KEY}", timeout)
+
+    async def __aenter__(self) -> 'StageUrlResolver':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        try:
+            if self._browser is not None:
+                await self._browser.close()
+            if self._playwright is not None:
+                await self._playwright.stop()
+        except Exception as e:
+            log_json(LOGGER, 'warning', 'Browser closing failure', error=f'{e}')
+
+    async def resolve(self, title: str, url: str) -> tuple[str | None, str | None]:
+        """
+        :param title: article title.
+        :param url: URL to resolve.
+        :return: tuple of (final URL, name of the resolver: 'http', 'playwright' or 'browserless'),
+            or (None, None) if the URL isn't resolved.
+        """
+        if URL_RESOLVER_HTTP_FIRST:
+            async with self._http_semaphore:
+                final_url = await asyncio.to_thread(resolve_url_http_safely, url, self._timeout)
+            if final_url:
+                return final_url, 'http'
+
+        if self.browser_resolver == 'browserless':
+            if self._browserless is None:
+                log_json(LOGGER, 'critical', 'Browserless API key is not configured')
+                return None, None
+            final_url = await self._browserless.resolve(title, url)
+        else:
+            context = await self._get_browser_context()
+            if context is None:
+                return None, None
+            async with self._page_semaphore:
+                final_url = await resolve_url_on_async_page_safely(context, title, url, self._timeout)
+
+        return (final_url, self.browser_resolver) if final_url else (None, None)
+
+    async def _get_browser_context(self) -> BrowserContext | None:
+        # a failed launch isn't retried, so URLs escalated to the browser fail fast instead of relaunching it
+        async with self._browser_lock:
+            if self._context is None and not self._browser_launch_failed:
+                try:
+                    if self._playwright is None:
+                        self._playwright = await async_playwright().start()
+                    self._browser = await self._playwright.chromium.launch(headless=True)
+                    context = await self._browser.new_context(user_agent=USER_AGENT)
+                    # Block static resources for faster loading
+                    await context.route("**/*.{png,jpg,jpeg,gif,svg,ico,css,woff,woff2}",
+                                        lambda route: route.abort())
+                    self._context = context
+                except Exception as e:
+                    log_json(LOGGER, 'critical', 'Critical error: failed to launch browser', error=f'{e}')
+                    self._browser_launch_failed = True
+            return self._context
+
 
-    Dispatches to either Playwright (local) or Browserless (cloud) implementation based on
-    URL_RESOLVER_TYPE configuration.
+async def resolve_urls_with_retries(article_urls: dict[str, str], scheduler: RetryScheduler,
+                                    resolvers: dict[str, str], timeout=10000) -> dict[str, str]:
+    """
+    Resolves URLs with one asyncio task per URL (see `StageUrlResolver`), each retried by the scheduler
+    as soon as its own attempt fails, so a slow URL doesn't hold up the others.
 
-    :param article_urls: dict of 'article title-URL' pairs {'article title', 'article url'} for URL resolving
+    :param article_urls: dict of 'article title-URL' pairs for URL resolving
+    :param scheduler: retry scheduler limiting attempts and time of the stage.
+    :param resolvers: dict filled in with 'article title-resolver name' pairs for resolved URLs
     :param timeout: page navigation timeout in milliseconds (default: 10000)
-    :return: tuple of dictionaries with resolved and unresolved urls lists.
-        On critical errors returns ({}, article_urls)
+    :return: dict of 'article title-final URL' pairs of resolved URLs
     """
-    resolver_type = URL_RESOLVER_TYPE.lower()
+    dict_with_resolved_urls = {}
+
+    async with StageUrlResolver(timeout) as url_resolver:
+
+        async def resolve_with_retries(title: str, url: str) -> None:
+            async def attempt() -> bool:
+                final_url, resolver = await url_resolver.resolve(title, url)
+                if final_url:
+                    dict_with_resolved_urls[title] = final_url
+                    resolvers[title] = resolver
+                return bool(final_url)
+
+            await scheduler.run(attempt)
+
+        await asyncio.gather(*(resolve_with_retries(title, url) for title, url in article_urls.items()))
+
+    if article_urls:
+        http_resolved_qty = sum(1 for resolver in resolvers.values() if resolver == 'http')
+        browser_resolved_qty = len(dict_with_resolved_urls) - http_resolved_qty
+        # the browser tier gets only URLs the HTTP tier couldn't resolve
+        escalated_qty = len(article_urls) - http_resolved_qty
+        log_json(LOGGER, 'info', 'URLs resolution tiers statistics',
+                 tier_stats={'http': {'resolved': http_resolved_qty,
+                                      'hit_ratio': round(http_resolved_qty / len(article_urls), 2)},
+                             'browser': {'resolved': browser_resolved_qty,
+                                         'hit_ratio': round(browser_resolved_qty / escalated_qty, 2)
+                                         if escalated_qty else None},
+                             'unresolved': len(article_urls) - len(dict_with_resolved_urls)})
 
-    if resolver_type == 'browserless':
-        log_json(LOGGER, 'debug', 'Using Browserless for URL resolution')
-        return resolve_urls_browserless(article_urls, timeout)
-    elif resolver_type == 'playwright':
-        log_json(LOGGER, 'debug', 'Using Playwright for URL resolution')
-        return resolve_urls_playwright(article_urls, timeout)
-    else:
-        log_json(LOGGER, 'warning', f'Unknown URL_RESOLVER_TYPE: {resolver_type}, defaulting to Playwright')
-        return resolve_urls_playwright(article_urls, timeout)
+    return dict_with_resolved_urls
 
 
+@log_span(LOGGER, 'resolve')
 def retry_resolve_urls(material_sources: dict[str, list[str] | dict[str, str]]) -> dict[
     str, list[str] | dict[str, str]]:
     """
     Repeatedly attempts to resolve final URLs in the 'articles' section of material_sources.
 
-    Wraps the `resolve_urls` function in a retry loop. Unresolved URLs are retried up to
-    three times with a short pause between attempts. Successfully resolved URLs from
-    each attempt are accumulated. Unresolved URLs after the final attempt are discarded.
+    Before any resolving, final URLs are looked up in 'resolved_urls' cache table with a single query
+    (see 'resolved_urls_cache.py' module). Only URLs missing in cache are resolved, each by its own
+    asyncio task (see `resolve_urls_with_retries()`) under a per-URL retry scheduler: each URL has its own
+    attempt counter, and a failed URL is retried after its own exponential backoff with jitter, without
+    waiting for other URLs. Attempts are limited by URL_RESOLVE_MAX_ATTEMPTS per URL and by
+    URL_RESOLVE_DEADLINE_SECS for the whole stage, which also bounds every running attempt
+    (constants set in 'config.py' module). Must not be called from a running event loop.
+    Successfully resolved URLs are saved to cache with a single query. Unresolved URLs are discarded.
 
     :param material_sources: dictionary of extracted materials, typically from `email_parser()`.
         Should contain a key 'articles' with {title: original_url}.
@@ -205,28 +533,42 @@ def retry_resolve_urls(material_sources: dict[str, list[str] | dict[str, str]])
     log_json(LOGGER, 'info', 'The subprocess is started')
 
     dict_with_unresolved_urls = {}
+    cache_stats = {'hits': 0, 'misses': 0}
+    attempts_histogram = {}
 
     if 'articles' in material_sources:
-        dict_with_unresolved_urls = material_sources['articles']
-        final_dict_with_resolved_urls = {}
+        article_urls = material_sources['articles']
 
-        for attempt in range(3):
-            if not dict_with_unresolved_urls:
-                break
+        cached_urls = get_cached_resolved_urls(list(article_urls.values()))
+        final_dict_with_resolved_urls = {title: cached_urls[url] for title, url in article_urls.items()
+                                         if url in cached_urls}
+        dict_with_unresolved_urls = {title: url for title, url in article_urls.items() if url not in cached_urls}
+        cache_stats = {'hits': len(final_dict_with_resolved_urls), 'misses': len(dict_with_unresolved_urls)}
 
-            log_json(LOGGER, 'debug', f'URLs resolving attempt No. {attempt + 1}')
+        resolvers = {}
+        scheduler = RetryScheduler(URL_RESOLVE_MAX_ATTEMPTS, URL_RESOLVE_BACKOFF_BASE_SECS,
+                                   URL_RESOLVE_BACKOFF_MAX_SECS, URL_RESOLVE_DEADLINE_SECS)
+        final_dict_with_resolved_urls.update(
+            asyncio.run(resolve_urls_with_retries(dict_with_unresolved_urls, scheduler, resolvers))
+        )
 
-            dict_with_resolved_urls, dict_with_unresolved_urls = resolve_urls(dict_with_unresolved_urls)
-            final_dict_with_resolved_urls.update(dict_with_resolved_urls)
+        dict_with_unresolved_urls = {title: url for title, url in dict_with_unresolved_urls.items()
+                                     if title not in final_dict_with_resolved_urls}
+        attempts_histogram = scheduler.attempts_histogram()
 
-            if attempt != 2:
-                time.sleep(3)
+        save_resolved_urls([(article_urls[title], final_dict_with_resolved_urls[title], resolver)
+                            for title, resolver in resolvers.items()])
 
-        material_sources['articles'] = final_dict_with_resolved_urls
+        # keeping input order of articles
+        material_sources['articles'] = {title: final_dict_with_resolved_urls[title] for title in article_urls
+                                        if title in final_dict_with_resolved_urls}
 
     log_json(LOGGER, 'info', 'The subprocess is ended successfully',
              result={'Resolved urls q-ty': len(material_sources['articles']),
                      'Unresolved urls q-ty': len(dict_with_unresolved_urls),
-                     'List of unresolved urls': [url for url in dict_with_unresolved_urls.values()]})
+                     'List of unresolved urls': [url for url in dict_with_unresolved_urls.values()],
+                     'Resolved urls cache hits q-ty': cache_stats['hits'],
+                     'Resolved urls cache misses q-ty': cache_stats['misses'],
+                     'Resolving attempts histogram': attempts_histogram})
 
     return material_sources
@@ -0,0 +1,76 @@
+from psycopg2.extras import execute_values
+from db_connector.db_cursor_creator import get_db_cursor
+from utils.logging_config import log_json
+from config import RESOLVED_URLS_CACHE_TTL_HOURS
+
+
+LOGGER_G = 'GETTING RESOLVED URLS FROM CACHE SUBPROCESS'
+LOGGER_S = 'SAVING RESOLVED URLS TO CACHE SUBPROCESS'
+
+
+def get_cached_resolved_urls(original_urls: list[str]) -> dict[str, str]:
+    """
+    Reads not expired final URLs for the given original URLs from 'resolved_urls' table with a single query.
+
+    Cache entries older than RESOLVED_URLS_CACHE_TTL_HOURS (constant set in 'config.py' module) are ignored.
+    Cache is disabled if the constant is 0.
+
+    :param original_urls: original (tracking) URLs.
+    :return: dict of {'original url': 'final url'} pairs found in cache, or an empty dict
+        if nothing is found, cache is disabled or DB connection fails.
+    """
+    if not original_urls or RESOLVED_URLS_CACHE_TTL_HOURS <= 0:
+        return {}
+
+    log_json(LOGGER_G, 'info', 'The subprocess is started')
+
+    with get_db_cursor() as cur:
+        if cur:
+            cur.execute(
+                """
+                SELECT original_url, final_url FROM resolved_urls
+                WHERE original_url = ANY(%s) AND resolved_at > NOW() - make_interval(hours => %s)
+                """,
+                (list(original_urls), RESOLVED_URLS_CACHE_TTL_HOURS)
+            )
+            cached_urls = {row['original_url']: row['final_url'] for row in cur.fetchall()}
+            log_json(LOGGER_G, 'info', 'The subprocess is ended successfully',
+                     result={'Q-ty of URLs found in cache': len(cached_urls)})
+            return cached_urls
+        else:
+            log_json(LOGGER_G, 'warning', 'The subprocess is failed',
+                     reason='DB connection/cursor creation failure')
+    return {}
+
+
+def save_resolved_urls(resolved_urls: list[tuple[str, str, str]]) -> None:
+    """
+    Inserts or refreshes resolved URLs in 'resolved_urls' table with a single query.
+
+    :param resolved_urls: list of (original url, final url, resolver name) tuples.
+    :return: None
+    """
+    if not resolved_urls or RESOLVED_URLS_CACHE_TTL_HOURS <= 0:
+        return
+
+    log_json(LOGGER_S, 'info', 'The subprocess is started')
+
+    with get_db_cursor() as cur:
+        if cur:
+            # the same original URL may come under different titles, the last result wins
+            unique_resolved_urls = list({row[0]: row for row in resolved_urls}.values())
+            execute_values(
+                cur,
+                """
+                INSERT INTO resolved_urls(original_url, final_url, resolver)
+                VALUES %s
+                ON CONFLICT (original_url) DO UPDATE
+                SET final_url=EXCLUDED.final_url, resolver=EXCLUDED.resolver, resolved_at=NOW()
+                """,
+                unique_resolved_urls
+            )
+            log_json(LOGGER_S, 'info', 'The subprocess is ended successfully',
+                     result={'Q-ty of URLs saved to cache': len(unique_resolved_urls)})
+        else:
+            log_json(LOGGER_S, 'warning', 'The subprocess is failed',
+                     reason='DB connection/cursor creation failure')
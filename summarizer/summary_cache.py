@@ -0,0 +1,96 @@
+import hashlib
+from psycopg2.extras import execute_values, Json
+from db_connector.db_cursor_creator import get_db_cursor
+from summarizer.prompts import PROMPT_VERSION
+from utils.logging_config import log_json
+from config import SUMMARY_CACHE_TTL_HOURS
+
+
+LOGGER_G = 'GETTING SUMMARIES FROM CACHE SUBPROCESS'
+LOGGER_S = 'SAVING SUMMARIES TO CACHE SUBPROCESS'
+
+
+def make_summary_cache_key(material_type: str, content: str, model: str) -> str:
+    """
+    Makes a content-addressed summary cache key, so the same material summarized with the same
+    prompt version and model is found regardless of its title or newsletter.
+
+    :param material_type: 'articles' or 'pytricks'.
+    :param content: resolved article URL or snippet text.
+    :param model: Gemini model name.
+    :return: SHA-256 hex digest.
+    """
+    key_source = '\n'.join((material_type, str(PROMPT_VERSION), model, content))
+    return hashlib.sha256(key_source.encode('UTF-8')).hexdigest()
+
+
+def get_cached_summaries(cache_keys: list[str]) -> dict[str, dict]:
+    """
+    Reads not expired parsed Gemini responses for the given keys from 'summary_cache' table with a single query.
+
+    Cache entries older than SUMMARY_CACHE_TTL_HOURS (constant set in 'config.py' module) are ignored.
+    Cache is disabled if the constant is 0.
+
+    :param cache_keys: keys made by `make_summary_cache_key()`.
+    :return: dict of {'cache key': parsed response} pairs found in cache, or an empty dict
+        if nothing is found, cache is disabled or DB connection fails.
+    """
+    if not cache_keys or SUMMARY_CACHE_TTL_HOURS <= 0:
+        return {}
+
+    log_json(LOGGER_G, 'info', 'The subprocess is started')
+
+    with get_db_cursor() as cur:
+        if cur:
+            cur.execute(
+                """
+                SELECT cache_key, response FROM summary_cache
+                WHERE cache_key = ANY(%s) AND created_at > NOW() - make_interval(hours => %s)
+                """,
+                (list(cache_keys), SUMMARY_CACHE_TTL_HOURS)
+            )
+            cached_summaries = {row['cache_key']: row['response'] for row in cur.fetchall()}
+            log_json(LOGGER_G, 'info', 'The subprocess is ended successfully',
+                     result={'Q-ty of summaries found in cache': len(cached_summaries)})
+            return cached_summaries
+        else:
+            log_json(LOGGER_G, 'warning', 'The subprocess is failed',
+                     reason='DB connection/cursor creation failure')
+    return {}
+
+
+def save_summaries(summaries: list[tuple[str, str, str, dict]]) -> None:
+    """
+    Inserts or refreshes parsed Gemini responses in 'summary_cache' table with a single query.
+
+    :param summaries: list of (material type, content, model, parsed response) tuples,
+        see `make_summary_cache_key()`.
+    :return: None
+    """
+    if not summaries or SUMMARY_CACHE_TTL_HOURS <= 0:
+        return
+
+    log_json(LOGGER_S, 'info', 'The subprocess is started')
+
+    with get_db_cursor() as cur:
+        if cur:
+            # the same material may come twice in a run, the last response wins
+            rows = {}
+            for material_type, content, model, response in summaries:
+                cache_key = make_summary_cache_key(material_type, content, model)
+                rows[cache_key] = (cache_key, material_type, model, PROMPT_VERSION, Json(response))
+            execute_values(
+                cur,
+                """
+                INSERT INTO summary_cache(cache_key, material_type, model, prompt_version, response)
+                VALUES %s
+                ON CONFLICT (cache_key) DO UPDATE
+                SET response=EXCLUDED.response, created_at=NOW()
+                """,
+                list(rows.values())
+            )
+            log_json(LOGGER_S, 'info', 'The subprocess is ended successfully',
+                     result={'Q-ty of summaries saved to cache': len(rows)})
+        else:
+            log_json(LOGGER_S, 'warning', 'The subprocess is failed',
+                     reason='DB connection/cursor creation failure')
@@ -0,0 +1,89 @@
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from post_storage.pg_storage_manager import get_existing_canonical_urls
+from utils.logging_config import log_json, log_span
+
+
+LOGGER = 'ARTICLES DEDUPLICATION SUBPROCESS'
+
+# query parameters added by newsletters, ad and analytics platforms, which don't change the page content
+TRACKING_PARAM_PREFIXES = ('utm_', 'mc_', '_hs', 'pk_')
+TRACKING_PARAMS = frozenset(('ref', 'ref_src', 'referrer', 'source', 'fbclid', 'gclid', 'dclid', 'msclkid',
+                             'yclid', 'igshid', 'mkt_tok', 'trk', 'sc_campaign', 'via'))
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Brings a URL to a canonical form, so links to the same article from different newsletters match:
+    scheme is set to https, host is lowercased without 'www.' and a default port, tracking
+    query parameters and fragment are removed, the rest query parameters are sorted and
+    a trailing slash of the path is stripped.
+
+    :param url: resolved article URL.
+    :return: canonical URL.
+    """
+    parts = urlsplit(url.strip())
+
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and port != DEFAULT_PORTS.get(parts.scheme.lower()):
+        host = f'{host}:{port}'
+
+    path = parts.path.rstrip('/')
+    query = urlencode(sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in TRACKING_PARAMS and not name.lower().startswith(TRACKING_PARAM_PREFIXES)
+    ))
+
+    return urlunsplit(('https', host, path, query, ''))
+
+
+@log_span(LOGGER, 'deduplicate')
+def deduplicate_articles(materials: dict[str, list[str] | dict[str, str]],
+                         seen_canonical_urls: set[str] | None = None) -> dict[str, list[str] | dict[str, str]]:
+    """
+    Drops articles whose canonical URL (see `canonicalize_url()`) repeats within a run or belongs to
+    an already stored post (in any batch), so duplicates don't cost LLM quota and aren't posted twice.
+    Stored canonical URLs are checked with a single DB request.
+
+    :param materials: dictionary with 'articles' (dict of 'article title-resolved URL' pairs)
+        and 'pytricks' keys, typically from `retry_resolve_urls()`.
+    :param seen_canonical_urls: canonical URLs of articles already passed in this run, updated in place;
+        lets a run deduplicate articles coming in several portions (streaming pipeline).
+    :return: the same dictionary structure without duplicate articles, PyTricks are kept as is.
+    """
+    articles = materials.get('articles') or {}
+    if not articles:
+        return materials
+
+    log_json(LOGGER, 'info', 'The subprocess is started')
+
+    if seen_canonical_urls is None:
+        seen_canonical_urls = set()
+
+    canonical_urls = {title: canonicalize_url(url) for title, url in articles.items()}
+    stored_canonical_urls = get_existing_canonical_urls(list(set(canonical_urls.values())))
+
+    unique_articles = {}
+    run_duplicates_qty = stored_duplicates_qty = 0
+    for title, url in articles.items():
+        canonical_url = canonical_urls[title]
+        if canonical_url in stored_canonical_urls:
+            stored_duplicates_qty += 1
+        elif canonical_url in seen_canonical_urls:
+            run_duplicates_qty += 1
+        else:
+            seen_canonical_urls.add(canonical_url)
+            unique_articles[title] = url
+
+    log_json(LOGGER, 'info', 'The subprocess is ended successfully',
+             result={'Q-ty of unique articles': len(unique_articles),
+                     'Q-ty of duplicates within the run': run_duplicates_qty,
+                     'Q-ty of already stored articles': stored_duplicates_qty})
+
+    return {**materials, 'articles': unique_articles}
@@ -1,6 +1,6 @@
-from telegram.error import TelegramError
+from telegram.error import TelegramError, RetryAfter
 from telegram import Bot
-from utils.logging_config import log_json
+from utils.logging_config import log_json, log_span
 from config import TELEGRAM_BOT_TOKEN, TELEGRAM_CHANNEL_ID
 
 
@@ -9,18 +9,29 @@ LOGGER = 'MESSAGE SENDING SUBPROCESS'
 bot = Bot(token=TELEGRAM_BOT_TOKEN)
 
 
-async def post_to_telegram_channel(post_text: str) -> None:
+async def post_to_telegram_channel(post_text: str) -> bool:
     """
     Sends a text message to the configured Telegram channel.
 
     :param post_text: the message text to be sent.
-    :return: None
+    :return: True if the message is sent, False on a sending failure.
+    :raises telegram.error.RetryAfter: if Telegram flood control is exceeded, so the caller can send
+        the message again after `retry_after`.
     """
     log_json(LOGGER, 'info', 'The subprocess is started')
 
-    try:
-        await bot.send_message(chat_id=TELEGRAM_CHANNEL_ID, text=post_text, parse_mode='HTML')
-        log_json(LOGGER, 'info', 'The subprocess is ended successfully')
-    except TelegramError as e:
-        log_json(LOGGER, 'error', 'The subprocess is failed', reason='Message sending failure',
-                 error=f'{e}')
+    with log_span(LOGGER, 'telegram_send') as span:
+        try:
+            await bot.send_message(chat_id=TELEGRAM_CHANNEL_ID, text=post_text, parse_mode='HTML')
+            log_json(LOGGER, 'info', 'The subprocess is ended successfully')
+            return True
+        except RetryAfter as e:
+            span['status'] = 'error'
+            log_json(LOGGER, 'warning', 'The subprocess is failed', reason='Flood control exceeded',
+                     error=f'{e}')
+            raise
+        except TelegramError as e:
+            span['status'] = 'error'
+            log_json(LOGGER, 'error', 'The subprocess is failed', reason='Message sending failure',
+                     error=f'{e}')
+            return False
@@ -0,0 +1,54 @@
+import asyncio
+import unittest
+from unittest import mock
+from processes import post_accumulation_pipeline as pipeline
+
+
+def resolve_all(materials: dict) -> dict:
+    return materials
+
+
+def deduplicate_none(materials: dict, seen_canonical_urls: set) -> dict:
+    return materials
+
+
+class StreamingPipelineTest(unittest.TestCase):
+
+    def run_pipeline(self, summarize) -> tuple[list[str], list[str | None]]:
+        raw_messages = [f'message {i}' for i in range(10)]
+        with mock.patch.multiple(pipeline, ACCUMULATION_PIPELINE_QUEUE_SIZE=1,
+                                 fetch_unseen_emails=lambda: raw_messages,
+                                 email_parser=lambda messages: {'articles': {messages[0]: f'https://{messages[0]}'},
+                                                                'pytricks': []},
+                                 retry_resolve_urls=resolve_all, deduplicate_articles=deduplicate_none,
+                                 summarize_material=summarize, create_generator=object,
+                                 compile_post_texts=lambda elements: [str(item) for item in elements['articles']],
+                                 get_post_canonical_urls=lambda elements: [None] * len(elements['articles'])):
+            return asyncio.run(asyncio.wait_for(pipeline.run_streaming_pipeline(), timeout=5))
+
+    def test_materials_pass_all_stages(self):
+        generators = []
+
+        def summarize(materials, generator):
+            generators.append(generator)
+            return {'articles': list(materials['articles']), 'pytricks': []}
+
+        post_texts, canonical_urls = self.run_pipeline(summarize)
+
+        self.assertEqual(sorted(post_texts), sorted(f'message {i}' for i in range(10)))
+        self.assertEqual(canonical_urls, [None] * 10)
+        # micro-batches share a single model fallback generator
+        self.assertGreater(len(generators), 1)
+        self.assertEqual(len(set(map(id, generators))), 1)
+
+    def test_failed_stage_stops_pipeline(self):
+        def summarize(materials, generator):
+            raise ConnectionError('Gemini is unreachable')
+
+        # upstream stages are blocked on full queues when the summarize stage fails
+        with self.assertRaises(ConnectionError):
+            self.run_pipeline(summarize)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import asyncio
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from summarizer import redirect_url_resolver as resolver
+from utils.retry_scheduler import RetryScheduler
+
+
+class BrowserQLStubHandler(BaseHTTPRequestHandler):
+    """
+    Stand-in for Browserless BrowserQL endpoint: records posted payloads and answers with
+    the (status, body) returned by the server's `respond` callable.
+    """
+
+    def do_POST(self) -> None:
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with self.server.lock:
+            self.server.payloads.append(payload)
+        status, body = self.server.respond(payload)
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def resolve_all(payload: dict) -> tuple[int, bytes]:
+    data = {alias: {'status': 200, 'url': f'{url}/final'} for alias, url in payload['variables'].items()}
+    return 200, json.dumps({'data': data}).encode()
+
+
+class BrowserlessResolverTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), BrowserQLStubHandler)
+        self.server.lock = threading.Lock()
+        self.server.payloads = []
+        self.server.respond = resolve_all
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.api_url = f'http://127.0.0.1:{self.server.server_port}/chromium/bql?token=test'
+        self.article_urls = {f'title {i}': f'https://tracker.example/{i}' for i in range(3)}
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def resolve_group(self) -> tuple[dict[str, str], dict[str, str]]:
+        return resolver.resolve_urls_browserless_group(self.api_url, self.article_urls, timeout=1000)
+
+    def test_aliased_results_are_matched_to_titles(self):
+        resolved, unresolved = self.resolve_group()
+
+        self.assertEqual(resolved, {title: f'{url}/final' for title, url in self.article_urls.items()})
+        self.assertEqual(unresolved, {})
+        self.assertEqual(len(self.server.payloads), 1)
+        self.assertIn('url2: goto(url: $url2', self.server.payloads[0]['query'])
+
+    def test_null_entries_with_errors_are_unresolved(self):
+        def respond(payload):
+            return 200, json.dumps({
+                'data': {'url0': {'status': 200, 'url': 'https://site.example/article'}, 'url1': None, 'url2': None},
+                'errors': [{'message': 'Navigation timeout', 'path': ['url1']}],
+            }).encode()
+        self.server.respond = respond
+
+        resolved, unresolved = self.resolve_group()
+
+        self.assertEqual(resolved, {'title 0': 'https://site.example/article'})
+        self.assertEqual(unresolved, {'title 1': 'https://tracker.example/1', 'title 2': 'https://tracker.example/2'})
+
+    def test_non_200_status_leaves_group_unresolved(self):
+        self.server.respond = lambda payload: (503, b'{"error": "busy"}')
+
+        self.assertEqual(self.resolve_group(), ({}, self.article_urls))
+
+    def test_malformed_bodies_leave_group_unresolved(self):
+        for body in (b'not json', b'[]', b'null', b'{"data": []}', b'{"data": null, "errors": [{"message": "x"}]}'):
+            with self.subTest(body=body):
+                self.server.respond = lambda payload, body=body: (200, body)
+
+                self.assertEqual(self.resolve_group(), ({}, self.article_urls))
+
+    def test_urls_are_sent_in_groups_of_batch_size(self):
+        article_urls = {f'title {i}': f'https://tracker.example/{i}' for i in range(7)}
+        scheduler = RetryScheduler(max_attempts=1, base_delay_secs=0, max_delay_secs=0, deadline_secs=5)
+        resolvers = {}
+
+        with mock.patch.multiple(resolver, URL_RESOLVER_TYPE='browserless', URL_RESOLVER_HTTP_FIRST=False,
+                                 BROWSERLESS_API_KEY='test', BROWSERLESS_BATCH_SIZE=3, BROWSERLESS_CONCURRENCY=2,
+                                 BROWSERLESS_GROUP_WAIT_SECS=0.1,
+                                 BROWSERLESS_ENDPOINT=f'http://127.0.0.1:{self.server.server_port}'):
+            resolved = asyncio.run(resolver.resolve_urls_with_retries(article_urls, scheduler, resolvers,
+                                                                      timeout=1000))
+
+        self.assertEqual(resolved, {title: f'{url}/final' for title, url in article_urls.items()})
+        self.assertEqual(resolvers, dict.fromkeys(article_urls, 'browserless'))
+        # a group is sent once it's full, the rest - after BROWSERLESS_GROUP_WAIT_SECS
+        self.assertEqual(sorted(len(payload['variables']) for payload in self.server.payloads), [1, 3, 3])
+
+
+
+class BrowserLaunchFailureTest(unittest.TestCase):
+
+    def test_failed_launch_is_not_retried(self):
+        launches = []
+
+        class FailingPlaywright:
+            async def start(self):
+                launches.append(1)
+                raise RuntimeError('Executable doesn\'t exist')
+
+        article_urls = {f'title {i}': f'https://tracker.example/{i}' for i in range(5)}
+        scheduler = RetryScheduler(max_attempts=3, base_delay_secs=0.01, max_delay_secs=0.01, deadline_secs=5)
+
+        with mock.patch.multiple(resolver, URL_RESOLVER_TYPE='playwright', URL_RESOLVER_HTTP_FIRST=False,
+                                 async_playwright=FailingPlaywright):
+            resolved = asyncio.run(resolver.resolve_urls_with_retries(article_urls, scheduler, {}))
+
+        self.assertEqual(resolved, {})
+        self.assertEqual(len(launches), 1)
+        self.assertEqual(scheduler.attempts_histogram(), {'succeeded': {}, 'failed': {3: 5}, 'expired': 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
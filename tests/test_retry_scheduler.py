@@ -0,0 +1,60 @@
+import asyncio
+import time
+import unittest
+from unittest import mock
+from utils.retry_scheduler import RetryScheduler
+
+
+class RetrySchedulerTest(unittest.TestCase):
+
+    def test_failed_item_is_retried_without_waiting_for_slow_one(self):
+        scheduler = RetryScheduler(max_attempts=3, base_delay_secs=0.05, max_delay_secs=0.1, deadline_secs=5)
+        attempts = {'slow': [], 'flaky': []}
+
+        async def slow_attempt() -> bool:
+            attempts['slow'].append(time.monotonic())
+            await asyncio.sleep(0.5)
+            return True
+
+        async def flaky_attempt() -> bool:
+            attempts['flaky'].append(time.monotonic())
+            return len(attempts['flaky']) == 3
+
+        async def run_all() -> list[bool]:
+            return await asyncio.gather(scheduler.run(slow_attempt), scheduler.run(flaky_attempt))
+
+        self.assertEqual(asyncio.run(run_all()), [True, True])
+        # all flaky retries happen while the slow attempt is still running
+        self.assertLess(attempts['flaky'][-1], attempts['slow'][0] + 0.5)
+        self.assertEqual(scheduler.attempts_histogram(), {'succeeded': {1: 1, 3: 1}, 'failed': {}, 'expired': 0})
+
+    def test_attempts_are_limited(self):
+        scheduler = RetryScheduler(max_attempts=2, base_delay_secs=0.01, max_delay_secs=0.01, deadline_secs=5)
+        attempts = []
+
+        async def failing_attempt() -> bool:
+            attempts.append(1)
+            raise RuntimeError('failure')
+
+        with mock.patch('utils.retry_scheduler.log_json') as log_json:
+            self.assertFalse(asyncio.run(scheduler.run(failing_attempt)))
+        self.assertEqual(len(attempts), 2)
+        # exceptions of attempts are logged, not silently counted as failures
+        self.assertEqual(log_json.call_count, 2)
+        self.assertEqual(scheduler.attempts_histogram(), {'succeeded': {}, 'failed': {2: 1}, 'expired': 0})
+
+    def test_running_attempt_is_bounded_by_deadline(self):
+        scheduler = RetryScheduler(max_attempts=3, base_delay_secs=0.01, max_delay_secs=0.01, deadline_secs=0.2)
+
+        async def hanging_attempt() -> bool:
+            await asyncio.sleep(10)
+            return True
+
+        started = time.monotonic()
+        self.assertFalse(asyncio.run(scheduler.run(hanging_attempt)))
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(scheduler.attempts_histogram(), {'succeeded': {}, 'failed': {}, 'expired': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,72 @@
 import sys
+import atexit
 import logging
 import json
+import os
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener
+from contextlib import contextmanager
 from datetime import datetime
-from config import LOG_LEVEL, TZ
+from typing import Generator
+from utils.metrics import REGISTRY
+from config import LOG_LEVEL, LOG_BACKGROUND_WRITER, TZ
+
+
+_LEVELS = {
+    'debug': logging.DEBUG,
+    'info': logging.INFO,
+    'warning': logging.WARNING,
+    'error': logging.ERROR,
+    'critical': logging.CRITICAL,
+}
+
+# loggers by name, saves `logging.getLogger()` lock acquisition on every message
+_loggers: dict[str, logging.Logger] = {}
+
+_listener: QueueListener | None = None
+
+
+class JsonLogMessage:
+    """
+    Structured log message, which is serialized to a JSON line only when a handler formats it
+    (in the background writer thread, if it's on).
+
+    The timestamp is taken when the message is created, so the output is the same as if
+    the message were serialized right away.
+    """
+
+    __slots__ = ('created', 'level', 'logger_name', 'message', 'extra_fields')
+
+    def __init__(self, level: str, logger_name: str, message: str, extra_fields: dict) -> None:
+        self.created = time.time()
+        self.level = level
+        self.logger_name = logger_name
+        self.message = message
+        self.extra_fields = extra_fields
+
+    def __str__(self) -> str:
+        log_entry = {
+            'timestamptz': datetime.fromtimestamp(self.created, tz=TZ).strftime('%Y-%m-%d %H:%M:%S %z'),
+            'level': self.level,
+            'logger': self.logger_name,
+            'message': self.message
+        }
+        log_entry.update(self.extra_fields)
+        return json.dumps(log_entry, ensure_ascii=False)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Queue handler passing structured messages to the background writer unformatted,
+    so JSON serialization doesn't happen in the logging thread. Other records are prepared as usual.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if isinstance(record.msg, JsonLogMessage) and not record.args and not record.exc_info:
+            # the record isn't changed by handlers, so it's passed as is, without a copy
+            return record
+        return super().prepare(record)
 
 
 def setup_logging() -> None:
@@ -13,18 +77,58 @@ def setup_logging() -> None:
     The logging level can be controlled via LOG_LEVEL constant set in
     'config.py' module (defaults to INFO if set not correctly).
 
+    If LOG_BACKGROUND_WRITER constant set in 'config.py' module is on, messages are serialized
+    and written to stdout by a background thread, which is stopped (with all queued messages written)
+    at interpreter exit. Processes forked afterwards (e.g. emails parsing pool) write to stdout directly.
+
     :return: None
     """
+    global _listener
+
     if LOG_LEVEL.upper() in ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'):
         logging_level = LOG_LEVEL.upper()
     else:
         logging_level = 'INFO'
 
-    logging.basicConfig(
-        format='%(message)s',
-        level=getattr(logging, logging_level, logging.INFO),
-        handlers=[logging.StreamHandler(sys.stdout)]
-    )
+    root_logger = logging.getLogger()
+    if root_logger.handlers:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter('%(message)s'))
+    root_logger.setLevel(getattr(logging, logging_level, logging.INFO))
+
+    if not LOG_BACKGROUND_WRITER:
+        root_logger.addHandler(stream_handler)
+        return
+
+    queue_handler = DeferredQueueHandler(queue.SimpleQueue())
+    root_logger.addHandler(queue_handler)
+    _listener = QueueListener(queue_handler.queue, stream_handler)
+    _listener.start()
+    atexit.register(stop_background_writer)
+
+    def write_directly_in_child() -> None:
+        # the writer thread doesn't exist in a forked process, so queued messages would be lost
+        global _listener
+        _listener = None
+        root_logger.removeHandler(queue_handler)
+        root_logger.addHandler(stream_handler)
+
+    os.register_at_fork(after_in_child=write_directly_in_child)
+
+
+def stop_background_writer() -> None:
+    """
+    Writes all queued log messages and stops the background writer thread.
+
+    :return: None
+    """
+    global _listener
+
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
 
 
 def log_json(logger_name: str, level: str, message: str, **extra_fields) -> None:
@@ -32,7 +136,9 @@ def log_json(logger_name: str, level: str, message: str, **extra_fields) -> None
     Log a structured JSON message with specified logger name and level.
 
     Creates a JSON log entry with timestamp, level, logger name, message,
-    and any additional fields.
+    and any additional fields. Nothing is formatted if the level is disabled for the logger,
+    and serialization is deferred to the handler (see `JsonLogMessage`), so extra fields
+    must not be changed by the caller after the call.
 
     :param logger_name: name of the logger
     :param level: log level ('debug', 'info', 'warning', 'error', 'critical')
@@ -40,18 +146,50 @@ def log_json(logger_name: str, level: str, message: str, **extra_fields) -> None
     :param extra_fields: additional fields to include in the JSON log entry
     :return: None
     """
+    logger = _loggers.get(logger_name)
+    if logger is None:
+        logger = _loggers.setdefault(logger_name, logging.getLogger(logger_name))
+
+    level = level.lower()
+    level_number = _LEVELS.get(level, logging.INFO)
+    if not logger.isEnabledFor(level_number):
+        return
+
+    # the record is made directly, skipping the caller frame lookup: JSON lines don't include source location
+    record = logger.makeRecord(logger_name, level_number, '(unknown file)', 0,
+                               JsonLogMessage(level, logger_name, message, extra_fields), (), None)
+    logger.handle(record)
+
+
+@contextmanager
+def log_span(logger_name: str, span_name: str, level: str = 'info', **extra_fields) -> Generator[dict, None, None]:
+    """
+    Measures duration of a block (or a function, if used as a decorator) as a named span.
+
+    Once the block ends, logs a structured JSON message with `duration_ms` and `status` of the span
+    and records the duration in 'bot_span_duration_ms' histogram of the metrics registry
+    (see 'utils/metrics.py' module). The status is 'error' if the block raises an exception;
+    the block can also set it by itself, e.g. when an error is handled inside the block.
 
-    log_entry = {
-        'timestamptz': datetime.now(tz=TZ).strftime('%Y-%m-%d %H:%M:%S %z'),
-        'level': level.lower(),
-        'logger': logger_name,
-        'message': message
-    }
-    log_entry.update(extra_fields)
-
-    logger = logging.getLogger(logger_name)
-    logger_method = getattr(logger, level.lower(), logger.info)
-    logger_method(json.dumps(log_entry, ensure_ascii=False))
+    :param logger_name: name of the logger
+    :param span_name: name of the span, e.g. 'imap_fetch'
+    :param level: log level of the span message
+    :param extra_fields: additional fields to include in the JSON log entry
+    :return: context manager providing a dict with the span 'status', which can be changed by the block
+    """
+    span = {'status': 'ok'}
+    started = time.perf_counter()
+    try:
+        yield span
+    except BaseException:
+        span['status'] = 'error'
+        raise
+    finally:
+        duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        REGISTRY.observe('bot_span_duration_ms', duration_ms, help_text='Duration of bot subprocesses in ms.',
+                         span=span_name, status=span['status'])
+        log_json(logger_name, level, 'The span is ended', span=span_name, duration_ms=duration_ms,
+                 status=span['status'], **extra_fields)
 
 
 def silence_third_party_logs() -> None:
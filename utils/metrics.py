@@ -0,0 +1,146 @@
+import atexit
+import json
+import os
+import threading
+from config import METRICS_FILE_PATH
+
+
+# upper bounds of duration histogram buckets, from fast DB calls to the whole URLs resolving stage
+DURATION_BUCKETS_MS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 300000, 900000)
+
+
+class MetricsRegistry:
+    """
+    Process-wide in-memory counters and histograms, exported to a file once the run ends.
+
+    Metrics are identified by name and labels, e.g. ('bot_span_duration_ms', {'span': 'imap_fetch'}).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._help = {}
+        # (name, sorted labels tuple) -> value
+        self._counters = {}
+        # (name, sorted labels tuple) -> {'buckets': bucket bounds, 'counts': per bucket counts, 'sum': ..., 'count': ...}
+        self._histograms = {}
+
+    def inc(self, name: str, value: float = 1, help_text: str = '', **labels) -> None:
+        """
+        Increases a counter.
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._help.setdefault(name, help_text)
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, buckets: tuple[float, ...] = DURATION_BUCKETS_MS,
+                help_text: str = '', **labels) -> None:
+        """
+        Adds a value to a histogram.
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._help.setdefault(name, help_text)
+            histogram = self._histograms.setdefault(
+                key, {'buckets': buckets, 'counts': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+            )
+            for i, bound in enumerate(histogram['buckets']):
+                if value <= bound:
+                    histogram['counts'][i] += 1
+                    break
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    def to_dict(self) -> dict[str, list[dict]]:
+        """
+        :return: {'counters': [...], 'histograms': [...]} with cumulative bucket counts, JSON-serializable.
+        """
+        with self._lock:
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in sorted(self._counters.items())]
+            histograms = []
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                cumulative_counts, total = [], 0
+                for count in histogram['counts']:
+                    total += count
+                    cumulative_counts.append(total)
+                histograms.append({'name': name, 'labels': dict(labels),
+                                   'buckets': dict(zip(map(str, histogram['buckets']), cumulative_counts)),
+                                   'sum': round(histogram['sum'], 3), 'count': histogram['count']})
+        return {'counters': counters, 'histograms': histograms}
+
+    def to_prometheus_text(self) -> str:
+        """
+        :return: metrics in Prometheus text exposition format (e.g. for node_exporter textfile collector).
+        """
+        metrics = self.to_dict()
+        lines = []
+        described = set()
+
+        def describe(name: str, metric_type: str) -> None:
+            if name not in described:
+                described.add(name)
+                if self._help.get(name):
+                    lines.append(f'# HELP {name} {self._help[name]}')
+                lines.append(f'# TYPE {name} {metric_type}')
+
+        for counter in metrics['counters']:
+            describe(counter['name'], 'counter')
+            lines.append(f'{counter["name"]}{format_labels(counter["labels"])} {counter["value"]}')
+
+        for histogram in metrics['histograms']:
+            name, labels = histogram['name'], histogram['labels']
+            describe(name, 'histogram')
+            for bound, count in histogram['buckets'].items():
+                lines.append(f'{name}_bucket{format_labels({**labels, "le": bound})} {count}')
+            lines.append(f'{name}_bucket{format_labels({**labels, "le": "+Inf"})} {histogram["count"]}')
+            lines.append(f'{name}_sum{format_labels(labels)} {histogram["sum"]}')
+            lines.append(f'{name}_count{format_labels(labels)} {histogram["count"]}')
+
+        return '\n'.join(lines) + '\n' if lines else ''
+
+
+def format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+
+REGISTRY = MetricsRegistry()
+
+
+def write_metrics_file(path: str = METRICS_FILE_PATH) -> None:
+    """
+    Writes collected metrics to a file: JSON if the path ends with '.json', Prometheus text format otherwise.
+    The file is replaced atomically, so a collector never reads a partially written file.
+
+    :param path: metrics file path.
+    :return: None
+    """
+    from utils.logging_config import log_json
+
+    if path.endswith('.json'):
+        content = json.dumps(REGISTRY.to_dict(), ensure_ascii=False, indent=2)
+    else:
+        content = REGISTRY.to_prometheus_text()
+
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='UTF-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+        log_json('METRICS EXPORT', 'info', 'Metrics file is written', path=path)
+    except OSError as e:
+        log_json('METRICS EXPORT', 'error', 'Metrics file writing failure', path=path, error=f'{e}')
+
+
+def setup_metrics_export() -> None:
+    """
+    Registers writing of the metrics file at interpreter exit, if METRICS_FILE_PATH
+    constant in 'config.py' module is set.
+
+    :return: None
+    """
+    if METRICS_FILE_PATH:
+        atexit.register(write_metrics_file)
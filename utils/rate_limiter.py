@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import Counter
+
+
+class TokenBucketRateLimiter:
+    """
+    Per-key (e.g. per-model) rate limiter with two token buckets: requests per minute and tokens per minute.
+
+    Each bucket holds up to its per-minute limit and is refilled continuously at limit/60 per second.
+    A request takes its share from both buckets right away, possibly driving them below zero, and the
+    caller sleeps only until the buckets are refilled back to zero, i.e. no longer than needed to keep
+    the average rate within the limits. A full bucket allows a burst of up to a minute's limit.
+
+    Bucket levels are kept with wall-clock timestamps, so they can be exported and restored in another process.
+    """
+
+    def __init__(self, limits: dict[str, tuple[int, int]], default_limits: tuple[int, int]) -> None:
+        """
+        :param limits: dict of 'key-(requests per minute, tokens per minute)' pairs.
+        :param default_limits: (requests per minute, tokens per minute) for keys absent in `limits`.
+        """
+        self._limits = limits
+        self._default_limits = default_limits
+        # key -> [requests level, tokens level, wall-clock time of the levels]
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+        self.wait_secs = Counter()
+
+    def get_limits(self, key: str) -> tuple[int, int]:
+        return tuple(self._limits.get(key, self._default_limits))
+
+    def reserve(self, key: str, tokens: int = 0) -> float:
+        """
+        Takes one request and the given q-ty of tokens from the key buckets without sleeping.
+
+        :param key: limited key, e.g. model name.
+        :param tokens: estimated q-ty of tokens of the request.
+        :return: secs to wait before sending the request.
+        """
+        rpm, tpm = self.get_limits(key)
+
+        with self._lock:
+            requests_level, tokens_level = self._refill(key, rpm, tpm)
+            requests_level -= 1
+            tokens_level -= tokens
+            self._buckets[key] = [requests_level, tokens_level, time.time()]
+
+        wait_secs = max(0.0, -requests_level * 60 / rpm, -tokens_level * 60 / tpm)
+        self.wait_secs[key] += wait_secs
+        return wait_secs
+
+    def acquire(self, key: str, tokens: int = 0) -> float:
+        """
+        Takes one request and the given q-ty of tokens from the key buckets, sleeping as long as needed.
+
+        :param key: limited key, e.g. model name.
+        :param tokens: estimated q-ty of tokens of the request.
+        :return: secs waited.
+        """
+        wait_secs = self.reserve(key, tokens)
+        if wait_secs > 0:
+            time.sleep(wait_secs)
+        return wait_secs
+
+    def adjust_tokens(self, key: str, tokens: int) -> None:
+        """
+        Corrects the key tokens bucket once the actual q-ty of request tokens is known.
+
+        :param key: limited key, e.g. model name.
+        :param tokens: actual minus estimated q-ty of tokens (negative values return tokens to the bucket).
+        """
+        rpm, tpm = self.get_limits(key)
+
+        with self._lock:
+            requests_level, tokens_level = self._refill(key, rpm, tpm)
+            self._buckets[key] = [requests_level, min(tpm, tokens_level - tokens), time.time()]
+
+    def export_state(self) -> list[tuple[str, float, float, float]]:
+        """
+        :return: list of (key, requests level, tokens level, wall-clock time of the levels) tuples.
+        """
+        with self._lock:
+            return [(key, *bucket) for key, bucket in self._buckets.items()]
+
+    def load_state(self, state: list[tuple[str, float, float, float]]) -> None:
+        """
+        Restores bucket levels exported by `export_state()`, e.g. in a previous run.
+
+        :param state: list of (key, requests level, tokens level, wall-clock time of the levels) tuples.
+        """
+        with self._lock:
+            for key, requests_level, tokens_level, updated_at in state:
+                self._buckets[key] = [requests_level, tokens_level, updated_at]
+
+    def _refill(self, key: str, rpm: int, tpm: int) -> tuple[float, float]:
+        if key not in self._buckets:
+            return float(rpm), float(tpm)
+
+        requests_level, tokens_level, updated_at = self._buckets[key]
+        elapsed_mins = max(0.0, time.time() - updated_at) / 60
+        return min(rpm, requests_level + rpm * elapsed_mins), min(tpm, tokens_level + tpm * elapsed_mins)
@@ -0,0 +1,84 @@
+import asyncio
+import random
+import time
+from collections import Counter
+from typing import Awaitable, Callable
+from utils.logging_config import log_json
+
+
+LOGGER = 'RETRY SCHEDULER'
+
+
+class RetryScheduler:
+    """
+    Per-item retries with exponential backoff, jitter and an overall deadline, for items processed
+    by concurrent asyncio tasks, one task per item (see `run()`).
+
+    Every item has its own attempt counter. A failed item is retried as soon as its own delay of
+    `base_delay_secs * 2 ** (attempt - 1)` (capped by `max_delay_secs`) has passed, independently of
+    other items; the delay is randomized to 50-100% of its value, so retries of different items don't
+    come in sync. Every attempt is limited by the time left until the deadline. Items are given up after
+    `max_attempts` attempts or when the deadline has passed.
+    """
+
+    def __init__(self, max_attempts: int, base_delay_secs: float, max_delay_secs: float,
+                 deadline_secs: float) -> None:
+        """
+        :param max_attempts: max q-ty of attempts per item.
+        :param base_delay_secs: delay before the first retry of an item.
+        :param max_delay_secs: max delay between two attempts of an item.
+        :param deadline_secs: max time to process all items, counted from scheduler creation.
+        """
+        self._max_attempts = max(1, max_attempts)
+        self._base_delay_secs = base_delay_secs
+        self._max_delay_secs = max_delay_secs
+        self._deadline = time.monotonic() + deadline_secs
+
+        self.succeeded = Counter()
+        self.failed = Counter()
+        self.expired = 0
+
+    async def run(self, attempt: Callable[[], Awaitable[bool]]) -> bool:
+        """
+        Makes attempts to process an item until one succeeds or the item is given up.
+
+        :param attempt: coroutine function making a single attempt, returns True on success;
+            an exception counts as a failed attempt.
+        :return: True if an attempt succeeded, False if the item is given up.
+        """
+        for attempt_number in range(1, self._max_attempts + 1):
+            time_left_secs = self._deadline - time.monotonic()
+            if time_left_secs <= 0:
+                self.expired += 1
+                return False
+
+            try:
+                succeeded = await asyncio.wait_for(attempt(), time_left_secs)
+            except asyncio.TimeoutError:
+                self.expired += 1
+                return False
+            except Exception as e:
+                log_json(LOGGER, 'warning', 'The attempt is failed', reason='Unexpected error',
+                         attempt_number=attempt_number, error=f'{e}')
+                succeeded = False
+
+            if succeeded:
+                self.succeeded[attempt_number] += 1
+                return True
+            if attempt_number == self._max_attempts:
+                break
+
+            delay = min(self._max_delay_secs, self._base_delay_secs * 2 ** (attempt_number - 1))
+            await asyncio.sleep(random.uniform(delay / 2, delay))
+
+        self.failed[self._max_attempts] += 1
+        return False
+
+    def attempts_histogram(self) -> dict[str, dict[int, int] | int]:
+        """
+        :return: q-ty of items by q-ty of attempts made, separately for succeeded and failed items,
+            and q-ty of items given up because of the deadline.
+        """
+        return {'succeeded': dict(sorted(self.succeeded.items())),
+                'failed': dict(sorted(self.failed.items())),
+                'expired': self.expired}